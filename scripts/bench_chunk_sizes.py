@@ -0,0 +1,139 @@
+"""Benchmark: LLM calls and input tokens per page for each chunk size setting.
+
+Splits generated markdown pages of several sizes with ChunkingService under
+fixed chunk sizes and the auto mode. For every setting it reports the
+chunks, the chunks cut by max_chunks, the model calls made on a page
+(one classification and one extraction call per chunk, i.e. every chunk
+relevant) and the input tokens those calls send, prompt overhead
+included. Run from the repository root:
+
+    python scripts/bench_chunk_sizes.py [page_tokens ...]
+
+Uses the cl100k_base vocabulary when it is available locally and otherwise
+a small offline byte-level BPE, which yields more tokens per byte (prompt
+overheads then look larger too).
+"""
+
+import json
+import os
+import random
+import sys
+from collections import Counter
+
+import tiktoken
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import src.url_crawler.utils as crawler_utils  # noqa: E402
+from src.configuration import Configuration  # noqa: E402
+from src.research_events.chunk_graph import (  # noqa: E402
+    CHUNK_CHECK_CRITERIA,
+    CHUNK_CHECK_PROMPT,
+    BiographicEventCheck,
+)
+from src.research_events.merge_events.merge_events_graph import (  # noqa: E402
+    extraction_overhead_tokens,
+)
+from src.services.chunking_service import ChunkingService  # noqa: E402
+
+PAGE_TOKENS = [int(size) for size in sys.argv[1:]] or [2000, 8000, 25000, 60000]
+SETTINGS = [
+    ("fixed 500", {"default_chunk_size": 500}),
+    ("fixed 1000", {"default_chunk_size": 1000}),
+    ("fixed 2000", {"default_chunk_size": 2000}),
+    ("auto", {"chunk_size_mode": "auto"}),
+]
+PATTERN = (
+    r"""'s|'t|'re|'ve|'m|'ll|'d| ?\p{L}+| ?\p{N}+| ?[^\s\p{L}\p{N}]+|\s+(?!\S)|\s+"""
+)
+
+WORDS = (
+    "Henry Miller was born in Yorkville and moved to Paris where he wrote "
+    "novels essays letters about his life friends marriages travels and the "
+    "city in 1930 1934 1939 1944 after returning to California Big Sur"
+).split()
+
+
+def make_page(target_tokens: int, encoding, seed: int = 0) -> str:
+    """Markdown with headings and paragraphs of 2-6 sentences."""
+    rng = random.Random(seed)
+    parts, tokens, section = ["# Henry Miller"], 0, 0
+    while tokens < target_tokens:
+        section += 1
+        parts.append(f"## Section {section}")
+        for _ in range(rng.randint(1, 5)):
+            sentences = []
+            for _ in range(rng.randint(2, 6)):
+                words = [rng.choice(WORDS) for _ in range(rng.randint(8, 20))]
+                sentences.append(" ".join(words).capitalize() + ".")
+            paragraph = " ".join(sentences)
+            parts.append(paragraph)
+            tokens += len(encoding.encode_ordinary(paragraph))
+    return "\n\n".join(parts)
+
+
+def load_encoding() -> tiktoken.Encoding:
+    """Return cl100k_base, or a byte-level BPE over WORDS when offline."""
+    try:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        ranks = {bytes([i]): i for i in range(256)}
+        for word, _ in Counter(WORDS).most_common():
+            piece = f" {word}".encode()
+            for end in range(2, len(piece) + 1):
+                ranks.setdefault(piece[:end], len(ranks))
+        return tiktoken.Encoding(
+            "offline-bytes", pat_str=PATTERN, mergeable_ranks=ranks, special_tokens={}
+        )
+
+
+def main() -> None:
+    """Report chunks, model calls and input tokens per page for each setting."""
+    encoding = load_encoding()
+    crawler_utils._tokenizer = encoding  # share it with the graph modules
+
+    extraction_overhead = extraction_overhead_tokens()
+    classify_overhead = len(
+        encoding.encode_ordinary(
+            CHUNK_CHECK_PROMPT.format(criteria=CHUNK_CHECK_CRITERIA, chunk="")
+            + json.dumps(convert_to_openai_tool(BiographicEventCheck))
+        )
+    )
+    base = Configuration()
+    print(
+        f"encoding={encoding.name} prompt overhead: classify={classify_overhead} "
+        f"extract={extraction_overhead} tokens; chunk_context_window="
+        f"{base.chunk_context_window}, output reserve={base.tools_llm_max_tokens}, "
+        f"max_chunks={base.max_chunks}\n"
+    )
+    print(
+        f"{'page':>7} {'setting':>11} {'size':>6} {'chunks':>6} {'cut':>4} "
+        f"{'calls':>6} {'input tokens':>13}"
+    )
+    for page_tokens in PAGE_TOKENS:
+        page = make_page(page_tokens, encoding)
+        actual = len(encoding.encode_ordinary(page))
+        for name, overrides in SETTINGS:
+            configurable = base.model_copy(update=overrides)
+            size = ChunkingService.chunk_size_for(
+                configurable, actual, extraction_overhead
+            )
+            chunks = ChunkingService.split(
+                page, configurable, encoding, extraction_overhead
+            )
+            kept = chunks[: configurable.max_chunks]
+            chunk_tokens = sum(len(encoding.encode_ordinary(c)) for c in kept)
+            calls = 2 * len(kept)
+            tokens = 2 * chunk_tokens + len(kept) * (
+                classify_overhead + extraction_overhead
+            )
+            print(
+                f"{actual:>7} {name:>11} {size:>6} {len(chunks):>6} "
+                f"{len(chunks) - len(kept):>4} {calls:>6} {tokens:>13}"
+            )
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Benchmark: offset-based chunking vs decoding every token window.
+
+Chunks generated 1 MB, 5 MB and 10 MB documents (mostly English with some
+non-ASCII text) both ways and reports wall time and peak Python heap
+(tracemalloc; allocations inside tiktoken's Rust core are not traced).
+The batch API is compared with chunking documents one at a time. Run from
+the repository root:
+
+    python scripts/bench_chunking.py [sizes_mb ...]
+
+Uses the cl100k_base vocabulary when it is available locally and otherwise
+a small offline byte-level BPE, which yields more tokens per byte.
+"""
+
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+from collections import Counter
+
+import tiktoken
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.chunking import chunk_by_tokens, chunk_many_by_tokens  # noqa: E402
+
+SIZES_MB = [float(size) for size in sys.argv[1:]] or [1, 5, 10]
+CHUNK_SIZE = 1000
+OVERLAP = 20
+PATTERN = (
+    r"""'s|'t|'re|'ve|'m|'ll|'d| ?\p{L}+| ?\p{N}+| ?[^\s\p{L}\p{N}]+|\s+(?!\S)|\s+"""
+)
+
+WORDS = (
+    "Henry Miller was born in Yorkville and moved to Paris where he wrote "
+    "novels essays letters about his life friends marriages travels and the "
+    "city in 1930 1934 1939 1944 after returning to California Big Sur "
+    "Café Montparnasse déjà vu naïve Zürich Μιλλερ Миллер 米勒 🙂"
+).split()
+
+
+def make_text(size_bytes: int, seed: int = 0) -> str:
+    """Return about size_bytes of random mixed-script sentences."""
+    rng = random.Random(seed)
+    parts, total = [], 0
+    while total < size_bytes:
+        sentence = " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 20)))
+        sentence = sentence[0].upper() + sentence[1:] + ".\n"
+        parts.append(sentence)
+        total += len(sentence.encode())
+    return "".join(parts)
+
+
+def load_encoding(sample: str) -> tiktoken.Encoding:
+    """Return cl100k_base, or a byte-level BPE trained on sample when offline."""
+    try:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        ranks = {bytes([i]): i for i in range(256)}
+        for word, _ in Counter(sample.split()).most_common(2000):
+            piece = f" {word}".encode()
+            for end in range(2, len(piece) + 1):
+                ranks.setdefault(piece[:end], len(ranks))
+        return tiktoken.Encoding(
+            "offline-bytes", pat_str=PATTERN, mergeable_ranks=ranks, special_tokens={}
+        )
+
+
+def decode_windows(text: str, encoding) -> list[str]:
+    """Decode every overlapping window, as chunk_text_by_tokens used to."""
+    tokens = encoding.encode(text)
+    chunks = []
+    start = 0
+    while start < len(tokens):
+        chunks.append(encoding.decode(tokens[start : start + CHUNK_SIZE]))
+        start += CHUNK_SIZE - OVERLAP
+    return chunks
+
+
+def materialize(chunks) -> list[str]:
+    """Slice the text of every offset-based chunk."""
+    return [chunk.text for chunk in chunks]
+
+
+def measure(function, *args):
+    """Return (result, seconds, peak traced bytes) of function(*args)."""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = function(*args)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    """Compare decoded and offset-based chunking across text sizes."""
+    encoding = load_encoding(make_text(200_000))
+    print(f"encoding: {encoding.name}\n")
+    print(
+        f"{'size':>6}{'chunks':>8}{'decode s':>10}{'offset s':>10}"
+        f"{'decode MB':>11}{'offset MB':>11}{'+text MB':>10}"
+    )
+    for size in SIZES_MB:
+        text = make_text(int(size * 1024 * 1024))
+        decoded, decode_time, decode_peak = measure(decode_windows, text, encoding)
+        chunks, offset_time, offset_peak = measure(
+            chunk_by_tokens, text, encoding, CHUNK_SIZE, OVERLAP
+        )
+        # Materializing every chunk string, as chunk_text_by_tokens does
+        _, _, texts_peak = measure(materialize, chunks)
+        assert len(decoded) >= len(chunks)
+        print(
+            f"{size:>5.0f}M{len(chunks):>8}{decode_time:>10.2f}{offset_time:>10.2f}"
+            f"{decode_peak / 2**20:>11.1f}{offset_peak / 2**20:>11.1f}"
+            f"{texts_peak / 2**20:>10.1f}"
+        )
+        del text, decoded, chunks
+
+    documents = [make_text(1024 * 1024, seed) for seed in range(8)]
+    start = time.perf_counter()
+    for document in documents:
+        chunk_by_tokens(document, encoding, CHUNK_SIZE, OVERLAP)
+    one_by_one = time.perf_counter() - start
+    start = time.perf_counter()
+    chunk_many_by_tokens(documents, encoding, CHUNK_SIZE, OVERLAP)
+    batched = time.perf_counter() - start
+    print(
+        f"\n8 x 1 MB documents, {os.cpu_count()} CPU(s): "
+        f"one by one {one_by_one:.2f}s, batch {batched:.2f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
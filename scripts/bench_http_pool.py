@@ -0,0 +1,101 @@
+"""Benchmark: Firecrawl-style scraping with a fresh session per URL vs the pooled session.
+
+Starts a local stub of the Firecrawl scrape endpoint and fires the same number
+of concurrent requests through both code paths. Run from the repository root:
+
+    python scripts/bench_http_pool.py [requests] [concurrency]
+
+No external service is contacted.
+"""
+
+import asyncio
+import os
+import socket
+import sys
+import time
+
+import aiohttp
+from aiohttp import web
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+REQUESTS = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+CONCURRENCY = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+PAGE = {"data": {"markdown": "Henry Miller was born in 1891. " * 100}}
+
+
+def free_port() -> int:
+    """Return a local port nothing listens on."""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+PORT = free_port()
+# FIRECRAWL_API_URL is read at import time
+os.environ["FIRECRAWL_BASE_URL"] = f"http://127.0.0.1:{PORT}"
+
+from src.url_crawler.http_session import close_http_session  # noqa: E402
+from src.url_crawler.scrapers import FIRECRAWL_API_URL  # noqa: E402
+from src.url_crawler.utils import scrape_page_content  # noqa: E402
+
+
+async def scrape_unpooled(url: str):
+    """Scrape url with a ClientSession of its own, as before pooling."""
+    async with aiohttp.ClientSession() as session:
+        async with session.post(
+            FIRECRAWL_API_URL,
+            json={"url": url, "pageOptions": {"onlyMainContent": True}},
+            timeout=aiohttp.ClientTimeout(total=30),
+        ) as response:
+            response.raise_for_status()
+            data = await response.json()
+            return data.get("data", {}).get("markdown")
+
+
+async def run(scrape) -> float:
+    """Scrape REQUESTS pages, CONCURRENCY at a time, and return requests/s."""
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    async def one(i: int):
+        async with semaphore:
+            assert await scrape(f"https://example.com/page/{i}")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(REQUESTS)))
+    return REQUESTS / (time.perf_counter() - start)
+
+
+async def main():
+    """Serve a fake Firecrawl API and compare per-request and pooled sessions."""
+
+    async def handle(request: web.Request) -> web.Response:
+        await request.read()
+        return web.json_response(PAGE)
+
+    app = web.Application()
+    app.router.add_post("/v0/scrape", handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", PORT).start()
+
+    try:
+        # Warm up both paths once
+        await scrape_unpooled("https://example.com/")
+        await scrape_page_content("https://example.com/")
+
+        unpooled = await run(scrape_unpooled)
+        pooled = await run(scrape_page_content)
+    finally:
+        await close_http_session()
+        await runner.cleanup()
+
+    print(f"{REQUESTS} requests, concurrency {CONCURRENCY}")
+    print(f"{'mode':<22}{'requests/s':>12}")
+    print(f"{'session per request':<22}{unpooled:>12.0f}")
+    print(f"{'pooled session':<22}{pooled:>12.0f}")
+    print(f"speedup: {pooled / unpooled:.2f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
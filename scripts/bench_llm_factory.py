@@ -0,0 +1,61 @@
+"""Micro-benchmark: cost of building model runnables with and without memoization.
+
+Run from the repository root:
+
+    python scripts/bench_llm_factory.py
+
+No provider is contacted; only chain construction is timed.
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.llm_service import (  # noqa: E402
+    clear_model_cache,
+    create_llm_chunk_model,
+    create_llm_structured_model,
+    create_llm_with_tools,
+)
+from src.research_events.chunk_graph import BiographicEventCheck  # noqa: E402
+from src.research_events.merge_events.merge_events_graph import (  # noqa: E402
+    EXTRACTION_TOOLS,
+)
+from src.state import Chronology  # noqa: E402
+
+ITERATIONS = 200
+CONFIG = {"configurable": {"thread_id": "bench"}}
+
+FACTORIES = {
+    "create_llm_with_tools": lambda: create_llm_with_tools(EXTRACTION_TOOLS, CONFIG),
+    "create_llm_structured_model": lambda: create_llm_structured_model(
+        CONFIG, Chronology
+    ),
+    "create_llm_chunk_model": lambda: create_llm_chunk_model(
+        CONFIG, BiographicEventCheck
+    ),
+}
+
+
+def cold(factory):
+    """Build from scratch, as every call did before memoization."""
+    clear_model_cache()
+    factory()
+
+
+def main():
+    """Print per-call construction cost, cold vs memoized."""
+    print(f"{'factory':<30} {'cold (us)':>12} {'memoized (us)':>15} {'speedup':>9}")
+    for name, factory in FACTORIES.items():
+        cold_s = timeit.timeit(lambda: cold(factory), number=ITERATIONS)
+        factory()
+        warm_s = timeit.timeit(factory, number=ITERATIONS)
+        cold_us = cold_s / ITERATIONS * 1e6
+        warm_us = warm_s / ITERATIONS * 1e6
+        print(f"{name:<30} {cold_us:>12.1f} {warm_us:>15.1f} {cold_us / warm_us:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""Benchmark: local HTML scraping backend, throughput and extraction quality.
+
+Serves generated biography fixtures (three page layouts with navigation,
+sidebars, footers, scripts and citation markers around the article) from a
+local HTTP server and scrapes them with the "local" backend. Run from the
+repository root:
+
+    python scripts/bench_scrapers.py [pages]
+
+Quality is measured per fixture as:
+
+- fact recall: share of the article's fact sentences present in the output
+- boilerplate leak: share of navigation/footer/script marker strings present
+
+A naive "strip every tag" conversion is reported as the baseline. The
+Firecrawl backend is not benchmarked here because it needs network access
+and an API key.
+"""
+
+import asyncio
+import os
+import re
+import socket
+import sys
+import time
+
+from aiohttp import web
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.url_crawler.html_extractor import extract_main_content  # noqa: E402
+from src.url_crawler.http_session import (  # noqa: E402
+    close_http_session,
+    get_http_session,
+)
+from src.url_crawler.scrapers import get_scraper  # noqa: E402
+
+PAGES = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+FACTS = [
+    "She was born on 12 March 1891 in Yorkville, New York City",
+    "In 1909 she enrolled at the City College of New York",
+    "She married the painter Tom Reyes in 1917",
+    "Her first novel, The Quiet Harbor, was published in 1924",
+    "She moved to Paris in 1930 and lived on the Rue Vavin",
+    "In 1947 she was awarded the National Book Prize",
+    "She died on 7 June 1980 in Pacific Palisades, California",
+]
+BOILERPLATE = [
+    "Main menu",
+    "Subscribe to our newsletter",
+    "Privacy policy",
+    "Cookie settings",
+    "Related articles",
+    "window.dataLayer",
+    "Share on Twitter",
+    "Log in",
+]
+FILLER = (
+    "Critics have long debated how her years abroad shaped the themes of "
+    "exile, memory and self-invention that run through her work, and her "
+    "letters from the period describe long walks, crowded cafes and a "
+    "restless circle of friends. "
+)
+
+
+def article_paragraphs(repeat: int) -> str:
+    """Return one paragraph per fact, padded with repeat copies of filler."""
+    paragraphs = []
+    for fact in FACTS:
+        paragraphs.append(
+            f"<p>{fact}.<sup class='reference'>[1]</sup> {FILLER * repeat}</p>"
+        )
+    return "\n".join(paragraphs)
+
+
+def navigation() -> str:
+    """Return a large site navigation menu."""
+    links = "".join(
+        f"<li><a href='/wiki/Topic_{i}'>Topic {i}</a></li>" for i in range(150)
+    )
+    return f"<nav><h2>Main menu</h2><ul>{links}</ul></nav>"
+
+
+def chrome(body: str) -> str:
+    """Wrap body in a page with scripts, menus, cookie links and a footer."""
+    return f"""<!DOCTYPE html><html><head><title>Ada Reyes</title>
+<script>window.dataLayer = window.dataLayer || [];</script>
+<style>body {{ font-family: serif; }}</style></head>
+<body>
+<div class="top-bar"><a href="/login">Log in</a> <a href="/cookies">Cookie settings</a></div>
+{navigation()}
+{body}
+<footer><p>Subscribe to our newsletter for weekly stories.</p><a href="/privacy">Privacy policy</a></footer>
+</body></html>"""
+
+
+def wiki_layout() -> str:
+    """Return an encyclopedia-style page with an infobox and a navbox."""
+    infobox = (
+        "<table class='infobox vcard'><tr><th>Born</th><td>12 March 1891</td></tr>"
+        "<tr><th>Died</th><td>7 June 1980</td></tr></table>"
+    )
+    return chrome(
+        "<div id='content' class='mw-body'><h1>Ada Reyes</h1>"
+        "<div id='mw-content-text'><div class='mw-parser-output'>"
+        f"{infobox}<h2>Early life<span class='mw-editsection'>[edit]</span></h2>"
+        f"{article_paragraphs(3)}"
+        "<div class='navbox'><a href='/a'>Related articles</a></div>"
+        "</div></div></div>"
+    )
+
+
+def news_layout() -> str:
+    """Return a news article with share tools and a related-articles sidebar."""
+    return chrome(
+        "<main><article class='story'><header><h1>The life of Ada Reyes</h1></header>"
+        f"<div class='story-body'>{article_paragraphs(2)}</div>"
+        "<div class='share-tools'><a href='#'>Share on Twitter</a></div>"
+        "</article><aside class='sidebar'><h3>Related articles</h3>"
+        "<ul><li><a href='/x'>Another writer</a></li></ul></aside></main>"
+    )
+
+
+def table_layout() -> str:
+    """Return an old-school page: content in a table cell next to a link column."""
+    links = "".join(f"<a href='/p{i}'>Related articles {i}</a><br>" for i in range(40))
+    return chrome(
+        f"<table><tr><td class='menu'>{links}</td>"
+        f"<td><h1>Ada Reyes</h1>{article_paragraphs(2)}</td></tr></table>"
+    )
+
+
+FIXTURES = {
+    "wiki": wiki_layout(),
+    "news": news_layout(),
+    "table": table_layout(),
+}
+
+
+def strip_tags(html: str) -> str:
+    """Drop every tag, the naive extraction baseline."""
+    return re.sub(r"<[^>]+>", " ", html)
+
+
+def quality(text: str) -> tuple[float, float]:
+    """Return (fact recall, boilerplate leak) of extracted text."""
+    recall = sum(fact in text for fact in FACTS) / len(FACTS)
+    leak = sum(marker in text for marker in BOILERPLATE) / len(BOILERPLATE)
+    return recall, leak
+
+
+def free_port() -> int:
+    """Return a local port nothing listens on."""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def main():
+    """Serve the fixtures and compare extraction quality and speed."""
+
+    async def handle(request: web.Request) -> web.Response:
+        return web.Response(
+            text=FIXTURES[request.match_info["name"]], content_type="text/html"
+        )
+
+    port = free_port()
+    app = web.Application()
+    app.router.add_get("/{name}", handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+
+    scraper = get_scraper("local")
+    try:
+        print(
+            f"{'fixture':<8}{'KB':>6}{'recall':>9}{'leak':>7}{'naive recall':>14}{'naive leak':>12}"
+        )
+        for name, html in FIXTURES.items():
+            session = get_http_session()
+            markdown = await scraper.scrape(f"http://127.0.0.1:{port}/{name}", session)
+            recall, leak = quality(markdown)
+            naive_recall, naive_leak = quality(strip_tags(html))
+            print(
+                f"{name:<8}{len(html) / 1024:>6.0f}{recall:>9.0%}{leak:>7.0%}"
+                f"{naive_recall:>14.0%}{naive_leak:>12.0%}"
+            )
+
+        start = time.perf_counter()
+        for name in FIXTURES:
+            for _ in range(20):
+                extract_main_content(FIXTURES[name])
+        per_page = (time.perf_counter() - start) / (20 * len(FIXTURES))
+        print(f"\nextraction only: {per_page * 1000:.1f} ms/page")
+
+        names = list(FIXTURES)
+        semaphore = asyncio.Semaphore(10)
+
+        async def one(i: int):
+            async with semaphore:
+                url = f"http://127.0.0.1:{port}/{names[i % len(names)]}"
+                assert await scraper.scrape(url, get_http_session())
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(PAGES)))
+        elapsed = time.perf_counter() - start
+        print(
+            f"fetch + extract: {PAGES / elapsed:.0f} pages/s ({PAGES} pages, concurrency 10)"
+        )
+    finally:
+        await close_http_session()
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
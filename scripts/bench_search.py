@@ -0,0 +1,92 @@
+"""Benchmark: search latency with and without the search result cache.
+
+Starts a local stub search server with an artificial per-request latency
+standing in for Tavily, then runs the same set of queries twice through
+SearchService: once against an empty cache and once warm. Run from the
+repository root:
+
+    python scripts/bench_search.py [queries] [latency_ms]
+
+No external service is contacted.
+"""
+
+import asyncio
+import os
+import socket
+import sys
+import tempfile
+import time
+
+from aiohttp import web
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services.search_service import SearchService  # noqa: E402
+from src.url_crawler.http_session import close_http_session  # noqa: E402
+
+QUERIES = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+LATENCY = (int(sys.argv[2]) if len(sys.argv) > 2 else 300) / 1000
+
+
+def free_port() -> int:
+    """Return a local port nothing listens on."""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def main():
+    """Serve a slow stub search backend and time cold and warm query runs."""
+
+    async def handle(request: web.Request) -> web.Response:
+        body = await request.json()
+        await asyncio.sleep(LATENCY)
+        results = [
+            {
+                "url": f"https://example{i}.org/{body['query']}",
+                "title": "",
+                "content": "",
+            }
+            for i in range(body["max_results"])
+        ]
+        return web.json_response({"results": results})
+
+    port = free_port()
+    app = web.Application()
+    app.router.add_post("/search", handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+
+    queries = [f"Research the life of Person {i}" for i in range(QUERIES)]
+    with tempfile.TemporaryDirectory() as cache_dir:
+        config = {
+            "configurable": {
+                "search_backend": "stub",
+                "search_stub_url": f"http://127.0.0.1:{port}/search",
+                "search_cache_enabled": True,
+                "search_cache_dir": cache_dir,
+            }
+        }
+
+        async def run() -> float:
+            start = time.perf_counter()
+            for query in queries:
+                await SearchService.search(query, config, exclude_domains=["a.org"])
+            return (time.perf_counter() - start) / len(queries)
+
+        try:
+            cold = await run()
+            warm = await run()
+        finally:
+            await close_http_session()
+            await runner.cleanup()
+
+    print(f"{QUERIES} queries, backend latency {LATENCY * 1000:.0f} ms")
+    print(f"{'cache':<8}{'ms/query':>10}")
+    print(f"{'cold':<8}{cold * 1000:>10.1f}")
+    print(f"{'warm':<8}{warm * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
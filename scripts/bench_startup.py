@@ -0,0 +1,108 @@
+"""Benchmark: cold start of every graph entry point in langgraph.json.
+
+For each entry point a fresh interpreter runs `python -X importtime` on the
+module, and the report gives:
+
+- importtime: the total -X importtime reports for the whole probe (sum of
+  the self times; interpreter startup, the imports done by the first access
+  and the tracing overhead included)
+- import: wall time of the import alone
+- first access: wall time of the import plus the first access of the graph
+  attribute, which compiles it
+- heavy modules: the optional packages loaded by the import alone
+
+Run from the repository root, optionally against another checkout:
+
+    python scripts/bench_startup.py [repo_root]
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.abspath(
+    sys.argv[1] if len(sys.argv) > 1 else os.path.dirname(os.path.dirname(__file__))
+)
+HEAVY_MODULES = (
+    "langfuse",
+    "aiohttp",
+    "tiktoken",
+    "langchain_tavily",
+    "langchain.chat_models",
+)
+RUNS = 3
+
+PROBE = """
+import importlib, json, sys, time
+start = time.perf_counter()
+module = importlib.import_module({module!r})
+imported = time.perf_counter()
+heavy = [name for name in {heavy!r} if name in sys.modules]
+getattr(module, {attribute!r})
+print(json.dumps({{
+    "import_wall": imported - start,
+    "first_access": time.perf_counter() - start,
+    "heavy": heavy,
+}}))
+"""
+
+
+def entry_points() -> list[tuple[str, str, str]]:
+    """Return (name, module, attribute) of every graph in langgraph.json."""
+    with open(os.path.join(ROOT, "langgraph.json")) as f:
+        graphs = json.load(f)["graphs"]
+    entries = []
+    for name, spec in graphs.items():
+        path, attribute = spec.split(":")
+        module = path.removeprefix("./").removesuffix(".py").replace("/", ".")
+        entries.append((name, module, attribute))
+    return entries
+
+
+def import_time_total(stderr: str) -> float:
+    """Sum the self times (microseconds) of every module imported."""
+    total = 0
+    for line in stderr.splitlines():
+        if line.startswith("import time:") and "self [us]" not in line:
+            total += int(line.split("|")[0].split(":")[1])
+    return total / 1e6
+
+
+def measure(module: str, attribute: str) -> dict:
+    """Time importing module and first accessing attribute in fresh interpreters."""
+    code = PROBE.format(module=module, attribute=attribute, heavy=HEAVY_MODULES)
+    runs = []
+    for _ in range(RUNS):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        probe = json.loads(result.stdout.strip().splitlines()[-1])
+        probe["import"] = import_time_total(result.stderr)
+        runs.append(probe)
+    # Median of the runs, by first-access time
+    return sorted(runs, key=lambda run: run["first_access"])[RUNS // 2]
+
+
+def main() -> None:
+    """Print cold start times and heavy imports of every entry point."""
+    print(f"root={ROOT} (median of {RUNS} cold starts)\n")
+    print(
+        f"{'entry point':>20} {'importtime s':>12} {'import s':>9} "
+        f"{'first access s':>15}  heavy modules"
+    )
+    for name, module, attribute in entry_points():
+        result = measure(module, attribute)
+        print(
+            f"{name:>20} {result['import']:>12.2f} {result['import_wall']:>9.2f} "
+            f"{result['first_access']:>15.2f}  "
+            f"{', '.join(result['heavy']) or '-'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
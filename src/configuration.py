@@ -1,13 +1,17 @@
 import os
-from typing import Any
+from functools import lru_cache
+from typing import Any, Literal
 
 from langchain_core.runnables import RunnableConfig
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class Configuration(BaseModel):
     """Main configuration class for the Deep Research agent."""
 
+    # Frozen so resolved instances can be shared and used as cache keys
+    model_config = ConfigDict(frozen=True)
+
     # Single model for most providers (simplified configuration)
     llm_model: str = Field(
         default="google_genai:gemini-2.5-flash",
@@ -47,14 +51,20 @@ class Configuration(BaseModel):
 
     # Hardcoded values from graph files
     default_chunk_size: int = Field(
-        default=800, description="Default chunk size for text processing"
+        default=1000,
+        description="Chunk size in tokens when chunk_size_mode is 'fixed'",
     )
     default_overlap_size: int = Field(
-        default=20, description="Default overlap size between chunks"
+        default=20,
+        description="Overlap in tokens between chunks of the 'tokens' chunking strategy",
     )
     max_content_length: int = Field(
         default=100000, description="Maximum content length to process"
     )
+    max_content_tokens: int = Field(
+        default=25000,
+        description="Token budget for a scraped page; longer pages keep their sections most relevant to the research question",
+    )
     max_tool_iterations: int = Field(
         default=5, description="Maximum number of tool iterations"
     )
@@ -62,10 +72,242 @@ class Configuration(BaseModel):
         default=20,
         description="Maximum number of chunks to process for biographical event detection",
     )
+    chunking_strategy: Literal["markdown", "tokens"] = Field(
+        default="markdown",
+        description="Split pages into chunks of whole markdown sections and paragraphs, or into fixed overlapping token windows",
+    )
+    chunk_size_mode: Literal["fixed", "auto"] = Field(
+        default="fixed",
+        description="Use default_chunk_size, or size chunks per document so it takes the fewest calls that fit chunk_context_window",
+    )
+    chunk_context_window: int = Field(
+        default=8192,
+        description="Context window in tokens of the smallest model reading chunks (classifier or extraction); bounds auto-sized chunks together with the prompt and tools_llm_max_tokens",
+    )
+
+    # Chunk relevance classification
+    enable_rule_prefilter: bool = Field(
+        default=False,
+        description="Keep or drop chunks with a clear rule-based biographical score without calling the LLM (off until its recall is measured against the LLM classifier)",
+    )
+    rule_prefilter_accept_score: float = Field(
+        default=6.0,
+        description="Chunks scoring at or above this are kept without LLM classification",
+    )
+    rule_prefilter_reject_score: float = Field(
+        default=0.5,
+        description="Chunks scoring at or below this, with no year, date or life event, are dropped without LLM classification",
+    )
+    enable_chunk_dedup: bool = Field(
+        default=True,
+        description="Skip chunks that are near-duplicates of chunks already processed for the same person",
+    )
+    chunk_dedup_threshold: float = Field(
+        default=0.7,
+        description="Estimated Jaccard similarity (MinHash over word 5-grams) at which a chunk counts as a duplicate",
+    )
+    chunk_dedup_dir: str | None = Field(
+        default=None,
+        description="Directory to persist the per-person duplicate index across runs that start from earlier existing_events; per run otherwise",
+    )
+    enable_chunk_filter: bool = Field(
+        default=True,
+        description="Run the small-model relevance filter before extraction; disable to extract every chunk",
+    )
+    chunk_check_mode: Literal["single", "batched"] = Field(
+        default="single",
+        description="Classify chunks one request at a time, or pack several chunks into one request",
+    )
+    chunk_check_batch_token_budget: int = Field(
+        default=6000,
+        description="Maximum input tokens of chunk text packed into one batched classification request",
+    )
+    max_concurrent_chunk_checks: int = Field(
+        default=8,
+        description="Maximum number of chunk classification requests in flight at once",
+    )
+
+    max_concurrent_extractions: int = Field(
+        default=4,
+        description="Maximum number of chunk extraction requests in flight at once",
+    )
+    extraction_input_token_budget: int = Field(
+        default=3000,
+        description="Maximum tokens of chunk text packed into one extraction request; 0 sends one chunk per request",
+    )
+
+    url_selection_mode: Literal["llm", "local", "hybrid"] = Field(
+        default="llm",
+        description="Pick the URLs to crawl with the structured LLM, the local ranker, or the local ranker with an LLM tie-break when its top picks are close",
+    )
+    url_selection_margin: float = Field(
+        default=0.15,
+        description="In hybrid mode, the LLM is asked only when the last picked URL outscores the next one by less than this",
+    )
+    url_domain_priors_path: str | None = Field(
+        default=None,
+        description="JSON file of domain -> prior (-1 to 1) overriding the built-in domain reputation table",
+    )
+    url_crawl_mode: Literal["sequential", "pipelined"] = Field(
+        default="sequential",
+        description="Crawl the selected URLs one by one, or scrape and extract them all concurrently and merge once",
+    )
+    max_concurrent_url_crawls: int = Field(
+        default=4,
+        description="Maximum number of pages scraped and extracted at once in pipelined mode",
+    )
+
+    streaming_scrape: bool = Field(
+        default=False,
+        description="In pipelined mode, chunk each page and filter/extract its chunks while the page downloads (reads at most max_content_length characters); only the local scraper streams, Firecrawl pages are fetched whole first",
+    )
+
+    structure_events_token_budget: int = Field(
+        default=1500,
+        description="Maximum event tokens per structuring call; longer categories are split on bullet boundaries",
+    )
+
+    scraper_backend: Literal["firecrawl", "local"] = Field(
+        default="firecrawl",
+        description='Page scraper: "firecrawl" (Firecrawl API) or "local" (direct fetch + in-process main content extraction)',
+    )
+
+    # Shared HTTP connection pool used for scraping
+    http_pool_limit: int = Field(
+        default=20,
+        description="Maximum open connections in the shared scraping session (0 disables the limit)",
+    )
+    http_pool_limit_per_host: int = Field(
+        default=10,
+        description="Maximum open connections per host in the shared scraping session (0 disables the limit)",
+    )
+    http_keepalive_seconds: float = Field(
+        default=30.0,
+        description="How long idle pooled connections are kept open for reuse",
+    )
+
+    # Per-host politeness scheduler for crawl requests
+    crawl_max_concurrency: int = Field(
+        default=16,
+        description="Maximum crawl requests in flight at once across all hosts and runs",
+    )
+    crawl_max_per_host: int = Field(
+        default=2,
+        description="Maximum crawl requests in flight at once to one website",
+    )
+    crawl_min_interval_seconds: float = Field(
+        default=0.5,
+        description="Minimum spacing between the starts of two requests to the same website",
+    )
+    crawl_api_max_concurrency: int = Field(
+        default=10,
+        description="Maximum requests in flight at once to a scraping API (Firecrawl), without spacing",
+    )
+    crawl_max_retries: int = Field(
+        default=2,
+        description="Retries of a page after a 429/503 response; the host is cooled down first",
+    )
+    crawl_max_retry_after_seconds: float = Field(
+        default=120.0,
+        description="Upper bound on a host cooldown, whatever Retry-After asks for",
+    )
+
+    # Scraped page cache
+    page_cache_enabled: bool = Field(
+        default=False,
+        description="Cache scraped pages on disk keyed by scraper backend and canonical URL",
+    )
+    page_cache_dir: str = Field(
+        default=".cache/pages",
+        description="Directory holding the compressed page cache",
+    )
+    page_cache_ttl_seconds: int = Field(
+        default=3 * 24 * 3600,
+        description="Time after which a cached page is considered stale (0 disables expiry)",
+    )
+    page_cache_stale_seconds: int = Field(
+        default=0,
+        description="Stale-while-revalidate window: stale pages younger than TTL + this are served while refreshed in the background",
+    )
+    page_cache_max_bytes: int = Field(
+        default=512 * 1024 * 1024,
+        description="Size cap of the compressed page cache; least recently read pages are evicted first (0 disables the cap)",
+    )
+
+    # Web search (url_finder, simple_search_node)
+    search_backend: Literal["tavily", "stub"] = Field(
+        default="tavily",
+        description="Search backend: the Tavily API, or a local stub server at search_stub_url",
+    )
+    search_stub_url: str = Field(
+        default="http://127.0.0.1:8765/search",
+        description="Endpoint of the stub search server used by the 'stub' backend",
+    )
+    search_cache_enabled: bool = Field(
+        default=False,
+        description="Cache search results on disk keyed by normalized query, topic, max_results and excluded domains",
+    )
+    search_cache_dir: str = Field(
+        default=".cache/search",
+        description="Directory holding the search result cache",
+    )
+    search_cache_ttl_seconds: int = Field(
+        default=24 * 3600,
+        description="Time to live of cached search results in seconds (0 disables expiry)",
+    )
+
+    # LLM response cache (opt-in)
+    llm_cache_enabled: bool = Field(
+        default=False,
+        description="Cache LLM responses on disk keyed by model, tools/schema, max_tokens and prompt",
+    )
+    llm_cache_path: str = Field(
+        default=".cache/llm_cache.sqlite",
+        description="SQLite file used for the LLM response cache",
+    )
+    llm_cache_ttl_seconds: int = Field(
+        default=7 * 24 * 3600,
+        description="Time to live of cached LLM responses in seconds (0 disables expiry)",
+    )
+    llm_cache_max_bytes: int = Field(
+        default=256 * 1024 * 1024,
+        description="Size cap of the LLM response cache; least recently used entries are evicted first (0 disables the cap)",
+    )
+
+    # Shared per-provider rate limits for every model built by llm_service
+    llm_requests_per_minute: int = Field(
+        default=0,
+        description="Requests per minute allowed per provider, shared across runs (0 disables the limit)",
+    )
+    llm_tokens_per_minute: int = Field(
+        default=0,
+        description="Estimated prompt + reported completion tokens per minute allowed per provider (0 disables the limit)",
+    )
+    llm_max_concurrency_per_model: int = Field(
+        default=16,
+        description="Maximum requests in flight per model across the process (0 disables the limit)",
+    )
+    llm_max_backoff_seconds: float = Field(
+        default=60.0,
+        description="Upper bound of the shared cool-down applied after 429/5xx responses",
+    )
+
+    # Token, latency and cost accounting
+    usage_tracking_enabled: bool = Field(
+        default=True,
+        description="Aggregate token usage, latency and cost per node, model and run",
+    )
+    usage_report_dir: str | None = Field(
+        default=None,
+        description="Directory where a JSON usage report is written when each run ends",
+    )
+    usage_price_table_path: str | None = Field(
+        default=None,
+        description='JSON file of {"model": {"input": usd_per_1m, "output": usd_per_1m}} overriding the built-in prices',
+    )
 
     def get_llm_structured_model(self) -> str:
         """Get the LLM structured model, using overrides if provided."""
-        print(f"Getting LLM structured model: {self.structured_llm_model}")
         if self.structured_llm_model:
             return self.structured_llm_model
 
@@ -73,7 +315,6 @@ class Configuration(BaseModel):
 
     def get_llm_with_tools_model(self) -> str:
         """Get the LLM with tools model, using overrides if provided."""
-        print(f"Getting LLM with tools model: {self.tools_llm_model}")
         if self.tools_llm_model:
             return self.tools_llm_model
 
@@ -89,11 +330,37 @@ class Configuration(BaseModel):
     def from_runnable_config(
         cls, config: RunnableConfig | None = None
     ) -> "Configuration":
-        """Create a Configuration instance from a RunnableConfig."""
+        """Create a Configuration instance from a RunnableConfig.
+
+        Resolution is cached per distinct set of configurable values, so the
+        environment is read once per configuration rather than on every node call.
+        Call `Configuration.clear_cache()` after changing environment variables.
+        """
         configurable = config.get("configurable", {}) if config else {}
-        field_names = list(cls.model_fields.keys())
-        values: dict[str, Any] = {
-            field_name: os.environ.get(field_name.upper(), configurable.get(field_name))
-            for field_name in field_names
-        }
-        return cls(**{k: v for k, v in values.items() if v is not None})
+        configured = tuple(
+            (field_name, configurable.get(field_name))
+            for field_name in cls.model_fields
+            if configurable.get(field_name) is not None
+        )
+        try:
+            return _resolve_configuration(cls, configured)
+        except TypeError:
+            # Unhashable configurable values cannot be cached
+            return _resolve_configuration.__wrapped__(cls, configured)
+
+    @staticmethod
+    def clear_cache() -> None:
+        """Forget cached resolutions, e.g. after environment variables change."""
+        _resolve_configuration.cache_clear()
+
+
+@lru_cache(maxsize=256)
+def _resolve_configuration(
+    cls: type[Configuration], configured: tuple[tuple[str, Any], ...]
+) -> Configuration:
+    configurable = dict(configured)
+    values: dict[str, Any] = {
+        field_name: os.environ.get(field_name.upper(), configurable.get(field_name))
+        for field_name in cls.model_fields
+    }
+    return cls(**{k: v for k, v in values.items() if v is not None})
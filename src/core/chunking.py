@@ -0,0 +1,366 @@
+"""Token chunking: fixed token windows, or structure-aware markdown chunks.
+
+For token windows the document is encoded once. Token boundaries are then
+mapped to character offsets in the original string, and each chunk is a
+`TextChunk` holding those offsets. Nothing is decoded: a chunk's text is a
+plain slice of the source, taken only when it is read. A window edge that
+falls inside a multi-byte character is rounded to a character boundary, and
+the same rounding is used for starts and ends, so characters are never split
+or duplicated between adjacent windows.
+
+Markdown chunks (`chunk_markdown`) instead follow the page structure: whole
+sections and paragraphs are packed into token-budgeted chunks, and only the
+headings a chunk starts under are repeated.
+
+`auto_chunk_size` picks a chunk size from the document length and the room
+a model call leaves for the chunk.
+"""
+
+import math
+import os
+import re
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+# UTF-8 continuation bytes (10xxxxxx) never start a character
+CONTINUATION_BYTES = bytes(range(0x80, 0xC0))
+
+
+@dataclass(frozen=True)
+class TextChunk:
+    """A window of a document, held as offsets into the original text."""
+
+    source: str
+    start: int  # character offsets
+    end: int
+    token_start: int  # token offsets
+    token_end: int
+
+    @property
+    def text(self) -> str:
+        """The chunk's text, sliced from the source on access."""
+        return self.source[self.start : self.end]
+
+    @property
+    def token_count(self) -> int:
+        """Number of tokens in the chunk."""
+        return self.token_end - self.token_start
+
+    def __str__(self) -> str:
+        """Return the chunk's text."""
+        return self.text
+
+    def __len__(self) -> int:
+        """Return the chunk's length in characters."""
+        return self.end - self.start
+
+
+def window_starts(token_count: int, chunk_size: int, overlap_size: int) -> range:
+    """Token index of every window start.
+
+    A trailing window that would hold only overlap tokens is left out.
+    """
+    if chunk_size <= overlap_size:
+        raise ValueError("chunk_size must be larger than overlap_size")
+    step = chunk_size - overlap_size
+    return range(0, max(token_count - overlap_size, 1), step)
+
+
+def token_char_offsets(
+    text: str, tokens: Sequence[int], encoding, indices: Iterable[int]
+) -> Dict[int, int]:
+    """Map token boundary indices (0..len(tokens)) to character offsets in text.
+
+    Only the bytes between consecutive requested boundaries are materialized,
+    one segment at a time. Raises ValueError if the tokens do not spell out
+    text exactly.
+    """
+    indices = sorted(set(indices) | {len(tokens)})
+    ascii_only = text.isascii()
+    offsets = {}
+    chars = previous = 0
+    for index in indices:
+        segment = encoding.decode_bytes(tokens[previous:index])
+        # Characters before a boundary = bytes before it that start a character
+        chars += (
+            len(segment)
+            if ascii_only
+            else len(segment.translate(None, CONTINUATION_BYTES))
+        )
+        offsets[index] = chars
+        previous = index
+    if chars != len(text):
+        raise ValueError("tokens do not match the text")
+    return offsets
+
+
+def _chunks_from_tokens(
+    text: str, tokens: Sequence[int], encoding, chunk_size: int, overlap_size: int
+) -> List[TextChunk]:
+    windows = [
+        (start, min(start + chunk_size, len(tokens)))
+        for start in window_starts(len(tokens), chunk_size, overlap_size)
+    ]
+    try:
+        offsets = token_char_offsets(
+            text, tokens, encoding, [edge for window in windows for edge in window]
+        )
+    except ValueError:
+        # The encoder rewrote the text (e.g. lone surrogates): decode instead
+        return [
+            TextChunk(chunk, 0, len(chunk), start, end)
+            for start, end in windows
+            for chunk in [encoding.decode(tokens[start:end])]
+        ]
+
+    return [
+        TextChunk(text, offsets[start], offsets[end], start, end)
+        for start, end in windows
+    ]
+
+
+def chunk_by_tokens(
+    text: str, encoding, chunk_size: int = 1000, overlap_size: int = 20
+) -> List[TextChunk]:
+    """Split text into overlapping windows of chunk_size tokens."""
+    if not text:
+        return []
+    tokens = encoding.encode_ordinary(text)
+    return _chunks_from_tokens(text, tokens, encoding, chunk_size, overlap_size)
+
+
+def chunk_many_by_tokens(
+    texts: Sequence[str],
+    encoding,
+    chunk_size: int = 1000,
+    overlap_size: int = 20,
+    num_threads: int | None = None,
+) -> List[List[TextChunk]]:
+    """Chunk several documents, encoding them in one multi-threaded batch.
+
+    num_threads defaults to the number of CPUs, at most 8.
+    """
+    threads = num_threads or min(8, os.cpu_count() or 1)
+    token_lists = encoding.encode_ordinary_batch(list(texts), num_threads=threads)
+    return [
+        _chunks_from_tokens(text, tokens, encoding, chunk_size, overlap_size)
+        if text
+        else []
+        for text, tokens in zip(texts, token_lists)
+    ]
+
+
+HEADING_LINE = re.compile(r"^(#{1,6})\s+\S.*$", re.MULTILINE)
+PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+LINE_BREAK = re.compile(r"\n")
+SENTENCE_BREAK = re.compile(r"(?<=[.!?])\s+")
+
+# Oversized text is split on these, coarsest first
+SPLIT_LEVELS = (PARAGRAPH_BREAK, LINE_BREAK, SENTENCE_BREAK)
+
+# Joins the blocks of a chunk
+SEPARATOR = "\n\n"
+
+# A paragraph that does not fit is split between sentences to fill the chunk
+# when at least this share of the chunk is still free
+MIN_FILL_SHARE = 0.1
+
+
+@dataclass(frozen=True)
+class MarkdownBlock:
+    """A paragraph (or smaller piece) of a markdown section."""
+
+    text: str
+    tokens: int
+    # Headings the block sits under that are not part of its text
+    context: Tuple[str, ...]
+    heading: str = ""  # the section heading the text starts with, if any
+
+
+def markdown_sections(text: str) -> List[Tuple[Tuple[str, ...], str, str]]:
+    """Split markdown into (parent headings, heading, body) triples.
+
+    The parent headings are the enclosing headings of higher levels, e.g.
+    ("# Ada Lovelace",) for a "## Early life" section.
+    """
+    sections = []
+    trail: List[Tuple[int, str]] = []
+    matches = list(HEADING_LINE.finditer(text))
+    preamble = text[: matches[0].start()] if matches else text
+    if preamble.strip():
+        sections.append(((), "", preamble.strip()))
+    for match, following in zip(matches, matches[1:] + [None]):
+        level = len(match.group(1))
+        while trail and trail[-1][0] >= level:
+            trail.pop()
+        body = text[match.end() : following.start() if following else len(text)]
+        sections.append(
+            (tuple(h for _, h in trail), match.group(0).strip(), body.strip())
+        )
+        trail.append((level, match.group(0).strip()))
+    return sections
+
+
+def split_to_budget(text: str, encoding, budget: int, level: int = 0) -> List[str]:
+    """Split text on the coarsest boundaries that bring every piece under budget.
+
+    Only a single sentence longer than the budget is cut at token boundaries.
+    """
+    if len(encoding.encode_ordinary(text)) <= budget:
+        return [text]
+    if level == len(SPLIT_LEVELS):
+        return [
+            chunk.text.strip() for chunk in chunk_by_tokens(text, encoding, budget, 0)
+        ]
+    pieces = []
+    for part in SPLIT_LEVELS[level].split(text):
+        part = part.strip()
+        if part:
+            pieces.extend(split_to_budget(part, encoding, budget, level + 1))
+    return pieces
+
+
+def markdown_blocks(text: str, encoding, chunk_size: int) -> List[MarkdownBlock]:
+    """Break markdown into whole paragraphs, each with its heading context.
+
+    A section's heading is attached to its first paragraph so the two always
+    land in the same chunk.
+    """
+    blocks = []
+    separator_tokens = len(encoding.encode_ordinary(SEPARATOR))
+    for parents, heading, body in markdown_sections(text):
+        own = (heading,) if heading else ()
+        context_tokens = sum(len(encoding.encode_ordinary(h)) for h in parents + own)
+        budget = max(chunk_size - context_tokens - separator_tokens, 1)
+        pieces = []
+        for paragraph in PARAGRAPH_BREAK.split(body):
+            paragraph = paragraph.strip()
+            if paragraph:
+                pieces.extend(split_to_budget(paragraph, encoding, budget))
+
+        if heading:
+            first = f"{heading}{SEPARATOR}{pieces[0]}" if pieces else heading
+            if pieces and len(encoding.encode_ordinary(first)) > budget:
+                blocks.append(
+                    MarkdownBlock(
+                        heading, len(encoding.encode_ordinary(heading)), parents
+                    )
+                )
+            else:
+                pieces = pieces[1:]
+                blocks.append(
+                    MarkdownBlock(
+                        first, len(encoding.encode_ordinary(first)), parents, heading
+                    )
+                )
+        for piece in pieces:
+            blocks.append(
+                MarkdownBlock(
+                    piece, len(encoding.encode_ordinary(piece)), parents + own
+                )
+            )
+    return blocks
+
+
+def _split_block(
+    block: MarkdownBlock, room: int, encoding
+) -> Tuple[MarkdownBlock, MarkdownBlock] | None:
+    """Split block after its last whole sentence that fits in room tokens."""
+    breaks = list(SENTENCE_BREAK.finditer(block.text))
+    ends = [match.start() for match in breaks] + [len(block.text)]
+    starts = [0] + [match.end() for match in breaks]
+    separator_tokens = len(encoding.encode_ordinary(SEPARATOR))
+    used = fitting = 0
+    for start, end in zip(starts, ends):
+        used += len(encoding.encode_ordinary(block.text[start:end])) + separator_tokens
+        if used > room:
+            break
+        fitting += 1
+    if not fitting or fitting == len(starts):
+        return None
+    head = block.text[: ends[fitting - 1]]
+    tail = block.text[starts[fitting] :]
+    tail_context = block.context + ((block.heading,) if block.heading else ())
+    return (
+        MarkdownBlock(head, len(encoding.encode_ordinary(head)), block.context),
+        MarkdownBlock(tail, len(encoding.encode_ordinary(tail)), tail_context),
+    )
+
+
+def chunk_markdown(text: str, encoding, chunk_size: int = 1000) -> List[str]:
+    """Pack whole markdown sections and paragraphs into chunks of chunk_size tokens.
+
+    Blocks are packed greedily in document order, so small sections share a
+    chunk. A paragraph that overflows a chunk moves to the next one, or, if
+    much of the chunk is still free, is split between two sentences. No
+    sentence is split (unless it alone exceeds chunk_size) and nothing is
+    repeated, except that a chunk starting inside a section begins with the
+    headings it sits under. Token counts add up the blocks, so a chunk can be
+    off by a token or so where blocks meet.
+    """
+    chunks = []
+    current: List[str] = []
+    current_tokens = 0
+    separator_tokens = len(encoding.encode_ordinary(SEPARATOR))
+    pending = deque(markdown_blocks(text, encoding, chunk_size))
+    while pending:
+        block = pending.popleft()
+        if current and current_tokens + separator_tokens + block.tokens > chunk_size:
+            room = chunk_size - current_tokens - separator_tokens
+            split = (
+                _split_block(block, room, encoding)
+                if room >= MIN_FILL_SHARE * chunk_size
+                else None
+            )
+            if split is not None:
+                block, rest = split
+                pending.appendleft(rest)
+            else:
+                chunks.append(SEPARATOR.join(current))
+                current, current_tokens = [], 0
+        if not current and block.context:
+            context = "\n".join(block.context)
+            context_tokens = len(encoding.encode_ordinary(context))
+            if context_tokens + separator_tokens + block.tokens <= chunk_size:
+                current, current_tokens = [context], context_tokens
+        if current:
+            current_tokens += separator_tokens
+        current.append(block.text)
+        current_tokens += block.tokens
+    if current:
+        chunks.append(SEPARATOR.join(current))
+    return chunks
+
+
+# Markdown chunks come out a little smaller than their budget (only whole
+# paragraphs are packed), so an auto-sized budget is padded by this much
+AUTO_PACKING_SLACK = 1.1
+
+# Smallest chunk size the auto mode will pick, however small the window
+MIN_AUTO_CHUNK_SIZE = 256
+
+
+def max_chunk_size_for_window(
+    context_window: int, overhead_tokens: int, output_tokens: int
+) -> int:
+    """Largest chunk that fits a model call next to its prompt and its answer."""
+    return max(context_window - overhead_tokens - output_tokens, MIN_AUTO_CHUNK_SIZE)
+
+
+def auto_chunk_size(
+    document_tokens: int, max_chunk_size: int, overlap_size: int = 0
+) -> int:
+    """Pick the chunk size that covers a document in the fewest calls.
+
+    Every call pays the same prompt overhead, so the fewest chunks that fit
+    in max_chunk_size minimize both calls and input tokens. The document is
+    then spread evenly over that many chunks, rather than leaving a small
+    last chunk that costs a whole call for little text.
+    """
+    if document_tokens <= max_chunk_size:
+        return max_chunk_size
+    step = max_chunk_size - overlap_size
+    calls = math.ceil((document_tokens - overlap_size) / step)
+    even = math.ceil((document_tokens - overlap_size) / calls) + overlap_size
+    return min(math.ceil(even * AUTO_PACKING_SLACK), max_chunk_size)
@@ -0,0 +1,329 @@
+"""Persistent, content-addressed cache for LLM calls.
+
+Entries are stored in a single SQLite file and keyed by a hash of the model
+name, the bound tools / structured-output schema, max_tokens and the rendered
+prompt. Eviction is TTL based plus LRU once the configured size cap is hit.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Sequence, Tuple, Type
+
+from langchain_core.messages import (
+    BaseMessage,
+    convert_to_messages,
+    messages_from_dict,
+    messages_to_dict,
+)
+from langchain_core.prompt_values import PromptValue
+from langchain_core.runnables import Runnable, RunnableConfig
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+
+def describe_tools(tools: Sequence[Any]) -> List[Dict[str, Any]]:
+    """Return a stable, JSON-serializable description of the bound tools."""
+    return [convert_to_openai_tool(t) for t in tools]
+
+
+def describe_schema(schema: Type[BaseModel] | None) -> Dict[str, Any] | None:
+    """Return a stable, JSON-serializable description of a structured-output schema."""
+    if schema is None:
+        return None
+    return {"name": schema.__name__, "schema": schema.model_json_schema()}
+
+
+def render_prompt(model_input: Any) -> str:
+    """Render a model input (str, PromptValue or message list) to a canonical string."""
+    if isinstance(model_input, str):
+        return model_input
+    if isinstance(model_input, PromptValue):
+        messages = model_input.to_messages()
+    elif isinstance(model_input, Sequence):
+        messages = convert_to_messages(model_input)
+    else:
+        return repr(model_input)
+
+    rendered = []
+    for message in messages:
+        rendered.append(
+            {
+                "type": message.type,
+                "content": message.content,
+                "name": message.name,
+                "tool_calls": getattr(message, "tool_calls", None),
+                "tool_call_id": getattr(message, "tool_call_id", None),
+            }
+        )
+    return json.dumps(rendered, sort_keys=True, default=str)
+
+
+def build_cache_key(
+    model_name: str, max_tokens: int, descriptor: Any, prompt: str
+) -> str:
+    """Hash every input that can change the model output into a cache key."""
+    payload = json.dumps(
+        {
+            "model": model_name,
+            "max_tokens": max_tokens,
+            "descriptor": descriptor,
+            "prompt": prompt,
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """SQLite-backed key/value store with TTL and LRU size-capped eviction."""
+
+    def __init__(self, path: str, ttl_seconds: int = 0, max_bytes: int = 0):
+        """Open the SQLite file at path, creating its directory and table."""
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_entries_accessed ON entries(accessed_at)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> str | None:
+        """Return the cached value for key, or None on a miss or expired entry."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            value, created_at = row
+            if self.ttl_seconds and now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._conn.commit()
+                self.evictions += 1
+                self.misses += 1
+                return None
+
+            self._conn.execute(
+                "UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        """Store value under key and evict entries until the size cap holds."""
+        now = time.time()
+        size = len(value.encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO entries (key, value, size, created_at, accessed_at)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (key, value, size, now, now),
+            )
+            self.writes += 1
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float) -> None:
+        if self.ttl_seconds:
+            cursor = self._conn.execute(
+                "DELETE FROM entries WHERE created_at < ?", (now - self.ttl_seconds,)
+            )
+            self.evictions += max(cursor.rowcount, 0)
+
+        if not self.max_bytes:
+            return
+
+        (total,) = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()
+        if total <= self.max_bytes:
+            return
+
+        # Drop least recently used entries until we are back under the cap
+        to_free = total - self.max_bytes
+        stale_keys = []
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM entries ORDER BY accessed_at ASC"
+        ):
+            stale_keys.append((key,))
+            to_free -= size
+            if to_free <= 0:
+                break
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", stale_keys)
+        self.evictions += len(stale_keys)
+
+    def clear(self) -> None:
+        """Remove every entry and reset the counters."""
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+            self._conn.commit()
+            self.hits = self.misses = self.writes = self.evictions = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current on-disk usage."""
+        with self._lock:
+            entries, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "entries": entries,
+            "bytes": total,
+        }
+
+
+_caches: Dict[Tuple[str, int, int], LLMCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_llm_cache(path: str, ttl_seconds: int = 0, max_bytes: int = 0) -> LLMCache:
+    """Return the process-wide cache for path, creating it on first use.
+
+    Each combination of limits gets its own cache, so a later configuration
+    with another TTL or size cap is not served by an earlier one.
+    """
+    key = (path, ttl_seconds, max_bytes)
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = LLMCache(path, ttl_seconds=ttl_seconds, max_bytes=max_bytes)
+            _caches[key] = cache
+        return cache
+
+
+def _encode_output(output: Any) -> str | None:
+    if isinstance(output, BaseMessage):
+        return json.dumps({"kind": "message", "data": messages_to_dict([output])})
+    if isinstance(output, BaseModel):
+        return json.dumps({"kind": "model", "data": output.model_dump(mode="json")})
+    if isinstance(output, dict):
+        return json.dumps({"kind": "json", "data": output})
+    # Anything else (e.g. a failed structured parse returning None) is not cached
+    return None
+
+
+def _decode_output(value: str, response_schema: Type[BaseModel] | None) -> Any:
+    payload = json.loads(value)
+    kind = payload["kind"]
+    if kind == "message":
+        return messages_from_dict(payload["data"])[0]
+    if kind == "model":
+        if response_schema is None:
+            return payload["data"]
+        return response_schema.model_validate(payload["data"])
+    return payload["data"]
+
+
+class CachedRunnable(Runnable):
+    """Wraps a configured model chain and serves repeated prompts from the cache."""
+
+    def __init__(
+        self,
+        bound: Runnable,
+        cache: LLMCache,
+        model_name: str,
+        max_tokens: int,
+        descriptor: Any = None,
+        response_schema: Type[BaseModel] | None = None,
+    ):
+        """Serve bound's outputs from cache, keyed by model, limits and descriptor."""
+        self.bound = bound
+        self.cache = cache
+        self.model_name = model_name
+        self.max_tokens = max_tokens
+        self.descriptor = descriptor
+        self.response_schema = response_schema
+
+    def _key(self, model_input: Any) -> str:
+        return build_cache_key(
+            self.model_name,
+            self.max_tokens,
+            self.descriptor,
+            render_prompt(model_input),
+        )
+
+    def _lookup(self, key: str) -> Any:
+        try:
+            value = self.cache.get(key)
+            if value is not None:
+                return _decode_output(value, self.response_schema)
+        except (sqlite3.Error, ValueError, KeyError) as e:
+            logger.warning("LLM cache read failed: %s", e)
+        return None
+
+    def _store(self, key: str, output: Any) -> None:
+        value = _encode_output(output)
+        if value is None:
+            return
+        try:
+            self.cache.set(key, value)
+        except sqlite3.Error as e:
+            logger.warning("LLM cache write failed: %s", e)
+
+    def invoke(
+        self, input: Any, config: RunnableConfig | None = None, **kwargs: Any
+    ) -> Any:
+        """Return the cached output for input, calling the model on a miss."""
+        key = self._key(input)
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached
+
+        output = self.bound.invoke(input, config, **kwargs)
+        self._store(key, output)
+        return output
+
+    async def ainvoke(
+        self, input: Any, config: RunnableConfig | None = None, **kwargs: Any
+    ) -> Any:
+        """Async variant of invoke; SQLite access runs off the event loop."""
+        key = self._key(input)
+        cached = await asyncio.to_thread(self._lookup, key)
+        if cached is not None:
+            return cached
+
+        output = await self.bound.ainvoke(input, config, **kwargs)
+        await asyncio.to_thread(self._store, key, output)
+        return output
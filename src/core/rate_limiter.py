@@ -0,0 +1,404 @@
+"""Process-wide, provider-aware rate limiting for LLM calls.
+
+Every model built by `llm_service` is wrapped in a `GovernedRunnable` that goes
+through the `ProviderGovernor` of its provider before each attempt:
+
+- a requests/min and a tokens/min token bucket shared by all models of the provider
+- a max in-flight limit per model
+- an adaptive cool-down after 429/5xx responses, shared by every caller, so a
+  burst of concurrent runs backs off together instead of hammering the API
+"""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from typing import Any, Dict, Tuple
+
+from langchain_core.runnables import Runnable, RunnableConfig
+from src.core.llm_cache import render_prompt
+
+logger = logging.getLogger(__name__)
+
+# Rough characters-per-token ratio used to reserve tokens before a call;
+# the bucket is reconciled with the reported usage afterwards
+CHARS_PER_TOKEN = 4
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504, 529}
+
+
+class TokenBucket:
+    """Refills `per_minute` units per minute; a limit of 0 means unlimited."""
+
+    def __init__(self, per_minute: int):
+        """Start with a full bucket."""
+        self.per_minute = per_minute
+        self._tokens = float(per_minute)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def set_rate(self, per_minute: int) -> None:
+        """Change the limit in place, keeping the units already taken."""
+        with self._lock:
+            now = time.monotonic()
+            if self.per_minute > 0:
+                self._refill(now)
+                # Keep what is used, not what is left: a higher limit adds room
+                self._tokens += per_minute - self.per_minute
+            else:
+                self._tokens = float(per_minute)
+            self._tokens = min(self._tokens, float(per_minute))
+            self._updated = now
+            self.per_minute = per_minute
+
+    def _refill(self, now: float) -> None:
+        rate = self.per_minute / 60.0
+        self._tokens = min(
+            float(self.per_minute), self._tokens + (now - self._updated) * rate
+        )
+        self._updated = now
+
+    def try_acquire(self, amount: float) -> float:
+        """Take `amount` units if available; otherwise return the seconds to wait."""
+        if self.per_minute <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            # A request bigger than the whole bucket may go once the bucket is full
+            needed = min(amount, float(self.per_minute))
+            if self._tokens >= needed:
+                self._tokens -= amount
+                return 0.0
+            return (needed - self._tokens) / (self.per_minute / 60.0)
+
+    def consume(self, amount: float) -> None:
+        """Adjust the bucket after the fact (negative amounts give units back)."""
+        if self.per_minute <= 0:
+            return
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(float(self.per_minute), self._tokens - amount)
+
+    async def acquire(self, amount: float = 1) -> float:
+        """Wait until `amount` units are available; return the time spent waiting."""
+        waited = 0.0
+        while (delay := self.try_acquire(amount)) > 0:
+            await asyncio.sleep(delay)
+            waited += delay
+        return waited
+
+    def acquire_sync(self, amount: float = 1) -> float:
+        """Blocking variant of acquire."""
+        waited = 0.0
+        while (delay := self.try_acquire(amount)) > 0:
+            time.sleep(delay)
+            waited += delay
+        return waited
+
+
+def get_status_code(error: BaseException) -> int | None:
+    """Extract an HTTP status code from provider SDK exceptions, if there is one."""
+    for candidate in (
+        getattr(error, "status_code", None),
+        getattr(error, "code", None),
+        getattr(getattr(error, "response", None), "status_code", None),
+    ):
+        if isinstance(candidate, int):
+            return candidate
+    message = str(error)
+    if "429" in message or "RESOURCE_EXHAUSTED" in message:
+        return 429
+    return None
+
+
+def get_retry_after(error: BaseException) -> float | None:
+    """Return the Retry-After delay in seconds advertised by the provider, if any."""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    value = headers.get("retry-after") if hasattr(headers, "get") else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class ProviderGovernor:
+    """Shared request/token budgets, in-flight limits and back-off for one provider."""
+
+    def __init__(
+        self,
+        provider: str,
+        requests_per_minute: int = 0,
+        tokens_per_minute: int = 0,
+        max_in_flight_per_model: int = 0,
+        max_backoff_seconds: float = 60.0,
+    ):
+        """Create the budgets of provider; 0 disables a limit."""
+        self.provider = provider
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_in_flight_per_model = max_in_flight_per_model
+        self.max_backoff_seconds = max_backoff_seconds
+        self._cooldown_until = 0.0
+        self._consecutive_failures = 0
+        self._lock = threading.Lock()
+        # Per-model semaphores of each event loop, by loop id (pruned once closed)
+        self._async_slots: Dict[
+            int, Tuple[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]
+        ] = {}
+        self._sync_slots: Dict[str, threading.Semaphore] = {}
+        self._in_flight = 0
+        self._slots_outdated = False
+        self.stats = {"calls": 0, "throttled": 0, "wait_seconds": 0.0}
+
+    def configure(
+        self,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        max_in_flight_per_model: int,
+        max_backoff_seconds: float,
+    ) -> None:
+        """Apply new limits, keeping the shared back-off state and token accounting.
+
+        The buckets are updated in place. A new in-flight limit applies once
+        no call is in flight: until then calls keep the current semaphores.
+        """
+        if self.requests.per_minute != requests_per_minute:
+            self.requests.set_rate(requests_per_minute)
+        if self.tokens.per_minute != tokens_per_minute:
+            self.tokens.set_rate(tokens_per_minute)
+        with self._lock:
+            if self.max_in_flight_per_model != max_in_flight_per_model:
+                self.max_in_flight_per_model = max_in_flight_per_model
+                self._slots_outdated = True
+                self._reset_slots_if_idle()
+            self.max_backoff_seconds = max_backoff_seconds
+
+    # --- in-flight slots ----------------------------------------------------
+
+    def _reset_slots_if_idle(self) -> None:
+        # Called with self._lock held
+        if self._slots_outdated and self._in_flight == 0:
+            self._async_slots.clear()
+            self._sync_slots.clear()
+            self._slots_outdated = False
+
+    def _enter(self) -> None:
+        with self._lock:
+            self._in_flight += 1
+
+    def _exit(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            self._reset_slots_if_idle()
+
+    def _async_slot(self, model: str) -> asyncio.Semaphore | None:
+        if self.max_in_flight_per_model <= 0 and not self._slots_outdated:
+            return None
+        # asyncio primitives are bound to the loop they are used on
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            for key, (other_loop, _) in list(self._async_slots.items()):
+                if other_loop.is_closed():
+                    del self._async_slots[key]
+            entry = self._async_slots.get(id(loop))
+            if entry is None or entry[0] is not loop:
+                entry = self._async_slots[id(loop)] = (loop, {})
+            slots = entry[1]
+            if model not in slots:
+                if self.max_in_flight_per_model <= 0:
+                    return None
+                slots[model] = asyncio.Semaphore(self.max_in_flight_per_model)
+            return slots[model]
+
+    def _sync_slot(self, model: str) -> threading.Semaphore | None:
+        if self.max_in_flight_per_model <= 0 and not self._slots_outdated:
+            return None
+        with self._lock:
+            if model not in self._sync_slots:
+                if self.max_in_flight_per_model <= 0:
+                    return None
+                self._sync_slots[model] = threading.Semaphore(
+                    self.max_in_flight_per_model
+                )
+            return self._sync_slots[model]
+
+    # --- back-off -----------------------------------------------------------
+
+    def cooldown_remaining(self) -> float:
+        """Seconds until calls to this provider may resume."""
+        return max(0.0, self._cooldown_until - time.monotonic())
+
+    def record_success(self) -> None:
+        """Reset the back-off after a successful call."""
+        with self._lock:
+            self._consecutive_failures = 0
+
+    def record_failure(self, error: BaseException) -> None:
+        """Start or extend the shared cool-down after a throttling or server error."""
+        if get_status_code(error) not in RETRYABLE_STATUS_CODES:
+            return
+        with self._lock:
+            self._consecutive_failures += 1
+            delay = get_retry_after(error)
+            if delay is None:
+                delay = min(
+                    self.max_backoff_seconds, 2 ** (self._consecutive_failures - 1)
+                )
+                delay *= random.uniform(0.8, 1.2)
+            self._cooldown_until = max(self._cooldown_until, time.monotonic() + delay)
+            self.stats["throttled"] += 1
+        logger.warning(
+            "%s: backing off %.1fs after %s",
+            self.provider,
+            delay,
+            type(error).__name__,
+        )
+
+    # --- admission ----------------------------------------------------------
+
+    async def _admit(self, estimated_tokens: int) -> None:
+        waited = 0.0
+        while (cooldown := self.cooldown_remaining()) > 0:
+            await asyncio.sleep(cooldown)
+            waited += cooldown
+        waited += await self.requests.acquire(1)
+        waited += await self.tokens.acquire(estimated_tokens)
+        self._record_admission(waited)
+
+    def _admit_sync(self, estimated_tokens: int) -> None:
+        waited = 0.0
+        while (cooldown := self.cooldown_remaining()) > 0:
+            time.sleep(cooldown)
+            waited += cooldown
+        waited += self.requests.acquire_sync(1)
+        waited += self.tokens.acquire_sync(estimated_tokens)
+        self._record_admission(waited)
+
+    def _record_admission(self, waited: float) -> None:
+        with self._lock:
+            self.stats["calls"] += 1
+            self.stats["wait_seconds"] += waited
+
+    def _reconcile(self, estimated_tokens: int, output: Any) -> None:
+        usage = getattr(output, "usage_metadata", None)
+        if usage and usage.get("total_tokens"):
+            self.tokens.consume(usage["total_tokens"] - estimated_tokens)
+
+    async def run(self, model: str, estimated_tokens: int, call) -> Any:
+        """Run the `call` coroutine factory under this provider's limits."""
+        self._enter()
+        try:
+            slot = self._async_slot(model)
+            if slot is not None:
+                await slot.acquire()
+            try:
+                await self._admit(estimated_tokens)
+                try:
+                    output = await call()
+                except Exception as e:
+                    self.record_failure(e)
+                    raise
+                self.record_success()
+                self._reconcile(estimated_tokens, output)
+                return output
+            finally:
+                if slot is not None:
+                    slot.release()
+        finally:
+            self._exit()
+
+    def run_sync(self, model: str, estimated_tokens: int, call) -> Any:
+        """Blocking variant of run."""
+        self._enter()
+        try:
+            slot = self._sync_slot(model)
+            if slot is not None:
+                slot.acquire()
+            try:
+                self._admit_sync(estimated_tokens)
+                try:
+                    output = call()
+                except Exception as e:
+                    self.record_failure(e)
+                    raise
+                self.record_success()
+                self._reconcile(estimated_tokens, output)
+                return output
+            finally:
+                if slot is not None:
+                    slot.release()
+        finally:
+            self._exit()
+
+
+_governors: Dict[str, ProviderGovernor] = {}
+_governors_lock = threading.Lock()
+
+
+def get_provider(model_name: str) -> str:
+    """Return the provider prefix of a "provider:model" name."""
+    return model_name.split(":", 1)[0].lower() if ":" in model_name else "default"
+
+
+def get_governor(
+    provider: str,
+    requests_per_minute: int = 0,
+    tokens_per_minute: int = 0,
+    max_in_flight_per_model: int = 0,
+    max_backoff_seconds: float = 60.0,
+) -> ProviderGovernor:
+    """Return the process-wide governor for a provider, applying the given limits."""
+    with _governors_lock:
+        governor = _governors.get(provider)
+        if governor is None:
+            governor = ProviderGovernor(
+                provider,
+                requests_per_minute,
+                tokens_per_minute,
+                max_in_flight_per_model,
+                max_backoff_seconds,
+            )
+            _governors[provider] = governor
+        else:
+            governor.configure(
+                requests_per_minute,
+                tokens_per_minute,
+                max_in_flight_per_model,
+                max_backoff_seconds,
+            )
+        return governor
+
+
+class GovernedRunnable(Runnable):
+    """Wraps a model chain so every attempt is admitted by the provider governor."""
+
+    def __init__(self, bound: Runnable, governor: ProviderGovernor, model_name: str):
+        """Admit every attempt of bound for model_name through governor."""
+        self.bound = bound
+        self.governor = governor
+        self.model_name = model_name
+
+    def _estimate_tokens(self, model_input: Any) -> int:
+        return max(1, len(render_prompt(model_input)) // CHARS_PER_TOKEN)
+
+    def invoke(
+        self, input: Any, config: RunnableConfig | None = None, **kwargs: Any
+    ) -> Any:
+        """Invoke the wrapped chain once the governor admits the call."""
+        return self.governor.run_sync(
+            self.model_name,
+            self._estimate_tokens(input),
+            lambda: self.bound.invoke(input, config, **kwargs),
+        )
+
+    async def ainvoke(
+        self, input: Any, config: RunnableConfig | None = None, **kwargs: Any
+    ) -> Any:
+        """Async variant of invoke."""
+        return await self.governor.run(
+            self.model_name,
+            self._estimate_tokens(input),
+            lambda: self.bound.ainvoke(input, config, **kwargs),
+        )
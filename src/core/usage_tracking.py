@@ -0,0 +1,363 @@
+"""Callback-based token, latency and cost accounting for every graph run.
+
+`UsageTracker` is a LangChain callback handler that needs no external service.
+It aggregates prompt/completion tokens, LLM time, node wall time and estimated
+cost per node, per model and per top-level run. Summaries can be read from a
+node (see `summarize_current_run`) or written to a JSON file when the run ends.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from langchain_core.runnables import RunnableConfig
+from src.configuration import Configuration
+
+logger = logging.getLogger(__name__)
+
+# USD per 1M tokens as (input, output). Matched by the longest model-name prefix,
+# with the provider prefix ("openai:", "google_genai:", ...) stripped.
+DEFAULT_PRICE_TABLE: Dict[str, tuple[float, float]] = {
+    "gemini-2.5-flash-lite": (0.10, 0.40),
+    "gemini-2.5-flash": (0.30, 2.50),
+    "gemini-2.5-pro": (1.25, 10.00),
+    "gemini-2.0-flash": (0.10, 0.40),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4.1-nano": (0.10, 0.40),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1": (2.00, 8.00),
+    "claude-3-5-haiku": (0.80, 4.00),
+    "claude-sonnet-4": (3.00, 15.00),
+    "claude-opus-4": (15.00, 75.00),
+}
+
+# Completed run summaries kept in memory
+MAX_FINISHED_RUNS = 100
+
+
+def _empty_bucket() -> Dict[str, Any]:
+    return {
+        "calls": 0,
+        "errors": 0,
+        "input_tokens": 0,
+        "output_tokens": 0,
+        "total_tokens": 0,
+        "llm_seconds": 0.0,
+        "cost_usd": 0.0,
+    }
+
+
+def _empty_node_bucket() -> Dict[str, Any]:
+    return {**_empty_bucket(), "wall_seconds": 0.0}
+
+
+def _empty_run() -> Dict[str, Any]:
+    return {
+        "started_at": time.time(),
+        "wall_seconds": 0.0,
+        "totals": _empty_bucket(),
+        "nodes": {},
+        "models": {},
+    }
+
+
+def load_price_table(path: str | None) -> Dict[str, tuple[float, float]]:
+    """Return the default price table, overridden by a JSON file if one is given.
+
+    The file maps model names to `{"input": <usd/1M>, "output": <usd/1M>}`.
+    """
+    table = dict(DEFAULT_PRICE_TABLE)
+    if path:
+        with open(path) as f:
+            for model, prices in json.load(f).items():
+                table[model] = (float(prices["input"]), float(prices["output"]))
+    return table
+
+
+class UsageTracker(BaseCallbackHandler):
+    """Aggregates LLM usage per node, per model and per top-level run."""
+
+    # Bookkeeping is cheap, so run in the caller's thread instead of an executor
+    run_inline = True
+
+    def __init__(
+        self,
+        price_table: Dict[str, tuple[float, float]] | None = None,
+        report_dir: str | None = None,
+    ):
+        """Price calls with price_table and write run reports to report_dir, if set."""
+        self.price_table = price_table or dict(DEFAULT_PRICE_TABLE)
+        self.report_dir = report_dir
+        self._lock = threading.Lock()
+        self._parents: Dict[UUID, UUID | None] = {}
+        self._node_starts: Dict[UUID, tuple[str, float]] = {}
+        self._llm_starts: Dict[UUID, tuple[str | None, str | None, float]] = {}
+        self._runs: Dict[UUID, Dict[str, Any]] = {}
+        self._finished: OrderedDict[UUID, Dict[str, Any]] = OrderedDict()
+
+    # --- pricing -------------------------------------------------------------
+
+    def price_for(self, model: str | None) -> tuple[float, float]:
+        """Return (input, output) USD per 1M tokens for a model, or zeros if unknown."""
+        if not model:
+            return (0.0, 0.0)
+        name = model.split(":", 1)[-1].lower()
+        matches = [prefix for prefix in self.price_table if name.startswith(prefix)]
+        if not matches:
+            return (0.0, 0.0)
+        return self.price_table[max(matches, key=len)]
+
+    # --- run bookkeeping -----------------------------------------------------
+
+    def _root_of(self, run_id: UUID | None) -> UUID | None:
+        while run_id is not None and self._parents.get(run_id) is not None:
+            run_id = self._parents[run_id]
+        return run_id
+
+    def _register(self, run_id: UUID, parent_run_id: UUID | None) -> None:
+        self._parents[run_id] = parent_run_id
+        if parent_run_id is None and run_id not in self._runs:
+            self._runs[run_id] = _empty_run()
+
+    def on_chain_start(
+        self,
+        serialized: Dict[str, Any],
+        inputs: Dict[str, Any],
+        *,
+        run_id: UUID,
+        parent_run_id: UUID | None = None,
+        metadata: Dict[str, Any] | None = None,
+        **kwargs: Any,
+    ) -> None:
+        """Track the run tree and the start of graph nodes."""
+        with self._lock:
+            self._register(run_id, parent_run_id)
+            node = (metadata or {}).get("langgraph_node")
+            # Only the node's own run, not the runnables nested inside it
+            if node and kwargs.get("name") == node:
+                self._node_starts[run_id] = (node, time.perf_counter())
+
+    def on_chain_end(self, outputs: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        """Add node wall time and close top-level runs."""
+        self._end_chain(run_id)
+
+    def on_chain_error(
+        self, error: BaseException, *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        """Treat failed chains like finished ones for accounting purposes."""
+        self._end_chain(run_id)
+
+    def _end_chain(self, run_id: UUID) -> None:
+        summary = None
+        with self._lock:
+            root = self._root_of(run_id)
+            # Runs end after their children, so each run drops only its own link
+            self._parents.pop(run_id, None)
+            run = self._runs.get(root)
+            node_start = self._node_starts.pop(run_id, None)
+            if run is not None and node_start is not None:
+                node, started = node_start
+                bucket = run["nodes"].setdefault(node, _empty_node_bucket())
+                bucket["wall_seconds"] += time.perf_counter() - started
+
+            if run_id == root and run is not None:
+                run["wall_seconds"] = time.time() - run["started_at"]
+                summary = self._finish(run_id, run)
+
+        if summary is not None and self.report_dir:
+            self.write_report(run_id, summary)
+
+    def _finish(self, run_id: UUID, run: Dict[str, Any]) -> Dict[str, Any]:
+        del self._runs[run_id]
+        summary = {"run_id": str(run_id), **run}
+        self._finished[run_id] = summary
+        while len(self._finished) > MAX_FINISHED_RUNS:
+            self._finished.popitem(last=False)
+        return summary
+
+    # --- LLM calls -----------------------------------------------------------
+
+    def _start_llm(
+        self,
+        run_id: UUID,
+        parent_run_id: UUID | None,
+        metadata: Dict[str, Any] | None,
+        kwargs: Dict[str, Any],
+    ) -> None:
+        metadata = metadata or {}
+        params = kwargs.get("invocation_params") or {}
+        model = (
+            metadata.get("ls_model_name")
+            or params.get("model")
+            or params.get("model_name")
+        )
+        with self._lock:
+            self._register(run_id, parent_run_id)
+            self._llm_starts[run_id] = (
+                metadata.get("langgraph_node"),
+                model,
+                time.perf_counter(),
+            )
+
+    def on_chat_model_start(
+        self,
+        serialized: Dict[str, Any],
+        messages: Any,
+        *,
+        run_id: UUID,
+        parent_run_id: UUID | None = None,
+        metadata: Dict[str, Any] | None = None,
+        **kwargs: Any,
+    ) -> None:
+        """Remember which node and model a chat model call belongs to."""
+        self._start_llm(run_id, parent_run_id, metadata, kwargs)
+
+    def on_llm_start(
+        self,
+        serialized: Dict[str, Any],
+        prompts: Any,
+        *,
+        run_id: UUID,
+        parent_run_id: UUID | None = None,
+        metadata: Dict[str, Any] | None = None,
+        **kwargs: Any,
+    ) -> None:
+        """Remember which node and model a completion model call belongs to."""
+        self._start_llm(run_id, parent_run_id, metadata, kwargs)
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        """Record tokens, latency and cost of a finished LLM call."""
+        input_tokens, output_tokens, model = _usage_from_result(response)
+        self._record_llm(run_id, input_tokens, output_tokens, model_override=model)
+
+    def on_llm_error(
+        self, error: BaseException, *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        """Count failed LLM calls (their latency still counts)."""
+        self._record_llm(run_id, 0, 0, failed=True)
+
+    def _record_llm(
+        self,
+        run_id: UUID,
+        input_tokens: int,
+        output_tokens: int,
+        model_override: str | None = None,
+        failed: bool = False,
+    ) -> None:
+        with self._lock:
+            start = self._llm_starts.pop(run_id, None)
+            run = self._runs.get(self._root_of(run_id))
+            self._parents.pop(run_id, None)
+            if start is None or run is None:
+                return
+
+            node, model, started = start
+            model = model or model_override or "unknown"
+            elapsed = time.perf_counter() - started
+            input_price, output_price = self.price_for(model)
+            cost = (input_tokens * input_price + output_tokens * output_price) / 1e6
+
+            buckets = (
+                run["totals"],
+                run["nodes"].setdefault(node or "unknown", _empty_node_bucket()),
+                run["models"].setdefault(model, _empty_bucket()),
+            )
+            for bucket in buckets:
+                bucket["calls"] += 1
+                bucket["errors"] += int(failed)
+                bucket["input_tokens"] += input_tokens
+                bucket["output_tokens"] += output_tokens
+                bucket["total_tokens"] += input_tokens + output_tokens
+                bucket["llm_seconds"] += elapsed
+                bucket["cost_usd"] += cost
+
+    # --- reporting -----------------------------------------------------------
+
+    def run_summary(self, run_id: UUID) -> Dict[str, Any] | None:
+        """Return the (possibly still running) usage summary of a top-level run."""
+        with self._lock:
+            root = self._root_of(run_id)
+            if root in self._runs:
+                run = self._runs[root]
+                return json.loads(
+                    json.dumps(
+                        {
+                            "run_id": str(root),
+                            **run,
+                            "wall_seconds": time.time() - run["started_at"],
+                        }
+                    )
+                )
+            return self._finished.get(root)
+
+    def write_report(self, run_id: UUID, summary: Dict[str, Any]) -> str:
+        """Write a run summary to `<report_dir>/usage_<run_id>.json` and return the path."""
+        os.makedirs(self.report_dir, exist_ok=True)
+        path = os.path.join(self.report_dir, f"usage_{run_id}.json")
+        with open(path, "w") as f:
+            json.dump(summary, f, indent=2)
+        logger.info("Usage report written to %s", path)
+        return path
+
+
+def _usage_from_result(response: LLMResult) -> tuple[int, int, str | None]:
+    """Return (input tokens, output tokens, model name) reported by a provider."""
+    llm_output = response.llm_output or {}
+    model = llm_output.get("model_name") or llm_output.get("model")
+    input_tokens = output_tokens = 0
+    found = False
+    for generations in response.generations:
+        for generation in generations:
+            message = getattr(generation, "message", None)
+            usage = getattr(message, "usage_metadata", None)
+            model = model or getattr(message, "response_metadata", {}).get("model_name")
+            if usage:
+                found = True
+                input_tokens += usage.get("input_tokens", 0)
+                output_tokens += usage.get("output_tokens", 0)
+    if found:
+        return input_tokens, output_tokens, model
+
+    # Older integrations only report usage in llm_output
+    token_usage = llm_output.get("token_usage") or {}
+    return (
+        token_usage.get("prompt_tokens", 0),
+        token_usage.get("completion_tokens", 0),
+        model,
+    )
+
+
+_tracker: UsageTracker | None = None
+_tracker_lock = threading.Lock()
+
+
+def get_usage_tracker() -> UsageTracker:
+    """Return the process-wide usage tracker, configured from the environment."""
+    global _tracker
+    with _tracker_lock:
+        if _tracker is None:
+            configurable = Configuration.from_runnable_config(None)
+            _tracker = UsageTracker(
+                price_table=load_price_table(configurable.usage_price_table_path),
+                report_dir=configurable.usage_report_dir,
+            )
+        return _tracker
+
+
+def summarize_current_run(
+    config: RunnableConfig, tracker: UsageTracker | None = None
+) -> Dict[str, Any] | None:
+    """Return the usage summary of the top-level run a node is executing in."""
+    callbacks = (config or {}).get("callbacks")
+    parent_run_id = getattr(callbacks, "parent_run_id", None)
+    if parent_run_id is None:
+        return None
+    return (tracker or get_usage_tracker()).run_summary(parent_run_id)
@@ -1,3 +1,6 @@
+import asyncio
+import uuid
+from functools import lru_cache
 from typing import Literal
 
 from langchain_core.messages import (
@@ -7,8 +10,10 @@ from langchain_core.messages import (
 )
 from langchain_core.runnables import RunnableConfig
 from langgraph.graph import START, StateGraph
+from langgraph.graph.state import CompiledStateGraph
 from langgraph.types import Command
 from src.configuration import Configuration
+from src.core.usage_tracking import summarize_current_run
 from src.llm_service import (
     create_llm_structured_model,
     create_llm_with_tools,
@@ -18,7 +23,10 @@ from src.prompts import (
     lead_researcher_prompt,
     structure_events_prompt,
 )
-from src.research_events.research_events_graph import research_events_app
+from src.research_events.dedup import dedup_scope
+from src.research_events.merge_events.utils import ensure_categories_with_events
+from src.research_events.research_events_graph import get_research_events_app
+from src.services.event_service import EventService
 from src.state import (
     CategoriesWithEvents,
     Chronology,
@@ -27,10 +35,16 @@ from src.state import (
     SupervisorState,
     SupervisorStateInput,
 )
-from src.utils import get_buffer_string_with_tools, get_langfuse_handler, think_tool
+from src.url_crawler.scheduler import crawl_run
+from src.utils import (
+    LazyGraph,
+    get_buffer_string_with_tools,
+    get_graph_callbacks,
+    lazy_graph_attributes,
+    think_tool,
+)
 
-config = Configuration()
-MAX_TOOL_CALL_ITERATIONS = config.max_tool_iterations
+research_events_app = LazyGraph(get_research_events_app)
 
 
 # Verify connection
@@ -40,6 +54,17 @@ MAX_TOOL_CALL_ITERATIONS = config.max_tool_iterations
 #     print("Authentication failed. Please check your credentials and host.")
 
 
+def has_events(events: CategoriesWithEvents | dict | None) -> bool:
+    """Return True if any category of events has content."""
+    if not events:
+        return False
+    events = ensure_categories_with_events(events)
+    return any(
+        getattr(events, category).strip()
+        for category in CategoriesWithEvents.model_fields
+    )
+
+
 async def supervisor_node(
     state: SupervisorState,
     config: RunnableConfig,
@@ -77,6 +102,11 @@ async def supervisor_node(
         update={
             "conversation_history": [response],
             "iteration_count": state.get("iteration_count", 0) + 1,
+            "research_run_id": state.get("research_run_id") or uuid.uuid4().hex,
+            # Set once, from the input: later turns see this run's own events
+            "resumed_from_events": state.get(
+                "resumed_from_events", has_events(state.get("existing_events"))
+            ),
         },
     )
 
@@ -94,7 +124,8 @@ async def supervisor_tools_node(
     used_domains = state.get("used_domains", [])
     last_message = state["conversation_history"][-1]
     iteration_count = state.get("iteration_count", 0)
-    exceeded_allowed_iterations = iteration_count >= MAX_TOOL_CALL_ITERATIONS
+    configurable = Configuration.from_runnable_config(config)
+    exceeded_allowed_iterations = iteration_count >= configurable.max_tool_iterations
 
     # If the LLM made no tool calls, we finish.
     if not last_message.tool_calls or exceeded_allowed_iterations:
@@ -124,11 +155,21 @@ async def supervisor_tools_node(
 
         elif tool_name == "ResearchEventsTool":
             research_question = tool_args["research_question"]
+            # Queue this run's crawl requests separately from other runs
+            crawl_run.set(state.get("research_run_id") or "default")
             result = await research_events_app.ainvoke(
                 {
                     "research_question": research_question,
                     "existing_events": existing_events,
                     "used_domains": used_domains,
+                    "dedup_key": dedup_scope(
+                        state["person_to_research"],
+                        state.get("research_run_id", ""),
+                        # Chunks seen by earlier runs are only skipped when
+                        # their events were loaded back into this run
+                        persistent=bool(configurable.chunk_dedup_dir)
+                        and state.get("resumed_from_events", False),
+                    ),
                 }
             )
             existing_events = result["existing_events"]
@@ -185,35 +226,28 @@ async def structure_events(
         return {"chronology": []}
 
     structured_llm = create_llm_structured_model(config=config, class_name=Chronology)
-
-    early_prompt = structure_events_prompt.format(
-        existing_events=existing_events.early
-    )
-    career_prompt = structure_events_prompt.format(
-        existing_events=existing_events.career
-    )
-    personal_prompt = structure_events_prompt.format(
-        existing_events=existing_events.personal
-    )
-    legacy_prompt = structure_events_prompt.format(
-        existing_events=existing_events.legacy
+    token_budget = Configuration.from_runnable_config(
+        config
+    ).structure_events_token_budget
+
+    # Long categories are split on bullet boundaries so no single call outgrows
+    # structured_llm_max_tokens; every category and sub-batch runs concurrently
+    prompts = [
+        structure_events_prompt.format(existing_events=batch)
+        for category in ("early", "career", "personal", "legacy")
+        for batch in EventService.split_bullets_into_batches(
+            getattr(existing_events, category), token_budget
+        )
+    ]
+    responses = await asyncio.gather(
+        *(structured_llm.ainvoke(prompt) for prompt in prompts)
     )
 
-    early_response = await structured_llm.ainvoke(early_prompt)
-    career_response = await structured_llm.ainvoke(career_prompt)
-    personal_response = await structured_llm.ainvoke(personal_prompt)
-    legacy_response = await structured_llm.ainvoke(legacy_prompt)
-    # Invoke the second model to get the final structured output
-
-    all_events = (
-        early_response.events
-        + career_response.events
-        + personal_response.events
-        + legacy_response.events
-    )
+    all_events = [event for response in responses for event in response.events]
 
     return {
         "structured_events": all_events,
+        "usage_summary": summarize_current_run(config),
     }
 
 
@@ -226,4 +260,11 @@ workflow.add_node("structure_events", structure_events)
 
 workflow.add_edge(START, "supervisor")
 
-graph = workflow.compile().with_config({"callbacks": [get_langfuse_handler()]})
+
+@lru_cache(maxsize=1)
+def get_graph() -> CompiledStateGraph:
+    """Compile the supervisor graph on first use."""
+    return workflow.compile().with_config({"callbacks": get_graph_callbacks()})
+
+
+__getattr__ = lazy_graph_attributes(__name__, graph=get_graph)
@@ -1,15 +1,78 @@
-from typing import List, Type
+import json
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Callable, Dict, Hashable, List, Type
 
-from langchain.chat_models import init_chat_model
 from langchain_core.runnables import Runnable, RunnableConfig
 from langchain_core.tools import BaseTool
 from pydantic import BaseModel
 from src.configuration import Configuration
+from src.core.llm_cache import (
+    CachedRunnable,
+    describe_schema,
+    describe_tools,
+    get_llm_cache,
+)
+from src.core.rate_limiter import GovernedRunnable, get_governor, get_provider
 from src.utils import get_api_key_for_model
 
-configurable_model = init_chat_model(
-    configurable_fields=("model", "max_tokens", "api_key", "reasoning")
-)
+
+@lru_cache(maxsize=1)
+def get_configurable_model() -> Runnable:
+    """Return the shared configurable chat model, built on first use."""
+    from langchain.chat_models import init_chat_model
+
+    return init_chat_model(
+        configurable_fields=("model", "max_tokens", "api_key", "reasoning")
+    )
+
+
+# Fully built runnables, keyed by the resolved configuration, model and
+# tools/schema; least recently used first, so per-request configurations
+# (e.g. distinct API keys) cannot grow it without bound
+_model_cache: "OrderedDict[Hashable, Runnable]" = OrderedDict()
+_model_cache_lock = threading.Lock()
+_MAX_CACHED_MODELS = 64
+
+# Tool descriptors keyed by tool object identity; the stored tuple keeps the
+# objects alive so their ids cannot be reused while the entry exists
+_tool_descriptors: Dict[tuple, tuple] = {}
+_MAX_TOOL_DESCRIPTORS = 64
+
+
+def clear_model_cache() -> None:
+    """Drop every memoized runnable (and the cached Configuration resolutions)."""
+    with _model_cache_lock:
+        _model_cache.clear()
+        _tool_descriptors.clear()
+    Configuration.clear_cache()
+
+
+def _describe_tools_cached(tools: List[Any]) -> str:
+    key = tuple(id(t) for t in tools)
+    entry = _tool_descriptors.get(key)
+    if entry is None:
+        if len(_tool_descriptors) >= _MAX_TOOL_DESCRIPTORS:
+            _tool_descriptors.clear()
+        descriptor = json.dumps(describe_tools(tools), sort_keys=True, default=str)
+        entry = (tuple(tools), descriptor)
+        _tool_descriptors[key] = entry
+    return entry[1]
+
+
+def _get_or_build(key: Hashable, build: Callable[[], Runnable]) -> Runnable:
+    with _model_cache_lock:
+        model = _model_cache.get(key)
+        if model is not None:
+            _model_cache.move_to_end(key)
+    if model is None:
+        model = build()
+        with _model_cache_lock:
+            model = _model_cache.setdefault(key, model)
+            while len(_model_cache) > _MAX_CACHED_MODELS:
+                _model_cache.popitem(last=False)
+    return model
 
 
 # This contains the shared logic. The underscore _ means other files shouldn't use it.
@@ -19,16 +82,47 @@ def _build_and_configure_model(
     model_name: str,
     max_tokens: int,
     max_retries: int,
+    cache_descriptor: Any = None,
+    response_schema: Type[BaseModel] | None = None,
 ) -> Runnable:
-    """Internal helper to apply retry and runtime configuration."""
+    """Apply retry, runtime configuration and response caching to a model chain."""
     model_config = {
         "model": model_name,
         "max_tokens": max_tokens,
         "api_key": get_api_key_for_model(model_name, config),
         "reasoning": "False",
     }
-    return model_chain.with_retry(stop_after_attempt=max_retries).with_config(
-        model_config
+    configurable = Configuration.from_runnable_config(config)
+    governor = get_governor(
+        get_provider(model_name),
+        requests_per_minute=configurable.llm_requests_per_minute,
+        tokens_per_minute=configurable.llm_tokens_per_minute,
+        max_in_flight_per_model=configurable.llm_max_concurrency_per_model,
+        max_backoff_seconds=configurable.llm_max_backoff_seconds,
+    )
+    # The governor sits inside the retry so every attempt waits for the shared
+    # budgets and any cool-down triggered by another caller's 429
+    model = (
+        GovernedRunnable(model_chain, governor, model_name)
+        .with_retry(stop_after_attempt=max_retries)
+        .with_config(model_config)
+    )
+
+    if not configurable.llm_cache_enabled:
+        return model
+
+    cache = get_llm_cache(
+        configurable.llm_cache_path,
+        ttl_seconds=configurable.llm_cache_ttl_seconds,
+        max_bytes=configurable.llm_cache_max_bytes,
+    )
+    return CachedRunnable(
+        model,
+        cache,
+        model_name=model_name,
+        max_tokens=max_tokens,
+        descriptor=cache_descriptor,
+        response_schema=response_schema,
     )
 
 
@@ -38,17 +132,29 @@ def create_llm_with_tools(
 ) -> Runnable:
     """Creates a model configured specifically for tool-calling."""
     configurable = Configuration.from_runnable_config(config)
-
-    # Start the chain by binding the tools
-    model_with_tools = configurable_model.bind_tools(tools)
-
-    return _build_and_configure_model(
-        config=config,
-        model_chain=model_with_tools,
-        model_name=configurable.get_llm_with_tools_model(),
-        max_tokens=configurable.tools_llm_max_tokens,
-        max_retries=configurable.max_tools_output_retries,
+    model_name = configurable.get_llm_with_tools_model()
+    tools_descriptor = _describe_tools_cached(tools)
+
+    def build() -> Runnable:
+        # Start the chain by binding the tools
+        model_with_tools = get_configurable_model().bind_tools(tools)
+
+        return _build_and_configure_model(
+            config=config,
+            model_chain=model_with_tools,
+            model_name=model_name,
+            max_tokens=configurable.tools_llm_max_tokens,
+            max_retries=configurable.max_tools_output_retries,
+            cache_descriptor={"tools": tools_descriptor},
+        )
+
+    key = (
+        "tools",
+        configurable,
+        get_api_key_for_model(model_name, config),
+        tools_descriptor,
     )
+    return _get_or_build(key, build)
 
 
 # --- Public Function 2: For Models WITHOUT Tools ---
@@ -57,20 +163,32 @@ def create_llm_structured_model(
 ) -> Runnable:
     """Creates a general-purpose chat model with no tools."""
     configurable = Configuration.from_runnable_config(config)
-
-    # The chain is just the base model itself
-    if class_name:
-        base_model = configurable_model.with_structured_output(class_name)
-    else:
-        base_model = configurable_model
-
-    return _build_and_configure_model(
-        config=config,
-        model_chain=base_model,
-        model_name=configurable.get_llm_structured_model(),
-        max_tokens=configurable.structured_llm_max_tokens,
-        max_retries=configurable.max_structured_output_retries,
+    model_name = configurable.get_llm_structured_model()
+
+    def build() -> Runnable:
+        # The chain is just the base model itself
+        if class_name:
+            base_model = get_configurable_model().with_structured_output(class_name)
+        else:
+            base_model = get_configurable_model()
+
+        return _build_and_configure_model(
+            config=config,
+            model_chain=base_model,
+            model_name=model_name,
+            max_tokens=configurable.structured_llm_max_tokens,
+            max_retries=configurable.max_structured_output_retries,
+            cache_descriptor={"schema": describe_schema(class_name)},
+            response_schema=class_name,
+        )
+
+    key = (
+        "structured",
+        configurable,
+        get_api_key_for_model(model_name, config),
+        class_name,
     )
+    return _get_or_build(key, build)
 
 
 # --- Public Function 3: For Small Chunk Models ---
@@ -79,17 +197,29 @@ def create_llm_chunk_model(
 ) -> Runnable:
     """Creates a small model for chunk biographical event detection."""
     configurable = Configuration.from_runnable_config(config)
-
-    # The chain is just the base model itself
-    if class_name:
-        base_model = configurable_model.with_structured_output(class_name)
-    else:
-        base_model = configurable_model
-
-    return _build_and_configure_model(
-        config=config,
-        model_chain=base_model,
-        model_name=configurable.get_llm_chunk_model(),
-        max_tokens=1024,  # Smaller token limit for chunk processing
-        max_retries=2,  # Fewer retries for chunk processing
+    model_name = configurable.get_llm_chunk_model()
+
+    def build() -> Runnable:
+        # The chain is just the base model itself
+        if class_name:
+            base_model = get_configurable_model().with_structured_output(class_name)
+        else:
+            base_model = get_configurable_model()
+
+        return _build_and_configure_model(
+            config=config,
+            model_chain=base_model,
+            model_name=model_name,
+            max_tokens=1024,  # Smaller token limit for chunk processing
+            max_retries=2,  # Fewer retries for chunk processing
+            cache_descriptor={"schema": describe_schema(class_name)},
+            response_schema=class_name,
+        )
+
+    key = (
+        "chunk",
+        configurable,
+        get_api_key_for_model(model_name, config),
+        class_name,
     )
+    return _get_or_build(key, build)
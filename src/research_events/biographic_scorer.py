@@ -0,0 +1,156 @@
+"""Rule-based biographical-density scorer used as a zero-LLM chunk pre-filter.
+
+Each chunk is scored on its counts of years and dates, life-event verbs,
+mentions of the subject's name and location phrases, each count capped so a
+chunk's length neither helps nor hurts it. Chunks that score clearly high are
+kept without an LLM call and chunks without a single date or life event are
+dropped; only the middle is sent to the chunk classification model.
+"""
+
+import re
+from bisect import bisect_right
+from typing import Dict, List, Literal
+
+ChunkDecision = Literal["relevant", "irrelevant", "ambiguous"]
+
+YEAR_PATTERN = re.compile(r"\b(1[0-9]{3}|20[0-9]{2})s?\b")
+DATE_PATTERN = re.compile(
+    r"\b(January|February|March|April|May|June|July|August|September|October|"
+    r"November|December|Jan|Feb|Mar|Apr|Jun|Jul|Aug|Sep|Sept|Oct|Nov|Dec)\.?\s+\d{1,2}\b"
+    r"|\b\d{1,2}\s+(January|February|March|April|May|June|July|August|September|"
+    r"October|November|December)\b"
+)
+LIFE_EVENT_PATTERN = re.compile(
+    r"\b(born|birth|died|death|buried|married|marriage|(?-i:wed)|divorced|widowed|"
+    r"graduated|graduation|enrolled|attended|studied|educated|apprenticed|"
+    r"became|appointed|named|elected|promoted|hired|joined|served|taught|"
+    r"founded|resigned|retired|moved|emigrated|"
+    r"immigrated|relocated|settled|published|premiered|exhibited|awarded|won|"
+    r"received|knighted|honoured|honored|inducted|imprisoned|exiled|arrested|"
+    r"baptized|baptised|christened)\b",
+    re.IGNORECASE,
+)
+LOCATION_PATTERN = re.compile(
+    r"\b(?:in|at|to|from|near)\s+[A-Z][a-z]+(?:,\s+[A-Z][a-z]+)?"
+)
+
+# Weight of one occurrence of each signal
+SIGNAL_WEIGHTS: Dict[str, float] = {
+    "years": 1.0,
+    "dates": 1.0,
+    "life_events": 1.5,
+    "name_mentions": 1.0,
+    "locations": 0.5,
+}
+
+# Occurrences of a signal counted per chunk; more add nothing
+SIGNAL_CAP = 3
+
+# Signals a chunk needs at least one of to escape rejection without the LLM
+EVENT_SIGNALS = ("years", "dates", "life_events")
+
+# Capitalised words in a research question that are not part of a name
+_QUESTION_STOPWORDS = {
+    "research",
+    "find",
+    "what",
+    "when",
+    "where",
+    "who",
+    "which",
+    "how",
+    "why",
+    "the",
+    "his",
+    "her",
+    "their",
+    "life",
+    "early",
+    "career",
+    "personal",
+    "legacy",
+    "events",
+    "biography",
+    "timeline",
+}
+
+
+def extract_subject_terms(research_question: str) -> List[str]:
+    """Return the capitalised words of the question that likely name the subject."""
+    terms = re.findall(r"\b[A-Z][\w'-]+", research_question or "")
+    return [
+        term
+        for term in dict.fromkeys(terms)
+        if len(term) > 2 and term.lower() not in _QUESTION_STOPWORDS
+    ]
+
+
+def count_signals(chunks: List[str], subject_terms: List[str]) -> List[Dict[str, int]]:
+    """Count every signal in every chunk in one pass over the document.
+
+    The chunks are joined once and each pattern scans the joined text a single
+    time; matches are bucketed back into chunks by their offset.
+    """
+    if not chunks:
+        return []
+
+    separator = "\n\n"
+    starts = []
+    offset = 0
+    for chunk in chunks:
+        starts.append(offset)
+        offset += len(chunk) + len(separator)
+    document = separator.join(chunks)
+
+    patterns = {
+        "years": YEAR_PATTERN,
+        "dates": DATE_PATTERN,
+        "life_events": LIFE_EVENT_PATTERN,
+        "locations": LOCATION_PATTERN,
+    }
+    if subject_terms:
+        patterns["name_mentions"] = re.compile(
+            r"\b(" + "|".join(re.escape(t) for t in subject_terms) + r")\b"
+        )
+
+    counts = [dict.fromkeys(SIGNAL_WEIGHTS, 0) for _ in chunks]
+    for signal, pattern in patterns.items():
+        for match in pattern.finditer(document):
+            counts[bisect_right(starts, match.start()) - 1][signal] += 1
+    return counts
+
+
+def signal_score(counts: Dict[str, int]) -> float:
+    """Weighted sum of a chunk's signal counts, each capped at SIGNAL_CAP."""
+    return sum(
+        SIGNAL_WEIGHTS[signal] * min(count, SIGNAL_CAP)
+        for signal, count in counts.items()
+    )
+
+
+def score_chunks(chunks: List[str], subject_terms: List[str]) -> List[float]:
+    """Score every chunk on biographical signal, independently of its length."""
+    return [signal_score(counts) for counts in count_signals(chunks, subject_terms)]
+
+
+def classify_chunks_by_rules(
+    chunks: List[str],
+    research_question: str,
+    accept_score: float,
+    reject_score: float,
+) -> List[ChunkDecision]:
+    """Decide each chunk locally when its score is clearly above or below the thresholds.
+
+    A chunk is only rejected when it has no year, date or life event at all,
+    whatever its score.
+    """
+    decisions: List[ChunkDecision] = []
+    for counts in count_signals(chunks, extract_subject_terms(research_question)):
+        score = signal_score(counts)
+        if score >= accept_score:
+            decisions.append("relevant")
+        elif score <= reject_score and not any(counts[s] for s in EVENT_SIGNALS):
+            decisions.append("irrelevant")
+        else:
+            decisions.append("ambiguous")
+    return decisions
@@ -1,10 +1,56 @@
+import logging
+from functools import lru_cache
 from typing import Dict, List, TypedDict
 
+from langchain_core.runnables import RunnableConfig
 from langgraph.graph import END, START, StateGraph
 from langgraph.graph.state import CompiledStateGraph
 from pydantic import BaseModel, Field
 from src.configuration import Configuration
 from src.llm_service import create_llm_chunk_model
+from src.services.chunking_service import ChunkingService
+from src.url_crawler.utils import get_tokenizer
+from src.utils import gather_with_concurrency, lazy_graph_attributes
+
+logger = logging.getLogger(__name__)
+
+CHUNK_CHECK_CRITERIA = """
+        ONLY mark as true if the chunk contains:
+        - Birth/death dates or locations
+        - Marriage ceremonies or relationships
+        - Educational enrollment or graduation
+        - Career appointments or job changes
+        - Awards, prizes, or honors received
+        - Relocations to new cities/countries
+        - Major discoveries or inventions
+
+        DO NOT mark as true for:
+        - General descriptions or background information
+        - Character traits or personality descriptions
+        - General statements about time periods
+        - Descriptions of places without personal connection
+        - General knowledge or context
+
+        The event must be specific and concrete, not general background.
+"""
+
+CHUNK_CHECK_PROMPT = """
+        Analyze this text chunk and determine if it contains SPECIFIC biographical events.
+        {criteria}
+        Text chunk: "{chunk}"
+        """
+
+BATCH_CHUNK_CHECK_PROMPT = """
+        Analyze each of the numbered text chunks below and determine, for EACH chunk
+        independently, if it contains SPECIFIC biographical events.
+        {criteria}
+        Return exactly one verdict per chunk, using the chunk index shown in its tag.
+
+        {chunks}
+        """
+
+# Rough token cost of the <chunk index="..."> wrapper around each packed chunk
+CHUNK_WRAPPER_TOKENS = 12
 
 
 class BiographicEventCheck(BaseModel):
@@ -13,6 +59,23 @@ class BiographicEventCheck(BaseModel):
     )
 
 
+class ChunkVerdict(BaseModel):
+    """Relevance verdict for one chunk of a batched check."""
+
+    chunk_index: int = Field(description="The index of the chunk being judged")
+    contains_biographic_event: bool = Field(
+        description="Whether the text chunk contains biographical events"
+    )
+
+
+class BiographicEventBatchCheck(BaseModel):
+    """Verdicts for every chunk packed into one batched check."""
+
+    verdicts: List[ChunkVerdict] = Field(
+        description="One verdict per chunk, keyed by chunk index"
+    )
+
+
 class ChunkResult(BaseModel):
     content: str
     contains_biographic_event: bool = Field(
@@ -26,47 +89,110 @@ class ChunkState(TypedDict):
     results: Dict[str, ChunkResult]
 
 
-def split_text(state: ChunkState) -> ChunkState:
-    """Split text into smaller chunks."""
-    text = state["text"]
-    chunk_size = 2000
-    chunks = [text[i : i + chunk_size] for i in range(0, len(text), chunk_size)]
-    return {"chunks": chunks}
+def split_text(state: ChunkState, config: RunnableConfig) -> ChunkState:
+    """Split text into smaller chunks, unless the caller already provided them."""
+    if state.get("chunks"):
+        return {"chunks": state["chunks"]}
 
+    configurable = Configuration.from_runnable_config(config)
+    return {"chunks": ChunkingService.split(state["text"], configurable)}
 
-def check_chunk_for_events(state: ChunkState, config) -> ChunkState:
-    """Check each chunk for biographical events using structured output."""
+
+def pack_chunks_by_token_budget(
+    chunks: List[str], token_budget: int
+) -> List[List[int]]:
+    """Group chunk indices so each group's text fits in token_budget.
+
+    A chunk larger than the budget on its own still gets a group of its own.
+    """
+    encoding = get_tokenizer()
+    batches: List[List[int]] = []
+    current: List[int] = []
+    current_tokens = 0
+
+    for i, chunk in enumerate(chunks):
+        chunk_tokens = len(encoding.encode(chunk)) + CHUNK_WRAPPER_TOKENS
+        if current and current_tokens + chunk_tokens > token_budget:
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(i)
+        current_tokens += chunk_tokens
+
+    if current:
+        batches.append(current)
+    return batches
+
+
+async def _check_chunks_individually(
+    chunks: List[str], config, max_concurrency: int
+) -> Dict[str, ChunkResult]:
     model = create_llm_chunk_model(config, BiographicEventCheck)
+
+    async def check(chunk: str) -> ChunkResult:
+        prompt = CHUNK_CHECK_PROMPT.format(criteria=CHUNK_CHECK_CRITERIA, chunk=chunk)
+        result = await model.ainvoke(prompt)
+        return ChunkResult(
+            content=chunk, contains_biographic_event=result.contains_biographic_event
+        )
+
+    checked = await gather_with_concurrency(
+        max_concurrency, (check(chunk) for chunk in chunks)
+    )
+    return {f"chunk_{i}": result for i, result in enumerate(checked)}
+
+
+async def _check_chunks_batched(
+    chunks: List[str], config, token_budget: int, max_concurrency: int
+) -> Dict[str, ChunkResult]:
+    model = create_llm_chunk_model(config, BiographicEventBatchCheck)
+
+    async def check(batch: List[int]) -> Dict[int, bool]:
+        packed = "\n\n".join(
+            f'<chunk index="{i}">\n{chunks[i]}\n</chunk>' for i in batch
+        )
+        prompt = BATCH_CHUNK_CHECK_PROMPT.format(
+            criteria=CHUNK_CHECK_CRITERIA, chunks=packed
+        )
+        result = await model.ainvoke(prompt)
+        return {
+            v.chunk_index: v.contains_biographic_event
+            for v in (result.verdicts if result else [])
+        }
+
+    batches = pack_chunks_by_token_budget(chunks, token_budget)
+    batch_verdicts = await gather_with_concurrency(
+        max_concurrency, (check(batch) for batch in batches)
+    )
+
     results = {}
+    for batch, verdicts in zip(batches, batch_verdicts):
+        for i in batch:
+            if i not in verdicts:
+                # Keep chunks the model forgot to judge rather than silently dropping them
+                logger.warning("No verdict returned for chunk_%d, keeping it", i)
+            results[f"chunk_{i}"] = ChunkResult(
+                content=chunks[i],
+                contains_biographic_event=verdicts.get(i, True),
+            )
 
-    for i, chunk in enumerate(state["chunks"]):
-        prompt = f"""
-        Analyze this text chunk and determine if it contains SPECIFIC biographical events.
-        
-        ONLY mark as true if the chunk contains:
-        - Birth/death dates or locations
-        - Marriage ceremonies or relationships
-        - Educational enrollment or graduation
-        - Career appointments or job changes
-        - Awards, prizes, or honors received
-        - Relocations to new cities/countries
-        - Major discoveries or inventions
-        
-        DO NOT mark as true for:
-        - General descriptions or background information
-        - Character traits or personality descriptions
-        - General statements about time periods
-        - Descriptions of places without personal connection
-        - General knowledge or context
-        
-        The event must be specific and concrete, not general background.
-        
-        Text chunk: "{chunk}"
-        """
+    return results
 
-        result = model.invoke(prompt)
-        results[f"chunk_{i}"] = ChunkResult(
-            content=chunk, contains_biographic_event=result.contains_biographic_event
+
+async def check_chunk_for_events(state: ChunkState, config) -> ChunkState:
+    """Check each chunk for biographical events using structured output."""
+    configurable = Configuration.from_runnable_config(config)
+    chunks = state["chunks"]
+
+    if configurable.chunk_check_mode == "batched":
+        results = await _check_chunks_batched(
+            chunks,
+            config,
+            configurable.chunk_check_batch_token_budget,
+            configurable.max_concurrent_chunk_checks,
+        )
+    else:
+        results = await _check_chunks_individually(
+            chunks, config, configurable.max_concurrent_chunk_checks
         )
 
     return {"results": results}
@@ -86,4 +212,10 @@ def create_biographic_event_graph() -> CompiledStateGraph:
     return graph.compile()
 
 
-graph = create_biographic_event_graph()
+@lru_cache(maxsize=1)
+def get_chunk_graph() -> CompiledStateGraph:
+    """Return the chunk graph, compiled on first use."""
+    return create_biographic_event_graph()
+
+
+__getattr__ = lazy_graph_attributes(__name__, graph=get_chunk_graph)
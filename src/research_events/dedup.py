@@ -0,0 +1,271 @@
+"""Near-duplicate chunk detection across sources.
+
+Biography sites often mirror or paraphrase Wikipedia, so the same paragraphs
+arrive from several domains. Every chunk gets a MinHash signature over its
+word 5-gram shingles; an LSH band index finds earlier chunks that may be
+similar, and a chunk whose estimated Jaccard similarity to one of them
+reaches the threshold is skipped before it costs any classification or
+extraction calls.
+
+Checking a page's chunks does not index them: they are added only once their
+events are merged, so chunks whose extraction failed are processed again.
+Pages processed concurrently instead reserve their chunks while checking
+them, so mirrors that arrive together are still only processed once.
+
+An index is scoped to one research run for one person. With a directory
+configured and a run that starts from the events of earlier runs, the index
+of the person is also persisted and reused across runs.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import threading
+from collections import OrderedDict, defaultdict
+from typing import Callable, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+SHINGLE_WORDS = 5
+NUM_PERMUTATIONS = 128
+BANDS = 32  # 32 bands of 4 rows: pairs above ~0.5 similarity almost always collide
+ROWS = NUM_PERMUTATIONS // BANDS
+
+MERSENNE_PRIME = (1 << 61) - 1
+_rng = random.Random(1729)  # fixed seed: signatures must be stable across runs
+PERMUTATIONS = [
+    (_rng.randrange(1, MERSENNE_PRIME), _rng.randrange(0, MERSENNE_PRIME))
+    for _ in range(NUM_PERMUTATIONS)
+]
+
+# In-memory indexes kept at once (one per person and run)
+MAX_INDEXES = 64
+
+WORD = re.compile(r"\w+")
+
+Signature = Tuple[int, ...]
+
+
+def shingles(text: str) -> set[str]:
+    """Return the word 5-grams of the lowercased text."""
+    words = WORD.findall(text.lower())
+    if len(words) <= SHINGLE_WORDS:
+        return {" ".join(words)} if words else set()
+    return {
+        " ".join(words[i : i + SHINGLE_WORDS])
+        for i in range(len(words) - SHINGLE_WORDS + 1)
+    }
+
+
+def minhash(text: str) -> Signature:
+    """Compute the MinHash signature of text."""
+    hashes = [
+        int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), "big")
+        for s in shingles(text)
+    ]
+    if not hashes:
+        return ()
+    return tuple(
+        min((a * h + b) % MERSENNE_PRIME for h in hashes) for a, b in PERMUTATIONS
+    )
+
+
+def similarity(first: Signature, second: Signature) -> float:
+    """Estimate the Jaccard similarity of two signatures."""
+    return sum(x == y for x, y in zip(first, second)) / NUM_PERMUTATIONS
+
+
+class NearDuplicateIndex:
+    """MinHash/LSH index of the chunks already processed in one scope."""
+
+    def __init__(self, threshold: float = 0.7, path: str | None = None):
+        """Create an index, loading the signatures saved at path if it exists."""
+        self.threshold = threshold
+        self.path = path
+        self._signatures: List[Signature] = []
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], List[int]] = defaultdict(list)
+        # Chunks being processed by concurrent pages, not yet indexed
+        self._reserved: Dict[Signature, int] = {}
+        self._lock = threading.Lock()
+        self.chunks_seen = 0
+        self.chunks_skipped = 0
+        self.tokens_saved = 0
+        if path and os.path.exists(path):
+            self._load()
+
+    def __len__(self) -> int:
+        """Return the number of indexed chunks."""
+        return len(self._signatures)
+
+    def _bands(self, signature: Signature):
+        for band in range(BANDS):
+            yield band, signature[band * ROWS : (band + 1) * ROWS]
+
+    def _insert(self, signature: Signature) -> None:
+        position = len(self._signatures)
+        self._signatures.append(signature)
+        for key in self._bands(signature):
+            self._buckets[key].append(position)
+
+    def find_duplicate(self, signature: Signature) -> float | None:
+        """Return the similarity of the closest indexed near-duplicate, if any."""
+        candidates = {
+            position
+            for key in self._bands(signature)
+            for position in self._buckets.get(key, ())
+        }
+        best = max(
+            (similarity(signature, self._signatures[p]) for p in candidates),
+            default=0.0,
+        )
+        return best if best >= self.threshold else None
+
+    def _is_reserved(self, signature: Signature) -> bool:
+        # Few chunks are in flight at once, so they are compared one by one
+        return any(
+            similarity(signature, reserved) >= self.threshold
+            for reserved in self._reserved
+        )
+
+    def add(self, chunk: str) -> bool:
+        """Index chunk and return True, or return False if it is a near-duplicate."""
+        signature = minhash(chunk)
+        if not signature:
+            return False
+        with self._lock:
+            if self.find_duplicate(signature) is not None:
+                return False
+            self._insert(signature)
+            return True
+
+    def add_all(self, chunks: List[str]) -> None:
+        """Index chunks whose events have been merged, and persist the index.
+
+        Reservations of the chunks are released.
+        """
+        for chunk in chunks:
+            self.add(chunk)
+            self._release(minhash(chunk))
+        if self.path:
+            self.save()
+
+    def _release(self, signature: Signature) -> None:
+        with self._lock:
+            count = self._reserved.get(signature, 0)
+            if count > 1:
+                self._reserved[signature] = count - 1
+            elif count:
+                del self._reserved[signature]
+
+    def release_all(self) -> None:
+        """Drop every reservation, e.g. after the pages holding them failed."""
+        with self._lock:
+            self._reserved.clear()
+
+    def filter(
+        self,
+        chunks: List[str],
+        count_tokens: Callable[[str], int],
+        batch: "NearDuplicateIndex | None" = None,
+        reserve: bool = False,
+    ) -> List[str]:
+        """Return the chunks that are not near-duplicates, without indexing them.
+
+        A chunk is dropped when it is a near-duplicate of an indexed chunk or
+        of a chunk kept earlier from the same source, tracked in batch (a new
+        one per call unless given, e.g. for a page read chunk by chunk).
+        count_tokens sizes the dropped chunks for the savings metrics.
+
+        With reserve, kept chunks are reserved in the same critical section as
+        their check, and chunks similar to a reservation are dropped too, until
+        add_all indexes them or release_all drops the reservations.
+        """
+        if batch is None:
+            batch = NearDuplicateIndex(self.threshold)
+        kept = []
+        for chunk in chunks:
+            signature = minhash(chunk)
+            with self._lock:
+                self.chunks_seen += 1
+                duplicate = bool(signature) and (
+                    self.find_duplicate(signature) is not None
+                    or batch.find_duplicate(signature) is not None
+                    or self._is_reserved(signature)
+                )
+                if duplicate:
+                    self.chunks_skipped += 1
+                    self.tokens_saved += count_tokens(chunk)
+                elif signature:
+                    batch._insert(signature)
+                    if reserve:
+                        self._reserved[signature] = self._reserved.get(signature, 0) + 1
+            if not duplicate:
+                kept.append(chunk)
+        return kept
+
+    def stats(self) -> Dict[str, int]:
+        """Return the running totals of the scope."""
+        return {
+            "indexed_chunks": len(self),
+            "chunks_seen": self.chunks_seen,
+            "chunks_skipped": self.chunks_skipped,
+            "tokens_saved": self.tokens_saved,
+        }
+
+    def save(self) -> None:
+        """Write the signatures to self.path atomically."""
+        with self._lock:
+            data = json.dumps({"signatures": self._signatures})
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp_path, "w") as f:
+            f.write(data)
+        os.replace(temp_path, self.path)
+
+    def _load(self) -> None:
+        try:
+            with open(self.path) as f:
+                signatures = json.load(f)["signatures"]
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning("Ignoring unreadable dedup index %s: %s", self.path, e)
+            return
+        for signature in signatures:
+            if len(signature) == NUM_PERMUTATIONS:
+                self._insert(tuple(signature))
+
+
+def dedup_scope(person: str, run_id: str, persistent: bool) -> str:
+    """Key of the index for a person: per run, or shared across runs if persisted.
+
+    Only share it when the run starts from the events of earlier runs: the
+    chunks it skips are those whose events are already in that state.
+    """
+    person_key = " ".join(person.lower().split())
+    return person_key if persistent else f"{person_key}#{run_id}"
+
+
+_indexes: "OrderedDict[str, NearDuplicateIndex]" = OrderedDict()
+_indexes_lock = threading.Lock()
+
+
+def get_dedup_index(
+    scope: str, threshold: float = 0.7, directory: str | None = None
+) -> NearDuplicateIndex:
+    """Return the index for scope, loading it from directory when persisted."""
+    with _indexes_lock:
+        index = _indexes.get(scope)
+        if index is None:
+            path = None
+            if directory:
+                name = hashlib.sha1(scope.encode()).hexdigest()
+                path = os.path.join(directory, f"{name}.json")
+            index = _indexes[scope] = NearDuplicateIndex(threshold, path)
+            while len(_indexes) > MAX_INDEXES:
+                _indexes.popitem(last=False)
+        else:
+            _indexes.move_to_end(scope)
+        index.threshold = threshold
+        return index
@@ -1,22 +1,42 @@
-from typing import List, Literal, TypedDict
+import asyncio
+import json
+import logging
+import re
+from contextlib import aclosing
+from functools import lru_cache
+from typing import AsyncIterator, List, Literal, NotRequired, Tuple, TypedDict
 
 from langchain_core.tools import tool
+from langchain_core.utils.function_calling import convert_to_openai_tool
 from langgraph.graph import START, StateGraph
-from langgraph.graph.state import Command, RunnableConfig
-from langgraph.pregel.main import asyncio
+from langgraph.graph.state import Command, CompiledStateGraph, RunnableConfig
 from pydantic import BaseModel, Field
 from src.configuration import Configuration
 from src.llm_service import create_llm_with_tools
-from src.research_events.chunk_graph import create_biographic_event_graph
+from src.research_events.biographic_scorer import classify_chunks_by_rules
+from src.research_events.chunk_graph import (
+    get_chunk_graph,
+    pack_chunks_by_token_budget,
+)
+from src.research_events.dedup import NearDuplicateIndex, get_dedup_index
 from src.research_events.merge_events.prompts import (
+    EXTRACT_AND_CATEGORIZE_PACKED_PROMPT,
     EXTRACT_AND_CATEGORIZE_PROMPT,
     MERGE_EVENTS_TEMPLATE,
 )
 from src.research_events.merge_events.utils import ensure_categories_with_events
+from src.services.chunking_service import ChunkingService
 from src.services.event_service import EventService
 from src.state import CategoriesWithEvents
-from src.url_crawler.utils import chunk_text_by_tokens
-from src.utils import get_langfuse_handler
+from src.url_crawler.utils import get_tokenizer
+from src.utils import (
+    LazyGraph,
+    gather_with_concurrency,
+    get_graph_callbacks,
+    lazy_graph_attributes,
+)
+
+logger = logging.getLogger(__name__)
 
 
 class RelevantEventsCategorized(BaseModel):
@@ -40,18 +60,53 @@ class IrrelevantChunk(BaseModel):
     """The chunk contains NO biographical events relevant to the research question."""
 
 
+chunk_graph = LazyGraph(get_chunk_graph)
+
+# A bullet of a packed extraction call, tagged with its chunk: "- [2] In 1891..."
+TAGGED_BULLET = re.compile(r"^(\s*[-*\u2022]\s*)\[(\d+)\]\s*")
+
+# Built once: the tool set is the same for every extraction call
+EXTRACTION_TOOLS = [tool(RelevantEventsCategorized), tool(IrrelevantChunk)]
+
+
 class InputMergeEventsState(TypedDict):
     """The complete state for the enhanced event merging sub-graph."""
 
     existing_events: CategoriesWithEvents
     extracted_events: str
     research_question: str
+    # Stop after extraction and return the per-chunk results in categorized_chunks
+    extract_only: NotRequired[bool]
+    # Already extracted events: skip straight to combining them with existing_events
+    extracted_events_categorized: NotRequired[CategoriesWithEvents]
+    # Scope of the near-duplicate chunk index (see research_events.dedup)
+    dedup_key: NotRequired[str | None]
+
+
+class ChunkFilterStats(TypedDict):
+    """Per-page counts of the relevance filter."""
+
+    total_chunks: int
+    relevant_chunks: int
+    dropped_chunks: int
+    extraction_calls_saved: int
+    rule_decided_chunks: int  # chunks kept or dropped by the local scorer
+
+
+class ChunkDedupStats(TypedDict):
+    """Per-page counts of the near-duplicate filter."""
+
+    total_chunks: int
+    skipped_chunks: int  # near-duplicates of chunks already processed
+    tokens_saved: int
 
 
 class MergeEventsState(InputMergeEventsState):
     text_chunks: List[str]  # token-based chunks
     categorized_chunks: List[CategoriesWithEvents]  # results per chunk
-    extracted_events_categorized: CategoriesWithEvents
+    chunk_filter_stats: ChunkFilterStats  # per-page relevance filter metrics
+    chunk_dedup_stats: ChunkDedupStats  # per-page near-duplicate metrics
+    new_chunks: List[str]  # chunks not seen before, indexed once their events merge
 
 
 class OutputMergeEventsState(TypedDict):
@@ -59,9 +114,20 @@ class OutputMergeEventsState(TypedDict):
 
 
 async def split_events(
-    state: MergeEventsState,
-) -> Command[Literal["filter_chunks", "__end__"]]:
+    state: MergeEventsState, config: RunnableConfig
+) -> Command[
+    Literal[
+        "filter_chunks",
+        "extract_and_categorize_chunks",
+        "combine_new_and_original_events",
+        "__end__",
+    ]
+]:
     """Use token-based chunking from URL crawler and filter for biographical events"""
+    if state.get("extracted_events_categorized") is not None:
+        # Pre-extracted events (e.g. from several pages crawled concurrently)
+        return Command(goto="combine_new_and_original_events")
+
     extracted_events = state.get("extracted_events", "")
 
     if not extracted_events.strip():
@@ -71,17 +137,144 @@ async def split_events(
             update={"text_chunks": [], "categorized_chunks": []},
         )
 
-    chunks = await chunk_text_by_tokens(extracted_events)
+    configurable = Configuration.from_runnable_config(config)
+    chunks = await ChunkingService.chunk(
+        extracted_events, config, overhead_tokens=extraction_overhead_tokens()
+    )
 
-    return Command(
-        goto="filter_chunks",
-        update={"text_chunks": chunks[0:20], "categorized_chunks": []},
+    if len(chunks) > configurable.max_chunks:
+        logger.info(
+            "Page split into %d chunks; processing the first %d (max_chunks)",
+            len(chunks),
+            configurable.max_chunks,
+        )
+        chunks = chunks[: configurable.max_chunks]
+
+    update = {"categorized_chunks": []}
+    dedup_index = get_chunk_dedup_index(state.get("dedup_key"), configurable)
+    if dedup_index is not None:
+        before = dedup_index.tokens_saved
+        # Pages extracted for one pipelined merge run concurrently: reserve
+        # their chunks so that mirrors arriving together are skipped too
+        unique_chunks = await asyncio.to_thread(
+            dedup_index.filter,
+            chunks,
+            count_chunk_tokens,
+            reserve=bool(state.get("extract_only")),
+        )
+        stats = ChunkDedupStats(
+            total_chunks=len(chunks),
+            skipped_chunks=len(chunks) - len(unique_chunks),
+            tokens_saved=dedup_index.tokens_saved - before,
+        )
+        logger.info(
+            "Chunk dedup: skipped %d/%d near-duplicate chunks (%d tokens); "
+            "%d chunks, %d tokens saved this run",
+            stats["skipped_chunks"],
+            len(chunks),
+            stats["tokens_saved"],
+            dedup_index.chunks_skipped,
+            dedup_index.tokens_saved,
+        )
+        chunks = unique_chunks
+        update["chunk_dedup_stats"] = stats
+        update["new_chunks"] = unique_chunks
+
+    if not chunks:
+        return Command(goto="__end__", update={"text_chunks": [], **update})
+
+    next_node = (
+        "filter_chunks"
+        if configurable.enable_chunk_filter
+        else "extract_and_categorize_chunks"
+    )
+
+    return Command(goto=next_node, update={"text_chunks": chunks, **update})
+
+
+def get_chunk_dedup_index(
+    dedup_key: str | None, configurable: Configuration
+) -> NearDuplicateIndex | None:
+    """Return the near-duplicate index for dedup_key, or None when dedup is off."""
+    if not dedup_key or not configurable.enable_chunk_dedup:
+        return None
+    return get_dedup_index(
+        dedup_key,
+        threshold=configurable.chunk_dedup_threshold,
+        directory=configurable.chunk_dedup_dir,
+    )
+
+
+async def remember_chunks(
+    dedup_key: str | None, chunks: List[str], config: RunnableConfig
+) -> None:
+    """Index chunks as seen once their events are merged (no-op when dedup is off)."""
+    configurable = Configuration.from_runnable_config(config)
+    dedup_index = get_chunk_dedup_index(dedup_key, configurable)
+    if dedup_index is not None and chunks:
+        await asyncio.to_thread(dedup_index.add_all, chunks)
+
+
+def release_reserved_chunks(dedup_key: str | None, config: RunnableConfig) -> None:
+    """Drop the chunks reserved by pages whose events will not be merged."""
+    dedup_index = get_chunk_dedup_index(
+        dedup_key, Configuration.from_runnable_config(config)
     )
+    if dedup_index is not None:
+        dedup_index.release_all()
+
+
+def count_chunk_tokens(chunk: str) -> int:
+    """Count the tokens of one chunk with the shared tokenizer."""
+    return len(get_tokenizer().encode(chunk))
+
+
+@lru_cache(maxsize=1)
+def extraction_overhead_tokens() -> int:
+    """Tokens of the prompt and tool schemas sent along with every chunk."""
+    schemas = json.dumps([convert_to_openai_tool(t) for t in EXTRACTION_TOOLS])
+    prompt = EXTRACT_AND_CATEGORIZE_PROMPT.format(text_chunk="")
+    return count_chunk_tokens(prompt) + count_chunk_tokens(schemas)
+
+
+async def classify_chunks_with_llm(
+    chunks: List[str], config: RunnableConfig, configurable: Configuration
+) -> List[bool]:
+    """Return one relevance verdict per chunk from the chunk classification model."""
+    if not chunks:
+        return []
+
+    if configurable.chunk_check_mode == "batched":
+        # Send the whole page at once so the classifier can pack chunks per request
+        chunk_result = await chunk_graph.ainvoke({"text": "", "chunks": chunks}, config)
+        return [
+            result.contains_biographic_event
+            for result in chunk_result["results"].values()
+        ]
+
+    # Split every chunk up front and check all sub-chunks in one graph call, so
+    # max_concurrent_chunk_checks bounds the model calls of the whole page
+    sub_chunks = [ChunkingService.split(chunk, configurable) for chunk in chunks]
+    flat = [sub_chunk for group in sub_chunks for sub_chunk in group]
+    if not flat:
+        return [False] * len(chunks)
+    chunk_result = await chunk_graph.ainvoke({"text": "", "chunks": flat}, config)
+    verdicts = [
+        result.contains_biographic_event for result in chunk_result["results"].values()
+    ]
+
+    # A chunk is relevant if any of its sub-chunks contains biographical events
+    relevant = []
+    start = 0
+    for group in sub_chunks:
+        relevant.append(any(verdicts[start : start + len(group)]))
+        start += len(group)
+    return relevant
 
 
 async def filter_chunks(
     state: MergeEventsState, config: RunnableConfig
-) -> Command[Literal["extract_and_categorize_chunk", "__end__"]]:
+) -> Command[Literal["extract_and_categorize_chunks", "__end__"]]:
     """Filter chunks to only process those containing biographical events"""
     chunks = state.get("text_chunks", [])
 
@@ -90,64 +283,71 @@ async def filter_chunks(
             goto="__end__",
         )
 
-    # Use chunk graph to filter for biographical events
-    chunk_graph = create_biographic_event_graph()
-
     configurable = Configuration.from_runnable_config(config)
     if len(chunks) > configurable.max_chunks:
         # To avoid recursion issues, set max chunks
         chunks = chunks[: configurable.max_chunks]
 
-    # Process each chunk through the biographic event detection graph
-    relevant_chunks = []
-    for chunk in chunks:
-        chunk_result = await chunk_graph.ainvoke({"text": chunk}, config)
-
-        # Check if any chunk contains biographical events
-        has_events = any(
-            result.contains_biographic_event
-            for result in chunk_result["results"].values()
+    # Decide the clear cases locally; only ambiguous chunks reach the model
+    if configurable.enable_rule_prefilter:
+        decisions = classify_chunks_by_rules(
+            chunks,
+            state.get("research_question", ""),
+            accept_score=configurable.rule_prefilter_accept_score,
+            reject_score=configurable.rule_prefilter_reject_score,
         )
-        print(f"contains_biographic_event: {has_events}")
+    else:
+        decisions = ["ambiguous"] * len(chunks)
 
-        if has_events:
-            relevant_chunks.append(chunk)
+    ambiguous = [chunk for chunk, d in zip(chunks, decisions) if d == "ambiguous"]
+    llm_verdicts = iter(await classify_chunks_with_llm(ambiguous, config, configurable))
 
-    if not relevant_chunks:
-        # No relevant chunks found
-        return Command(goto="__end__")
+    relevant_chunks = []
+    for chunk, decision in zip(chunks, decisions):
+        is_relevant = (
+            next(llm_verdicts) if decision == "ambiguous" else decision == "relevant"
+        )
+        if is_relevant:
+            relevant_chunks.append(chunk)
 
-    return Command(
-        goto="extract_and_categorize_chunk",
-        update={"text_chunks": chunks, "categorized_chunks": []},
+    # Every dropped chunk is one tools-model extraction call we no longer make
+    dropped = len(chunks) - len(relevant_chunks)
+    stats = ChunkFilterStats(
+        total_chunks=len(chunks),
+        relevant_chunks=len(relevant_chunks),
+        dropped_chunks=dropped,
+        extraction_calls_saved=dropped,
+        rule_decided_chunks=len(chunks) - len(ambiguous),
+    )
+    logger.info(
+        "Chunk filter: kept %d/%d chunks (%d decided without the LLM), "
+        "saved %d extraction calls",
+        len(relevant_chunks),
+        len(chunks),
+        stats["rule_decided_chunks"],
+        dropped,
     )
 
+    if not relevant_chunks:
+        # No relevant chunks found: the page is done unless a caller merges later
+        if not state.get("extract_only"):
+            await remember_chunks(
+                state.get("dedup_key"), state.get("new_chunks", []), config
+            )
+        return Command(goto="__end__", update={"chunk_filter_stats": stats})
 
-async def extract_and_categorize_chunk(
-    state: MergeEventsState, config: RunnableConfig
-) -> Command[Literal["extract_and_categorize_chunk", "merge_categorizations"]]:
-    """Combined extraction and categorization"""
-    chunks = state.get("text_chunks", [])
-    categorized_chunks = state.get("categorized_chunks", [])
-
-    if len(categorized_chunks) >= len(chunks):
-        # all categorized_chunks done → move to merge
-        return Command(goto="merge_categorizations")
-
-    # take next chunk
-    chunk = chunks[len(categorized_chunks)]
-    research_question = state.get("research_question", "")
-
-    prompt = EXTRACT_AND_CATEGORIZE_PROMPT.format(
-        # research_question=research_question,
-        text_chunk=chunk
+    return Command(
+        goto="extract_and_categorize_chunks",
+        update={
+            "text_chunks": relevant_chunks,
+            "categorized_chunks": [],
+            "chunk_filter_stats": stats,
+        },
     )
 
-    tools = [tool(RelevantEventsCategorized), tool(IrrelevantChunk)]
-    model = create_llm_with_tools(tools=tools, config=config)
-    response = await model.ainvoke(prompt)
 
-    # Parse response
+def parse_extraction_response(response) -> CategoriesWithEvents:
+    """Read the categorized events from an extraction tool call (empty if irrelevant)."""
     if (
         response.tool_calls
         and response.tool_calls[0]["name"] == "RelevantEventsCategorized"
@@ -158,16 +358,182 @@ async def extract_and_categorize_chunk(
             k: "\n".join(v) if isinstance(v, list) else v
             for k, v in categorized_data.items()
         }
-        categorized = CategoriesWithEvents(**categorized_data)
-    else:
-        categorized = CategoriesWithEvents(early="", personal="", career="", legacy="")
+        return CategoriesWithEvents(**categorized_data)
+
+    return CategoriesWithEvents(early="", personal="", career="", legacy="")
+
+
+async def extract_and_categorize_chunk(chunk: str, model) -> CategoriesWithEvents:
+    """Extract and categorize the events of a single chunk."""
+    prompt = EXTRACT_AND_CATEGORIZE_PROMPT.format(
+        # research_question=research_question,
+        text_chunk=chunk
+    )
+
+    response = await model.ainvoke(prompt)
+    return parse_extraction_response(response)
+
+
+def attribute_packed_events(
+    result: CategoriesWithEvents, chunk_count: int
+) -> List[CategoriesWithEvents]:
+    """Split the events of a packed call back into one result per chunk.
+
+    Bullets are attributed by their "[i]" chunk tag, which is removed. Lines
+    without a valid tag stay with the bullet before them (the first chunk
+    if there is none). Non-empty results end with a newline, so results
+    concatenated by EventService.merge_categorized_events keep one bullet
+    per line.
+    """
+    per_chunk = [
+        {category: [] for category in CategoriesWithEvents.model_fields}
+        for _ in range(chunk_count)
+    ]
+    for category in CategoriesWithEvents.model_fields:
+        current = 0
+        for line in getattr(result, category).splitlines():
+            match = TAGGED_BULLET.match(line)
+            if match and int(match.group(2)) < chunk_count:
+                current = int(match.group(2))
+                line = match.group(1) + line[match.end() :]
+            per_chunk[current][category].append(line)
+
+    def joined(lines: List[str]) -> str:
+        text = "\n".join(lines).strip()
+        return f"{text}\n" if text else ""
+
+    return [
+        CategoriesWithEvents(
+            **{category: joined(lines) for category, lines in chunk.items()}
+        )
+        for chunk in per_chunk
+    ]
+
+
+async def extract_and_categorize_packed_chunks(
+    chunks: List[str], model
+) -> List[CategoriesWithEvents]:
+    """Extract several chunks in one call and return one result per chunk."""
+    if len(chunks) == 1:
+        return [await extract_and_categorize_chunk(chunks[0], model)]
+
+    packed = "\n\n".join(
+        f'<chunk index="{i}">\n{chunk}\n</chunk>' for i, chunk in enumerate(chunks)
+    )
+    response = await model.ainvoke(
+        EXTRACT_AND_CATEGORIZE_PACKED_PROMPT.format(text_chunks=packed)
+    )
+    return attribute_packed_events(parse_extraction_response(response), len(chunks))
+
+
+def pack_extraction_batches(chunks: List[str], token_budget: int) -> List[List[int]]:
+    """Group chunk indices into extraction calls of at most token_budget tokens.
+
+    A budget of 0 (or less) sends one chunk per call.
+    """
+    if token_budget <= 0:
+        return [[i] for i in range(len(chunks))]
+    return pack_chunks_by_token_budget(chunks, token_budget)
+
+
+async def extract_and_categorize_chunks(
+    state: MergeEventsState, config: RunnableConfig
+) -> Command[Literal["merge_categorizations", "__end__"]]:
+    """Pack the chunks into extraction calls and collect one result per chunk, in input order."""
+    chunks = state.get("text_chunks", [])
+    configurable = Configuration.from_runnable_config(config)
+
+    model = create_llm_with_tools(tools=EXTRACTION_TOOLS, config=config)
+
+    # Fill every call up to the budget, so the prompt is paid once per batch
+    batches = pack_extraction_batches(
+        chunks, configurable.extraction_input_token_budget
+    )
+    if len(batches) < len(chunks):
+        logger.info(
+            "Extraction: packed %d chunks into %d calls", len(chunks), len(batches)
+        )
+    batch_results = await gather_with_concurrency(
+        configurable.max_concurrent_extractions,
+        (
+            extract_and_categorize_packed_chunks([chunks[i] for i in batch], model)
+            for batch in batches
+        ),
+    )
+    categorized_chunks = [result for results in batch_results for result in results]
 
     return Command(
-        goto="extract_and_categorize_chunk",  # loop until all chunks processed
-        update={"categorized_chunks": categorized_chunks + [categorized]},
+        goto="__end__" if state.get("extract_only") else "merge_categorizations",
+        update={"categorized_chunks": categorized_chunks},
     )
 
 
+async def extract_streamed_chunks(
+    chunks: AsyncIterator[str],
+    research_question: str,
+    config: RunnableConfig,
+    dedup_key: str | None = None,
+) -> Tuple[List[CategoriesWithEvents], List[str]]:
+    """Filter and extract each chunk as soon as it arrives from a streamed page.
+
+    Chunks are classified one at a time (batched classification would have to
+    wait for the page), and at most max_chunks chunks of a page are read.
+    Near-duplicates of chunks already processed under dedup_key, or reserved
+    by pages processed alongside this one, are skipped. Returns the events of the relevant chunks and the chunks processed, for
+    the caller to index with remember_chunks once it has merged the events.
+    """
+    configurable = Configuration.from_runnable_config(config)
+    dedup_index = get_chunk_dedup_index(dedup_key, configurable)
+    page_index = NearDuplicateIndex(configurable.chunk_dedup_threshold)
+    model = create_llm_with_tools(tools=EXTRACTION_TOOLS, config=config)
+    extraction_slots = asyncio.Semaphore(configurable.max_concurrent_extractions)
+
+    async def process(chunk: str) -> CategoriesWithEvents | None:
+        if configurable.enable_chunk_filter:
+            decision = "ambiguous"
+            if configurable.enable_rule_prefilter:
+                [decision] = classify_chunks_by_rules(
+                    [chunk],
+                    research_question,
+                    accept_score=configurable.rule_prefilter_accept_score,
+                    reject_score=configurable.rule_prefilter_reject_score,
+                )
+            if decision == "ambiguous":
+                [is_relevant] = await classify_chunks_with_llm(
+                    [chunk], config, configurable
+                )
+                decision = "relevant" if is_relevant else "irrelevant"
+            if decision == "irrelevant":
+                return None
+
+        async with extraction_slots:
+            return await extract_and_categorize_chunk(chunk, model)
+
+    tasks, new_chunks = [], []
+    try:
+        async with aclosing(chunks) as stream:
+            async for chunk in stream:
+                if dedup_index is not None and not await asyncio.to_thread(
+                    dedup_index.filter,
+                    [chunk],
+                    count_chunk_tokens,
+                    batch=page_index,
+                    reserve=True,
+                ):
+                    continue
+                new_chunks.append(chunk)
+                tasks.append(asyncio.create_task(process(chunk)))
+                if len(tasks) >= configurable.max_chunks:
+                    break
+        results = await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+
+    return [result for result in results if result is not None], new_chunks
+
+
 async def merge_categorizations(
     state: MergeEventsState,
 ) -> Command[Literal["combine_new_and_original_events"]]:
@@ -206,6 +572,9 @@ async def combine_new_and_original_events(
         for cat in CategoriesWithEvents.model_fields.keys()
     ):
         print("No new events found. Keeping existing events.")
+        await remember_chunks(
+            state.get("dedup_key"), state.get("new_chunks", []), config
+        )
         return Command(goto="__end__", update={"existing_events": existing_events})
 
     merge_tasks = []
@@ -247,6 +616,7 @@ async def combine_new_and_original_events(
             final_merged_dict[category] = getattr(existing_events, category, "")
 
     final_merged_output = CategoriesWithEvents(**final_merged_dict)
+    await remember_chunks(state.get("dedup_key"), state.get("new_chunks", []), config)
     return Command(goto="__end__", update={"existing_events": final_merged_output})
 
 
@@ -257,7 +627,7 @@ merge_events_graph_builder = StateGraph(
 merge_events_graph_builder.add_node("split_events", split_events)
 merge_events_graph_builder.add_node("filter_chunks", filter_chunks)
 merge_events_graph_builder.add_node(
-    "extract_and_categorize_chunk", extract_and_categorize_chunk
+    "extract_and_categorize_chunks", extract_and_categorize_chunks
 )
 merge_events_graph_builder.add_node("merge_categorizations", merge_categorizations)
 merge_events_graph_builder.add_node(
@@ -267,9 +637,12 @@ merge_events_graph_builder.add_node(
 merge_events_graph_builder.add_edge(START, "split_events")
 
 
-merge_events_app = merge_events_graph_builder.compile().with_config(
-    {
-        "callbacks": [get_langfuse_handler()],
-        "recursionLimit": 200,
-    },
-)
+@lru_cache(maxsize=1)
+def get_merge_events_app() -> CompiledStateGraph:
+    """Compile the merge events graph on first use."""
+    return merge_events_graph_builder.compile().with_config(
+        {"callbacks": get_graph_callbacks()}
+    )
+
+
+__getattr__ = lazy_graph_attributes(__name__, merge_events_app=get_merge_events_app)
@@ -51,6 +51,39 @@ You must call exactly one of the provided tools. Do not respond with plain text.
 """
 
 
+EXTRACT_AND_CATEGORIZE_PACKED_PROMPT = """
+You are a Biographical Event Extractor and Categorizer. Your task is to analyze text chunks for events related to the life of the historical figure**
+
+<Available Tools>
+- `IrrelevantChunk` (use if NONE of the chunks contain biographical events relevant to the research question)
+- `RelevantEventsCategorized` (use if any chunk contains relevant events - categorize them into the 4 categories)
+</Available Tools>
+
+<Categories>
+early: Covers childhood, upbringing, family, education, and early influences that shaped the author.
+personal: Focuses on relationships, friendships, family life, places of residence, and notable personal traits or beliefs.
+career: Details their professional journey: first steps into writing, major publications, collaborations, recurring themes, style, and significant milestones.
+legacy: Explains how their work was received, awards or recognition, cultural/literary impact, influence on other authors, and how they are remembered today.
+</Categories>
+
+**EXTRACTION RULES**:
+- Extract COMPLETE sentences with ALL available details (dates, names, locations, context, emotions, motivations)
+- Include surrounding context that makes the event meaningful and complete
+- Preserve the original narrative flow and descriptive language
+- Capture cause-and-effect relationships and consequences
+- Include only events directly relevant to the research question
+- Maintain chronological order within each category
+- Format as clean bullet points with complete, detailed descriptions (e.g., "- [0] In the spring of 1965, while living in a small apartment in Paris, she attended a poetry reading that fundamentally changed her approach to writing, inspiring her to experiment with free verse.")
+- The text is made of several chunks, each wrapped in <chunk index="N"> tags. Start EVERY bullet with the index of the chunk it comes from in square brackets, e.g. "- [2] ..."
+- IMPORTANT: Return each category as a SINGLE string containing all bullet points, not as a list
+
+<Text to Analyze>
+{text_chunks}
+</Text to Analyze>
+
+You must call exactly one of the provided tools. Do not respond with plain text.
+"""
+
 MERGE_EVENTS_TEMPLATE = """You are a helpful assistant that will merge two lists of events: 
 the original events (which must always remain) and new events (which may contain extra details). 
 The new events should only be treated as additions if they provide relevant new information. 
@@ -1,23 +1,45 @@
-from typing import Literal, TypedDict
+import logging
+from functools import lru_cache
+from typing import Literal, NotRequired, TypedDict
 
-from langchain_tavily import TavilySearch
 from langgraph.graph import END, START, StateGraph
-from langgraph.graph.state import RunnableConfig
+from langgraph.graph.state import CompiledStateGraph, RunnableConfig
 from langgraph.types import Command
 from pydantic import BaseModel, Field
 from src.configuration import Configuration
 from src.llm_service import create_llm_structured_model
-from src.research_events.merge_events.merge_events_graph import merge_events_app
-from src.services.url_service import URLService
+from src.research_events.merge_events.merge_events_graph import (
+    extract_streamed_chunks,
+    extraction_overhead_tokens,
+    get_merge_events_app,
+    release_reserved_chunks,
+    remember_chunks,
+)
+from src.services.event_service import EventService
+from src.services.search_service import SearchService
+from src.services.url_service import URLService, load_domain_priors
 from src.state import CategoriesWithEvents
-from src.url_crawler.url_krawler_graph import url_crawler_app
-from src.utils import get_langfuse_handler
+from src.url_crawler.streaming import stream_page_chunks
+from src.url_crawler.url_krawler_graph import get_url_crawler_app
+from src.utils import (
+    LazyGraph,
+    gather_with_concurrency,
+    get_graph_callbacks,
+    lazy_graph_attributes,
+)
+
+logger = logging.getLogger(__name__)
+
+url_crawler_app = LazyGraph(get_url_crawler_app)
+merge_events_app = LazyGraph(get_merge_events_app)
 
 
 class InputResearchEventsState(TypedDict):
     research_question: str
     existing_events: CategoriesWithEvents
     used_domains: list[str]
+    # Scope of the near-duplicate chunk index shared by the run's pages
+    dedup_key: NotRequired[str | None]
 
 
 class ResearchEventsState(InputResearchEventsState):
@@ -35,7 +57,23 @@ class BestUrls(BaseModel):
     selected_urls: list[str] = Field(description="A list of the two best URLs.")
 
 
-def url_finder(
+# Number of URLs crawled per ResearchEventsTool call
+URLS_TO_SELECT = 2
+
+# Snippet characters shown to the URL-selection model per result
+SNIPPET_PREVIEW_CHARS = 300
+
+
+def format_search_results(results: list[dict]) -> str:
+    """Render search results as URL, title and snippet lines for the prompt."""
+    return "\n".join(
+        f"- {result['url']}\n  {result.get('title') or ''}\n  "
+        f"{(result.get('content') or '')[:SNIPPET_PREVIEW_CHARS]}"
+        for result in results
+    )
+
+
+async def url_finder(
     state: ResearchEventsState,
     config: RunnableConfig,
 ) -> Command[Literal["should_process_url_router"]]:
@@ -46,17 +84,39 @@ def url_finder(
     if not research_question:
         raise ValueError("research_question is required")
 
-    tool = TavilySearch(
+    results = await SearchService.search(
+        research_question,
+        config,
         max_results=6,
         topic="general",
-        include_raw_content=False,
-        include_answer=False,
         exclude_domains=used_domains,
     )
 
-    result = tool.invoke({"query": research_question})
+    configurable = Configuration.from_runnable_config(config)
+    ranked = URLService.rank_urls(
+        results,
+        research_question,
+        load_domain_priors(configurable.url_domain_priors_path),
+    )
+    mode = configurable.url_selection_mode
+    if mode == "local" or (
+        mode == "hybrid"
+        and URLService.is_ranking_confident(
+            ranked, URLS_TO_SELECT, configurable.url_selection_margin
+        )
+    ):
+        # No LLM round trip: the local ranking decides
+        return Command(
+            goto="should_process_url_router",
+            update={"urls": URLService.top_ranked_urls(ranked, URLS_TO_SELECT)},
+        )
 
-    urls = [result["url"] for result in result["results"]]
+    if mode == "hybrid":
+        # Let the model break the tie among the closest candidates only
+        candidates = {
+            url for url, _ in URLService.best_per_domain(ranked)[: URLS_TO_SELECT * 2]
+        }
+        results = [result for result in results if result["url"] in candidates]
 
     prompt = """
         From the results below, select the two URLs that will provide the most bibliographical events 
@@ -73,28 +133,13 @@ def url_finder(
 
     """
 
-    prompt = prompt.format(results=urls, research_question=research_question)
+    prompt = prompt.format(
+        results=format_search_results(results), research_question=research_question
+    )
 
     structured_llm = create_llm_structured_model(config=config, class_name=BestUrls)
 
-    structured_result = structured_llm.invoke(prompt)
-
-    # return Command(
-    #     goto=END,
-    #     update={
-    #         "existing_events": CategoriesWithEvents(
-    #             early="test", personal="test", career="test", legacy="test"
-    #         ),
-    #         "used_domains": ["en.wikipedia.org", "www.britannica.com"],
-    #     },
-    # )
-
-    ### call to tavily/duck duck go
-    # urls = model.invoke(research_question)
-    # urls = [
-    #     "https://en.wikipedia.org/wiki/Henry_Miller",
-    #     "https://www.britannica.com/biography/Henry-Miller",
-    # ]
+    structured_result = await structured_llm.ainvoke(prompt)
 
     return Command(
         goto="should_process_url_router",
@@ -113,10 +158,16 @@ def updateUrlList(
 
 def should_process_url_router(
     state: ResearchEventsState,
-) -> Command[Literal["crawl_url", "__end__"]]:
+    config: RunnableConfig,
+) -> Command[Literal["crawl_url", "crawl_urls_pipelined", "__end__"]]:
     urls = state.get("urls", [])
     used_domains = state.get("used_domains", [])
 
+    configurable = Configuration.from_runnable_config(config)
+    if urls and configurable.url_crawl_mode == "pipelined":
+        logger.info("Crawling %d URLs concurrently.", len(urls))
+        return Command(goto="crawl_urls_pipelined")
+
     if urls and len(urls) > 0:
         domain = URLService.extract_domain(urls[0])
         if domain in used_domains:
@@ -174,6 +225,7 @@ async def merge_events_and_update(
             "existing_events": existing_events,
             "extracted_events": extracted_events,
             "research_question": research_question,
+            "dedup_key": state.get("dedup_key"),
         }
     )
 
@@ -191,6 +243,96 @@ async def merge_events_and_update(
     )
 
 
+async def crawl_and_extract(
+    url: str, state: ResearchEventsState, config: RunnableConfig
+) -> tuple[list[CategoriesWithEvents], list[str]]:
+    """Scrape one page and extract its categorized events, without merging them.
+
+    Also returns the page's chunks that were new to the dedup index, to be
+    indexed once the events are merged.
+    """
+    if Configuration.from_runnable_config(config).streaming_scrape:
+        return await extract_streamed_chunks(
+            stream_page_chunks(
+                url, config, overhead_tokens=extraction_overhead_tokens()
+            ),
+            state["research_question"],
+            config,
+            dedup_key=state.get("dedup_key"),
+        )
+
+    crawl_result = await url_crawler_app.ainvoke(
+        {"url": url, "research_question": state["research_question"]}, config
+    )
+    result = await merge_events_app.ainvoke(
+        {
+            "existing_events": state.get("existing_events", CategoriesWithEvents()),
+            "extracted_events": crawl_result["extracted_events"],
+            "research_question": state["research_question"],
+            "extract_only": True,
+            "dedup_key": state.get("dedup_key"),
+        },
+        config,
+    )
+    return result.get("categorized_chunks", []), result.get("new_chunks", [])
+
+
+async def crawl_urls_pipelined(
+    state: ResearchEventsState,
+    config: RunnableConfig,
+) -> Command[Literal["__end__"]]:
+    """Scrapes and extracts every URL concurrently, then merges once in URL order."""
+    research_question = state.get("research_question", "")
+    if not research_question:
+        raise ValueError("research_question is required for url crawling")
+
+    urls, used_domains = URLService.select_unused_urls(
+        state.get("urls", []), state.get("used_domains", [])
+    )
+    configurable = Configuration.from_runnable_config(config)
+
+    try:
+        per_url_results = await gather_with_concurrency(
+            configurable.max_concurrent_url_crawls,
+            (crawl_and_extract(url, state, config) for url in urls),
+        )
+
+        # Only the merge into existing_events is ordered: one combine step for all pages
+        categorized_chunks = [
+            chunk for chunks, _ in per_url_results for chunk in chunks
+        ]
+        result = await merge_events_app.ainvoke(
+            {
+                "existing_events": state.get("existing_events", CategoriesWithEvents()),
+                "extracted_events": "",
+                "research_question": research_question,
+                "extracted_events_categorized": EventService.merge_categorized_events(
+                    categorized_chunks
+                ),
+            },
+            config,
+        )
+    except BaseException:
+        # Nothing was merged: let a retry process the reserved chunks again
+        release_reserved_chunks(state.get("dedup_key"), config)
+        raise
+
+    await remember_chunks(
+        state.get("dedup_key"),
+        [chunk for _, new_chunks in per_url_results for chunk in new_chunks],
+        config,
+    )
+
+    return Command(
+        goto=END,
+        update={
+            "existing_events": result["existing_events"],
+            "urls": [],
+            "used_domains": used_domains,
+        },
+    )
+
+
 research_events_builder = StateGraph(
     ResearchEventsState,
     input_schema=InputResearchEventsState,
@@ -203,11 +345,20 @@ research_events_builder.add_node("url_finder", url_finder)
 research_events_builder.add_node("should_process_url_router", should_process_url_router)
 research_events_builder.add_node("crawl_url", crawl_url)
 research_events_builder.add_node("merge_events_and_update", merge_events_and_update)
+research_events_builder.add_node("crawl_urls_pipelined", crawl_urls_pipelined)
 
 # Set the entry point
 research_events_builder.add_edge(START, "url_finder")
 
 
-research_events_app = research_events_builder.compile().with_config(
-    {"callbacks": [get_langfuse_handler()]}
+@lru_cache(maxsize=1)
+def get_research_events_app() -> CompiledStateGraph:
+    """Compile the research events graph on first use."""
+    return research_events_builder.compile().with_config(
+        {"callbacks": get_graph_callbacks()}
+    )
+
+
+__getattr__ = lazy_graph_attributes(
+    __name__, research_events_app=get_research_events_app
 )
@@ -0,0 +1,219 @@
+"""The one place text is split into chunks for the LLM.
+
+Every chunker (page chunks before classification and extraction, sub-chunks
+in the chunk classifier, event text) goes through `ChunkingService`, which
+reads its settings from `Configuration`:
+
+- chunking_strategy: "markdown" (whole sections and paragraphs) or
+  "tokens" (fixed overlapping windows)
+- chunk_size_mode: "fixed" uses default_chunk_size; "auto" picks the size
+  from the document length and the room a call leaves in
+  chunk_context_window (see core.chunking.auto_chunk_size)
+- default_overlap_size: overlap of token windows
+
+Text that arrives piece by piece (a page being downloaded) is chunked by
+`ChunkingService.stream` with the same strategy, a bounded buffer at a time.
+"""
+
+import asyncio
+from contextlib import aclosing
+from typing import AsyncIterator, List
+
+from langchain_core.runnables import RunnableConfig
+from src.configuration import Configuration
+from src.core.chunking import (
+    HEADING_LINE,
+    PARAGRAPH_BREAK,
+    SEPARATOR,
+    auto_chunk_size,
+    chunk_by_tokens,
+    chunk_markdown,
+    markdown_sections,
+    max_chunk_size_for_window,
+)
+from src.url_crawler.utils import get_configuration, get_tokenizer
+
+# A stream is chunked once this many chunks' worth of tokens are buffered
+STREAM_FLUSH_CHUNKS = 4
+
+# Without a heading or paragraph break to cut at, a stream is cut at the last
+# whitespace once this many chunks' worth of tokens are buffered
+STREAM_MAX_CHUNKS = 8
+
+
+class StreamChunker:
+    """Chunks text fed piece by piece the way ChunkingService.split would.
+
+    Pieces are buffered until a few chunks' worth of tokens have arrived,
+    then the buffer is cut at a boundary and the part before it chunked:
+
+    - "markdown": cut before the last heading, or else at the last paragraph
+      break, with the headings the cut falls under repeated after it
+    - "tokens": cut at the last whitespace; the last window is kept back and
+      chunked again with the following text, so windows still overlap
+    """
+
+    def __init__(self, configurable: Configuration, encoding, chunk_size: int):
+        """Chunk with configurable's strategy into chunk_size token windows."""
+        self.configurable = configurable
+        self.encoding = encoding
+        self.chunk_size = chunk_size
+        self._text = ""
+        self._tokens = 0  # tokens buffered, counted per piece
+
+    def feed(self, text: str) -> List[str]:
+        """Add text and return the chunks that are complete."""
+        self._text += text
+        self._tokens += len(self.encoding.encode_ordinary(text))
+        if self._tokens < STREAM_FLUSH_CHUNKS * self.chunk_size:
+            return []
+        cut, carried = self._cut()
+        if cut <= 0:
+            return []
+        head, self._text = self._text[:cut], carried + self._text[cut:]
+        chunks, kept_back = self._chunk(head, final=False)
+        self._text = kept_back + self._text
+        self._tokens = len(self.encoding.encode_ordinary(self._text))
+        return chunks
+
+    def close(self) -> List[str]:
+        """Return the chunks of the text still buffered."""
+        text, self._text, self._tokens = self._text, "", 0
+        if not text.strip():
+            return []
+        return self._chunk(text, final=True)[0]
+
+    def _cut(self) -> tuple[int, str]:
+        """Return where to cut the buffer and the text to repeat after the cut."""
+        text = self._text
+        forced = self._tokens >= STREAM_MAX_CHUNKS * self.chunk_size
+        if self.configurable.chunking_strategy == "tokens":
+            return max(text.rfind(" "), text.rfind("\n")), ""
+
+        headings = [m.start() for m in HEADING_LINE.finditer(text) if m.start() > 0]
+        if headings and headings[-1] >= len(text) // 2:
+            return headings[-1], ""
+        breaks = [m.end() for m in PARAGRAPH_BREAK.finditer(text)]
+        if breaks and (breaks[-1] >= len(text) // 2 or forced):
+            cut = breaks[-1]
+        elif forced:
+            cut = max(text.rfind(" "), text.rfind("\n"))
+        else:
+            return 0, ""
+        if cut <= 0:
+            return 0, ""
+        parents, heading, _ = markdown_sections(text[:cut])[-1]
+        trail = parents + ((heading,) if heading else ())
+        return cut, "\n".join(trail) + SEPARATOR if trail else ""
+
+    def _chunk(self, text: str, final: bool) -> tuple[List[str], str]:
+        """Chunk text; unless final, also return the text held back for later."""
+        if self.configurable.chunking_strategy == "markdown":
+            return chunk_markdown(text, self.encoding, self.chunk_size), ""
+        windows = chunk_by_tokens(
+            text,
+            self.encoding,
+            self.chunk_size,
+            self.configurable.default_overlap_size,
+        )
+        if final or len(windows) < 2 or windows[-1].source is not text:
+            return [window.text for window in windows], ""
+        # The last window may be short: chunk it again with the text that follows
+        return [window.text for window in windows[:-1]], text[windows[-1].start :]
+
+
+class ChunkingService:
+    """Splits page text into chunks sized for the model prompts."""
+
+    @staticmethod
+    def max_chunk_size(configurable: Configuration, overhead_tokens: int = 0) -> int:
+        """Largest chunk that fits one call next to its prompt and answer."""
+        return max_chunk_size_for_window(
+            configurable.chunk_context_window,
+            overhead_tokens,
+            configurable.tools_llm_max_tokens,
+        )
+
+    @staticmethod
+    def chunk_size_for(
+        configurable: Configuration,
+        document_tokens: int | None = None,
+        overhead_tokens: int = 0,
+    ) -> int:
+        """Chunk size in tokens for a document (of unknown length if None)."""
+        if configurable.chunk_size_mode == "fixed":
+            return configurable.default_chunk_size
+        limit = ChunkingService.max_chunk_size(configurable, overhead_tokens)
+        if document_tokens is None:
+            return limit
+        overlap = (
+            configurable.default_overlap_size
+            if configurable.chunking_strategy == "tokens"
+            else 0
+        )
+        return auto_chunk_size(document_tokens, limit, overlap)
+
+    @staticmethod
+    def split(
+        text: str,
+        configurable: Configuration,
+        encoding=None,
+        overhead_tokens: int = 0,
+    ) -> List[str]:
+        """Split text into chunks as configured.
+
+        overhead_tokens is the prompt a chunk is sent with; it only matters
+        in auto mode.
+        """
+        if not text.strip():
+            return []
+        encoding = encoding or get_tokenizer()
+        document_tokens = len(encoding.encode_ordinary(text))
+        chunk_size = ChunkingService.chunk_size_for(
+            configurable, document_tokens, overhead_tokens
+        )
+        if document_tokens <= chunk_size:
+            return [text]
+        if configurable.chunking_strategy == "markdown":
+            return chunk_markdown(text, encoding, chunk_size)
+        chunks = chunk_by_tokens(
+            text, encoding, chunk_size, configurable.default_overlap_size
+        )
+        return [chunk.text for chunk in chunks]
+
+    @staticmethod
+    async def stream(
+        pieces: AsyncIterator[str],
+        configurable: Configuration,
+        overhead_tokens: int = 0,
+    ) -> AsyncIterator[str]:
+        """Yield the chunks of text arriving in pieces, as soon as they are complete.
+
+        The text's length is not known up front, so auto mode uses the
+        largest chunk that fits a call with overhead_tokens of prompt.
+        """
+        encoding = await asyncio.to_thread(get_tokenizer)
+        chunker = StreamChunker(
+            configurable,
+            encoding,
+            ChunkingService.chunk_size_for(
+                configurable, overhead_tokens=overhead_tokens
+            ),
+        )
+        async with aclosing(pieces) as stream:
+            async for piece in stream:
+                for chunk in chunker.feed(piece):
+                    yield chunk
+        for chunk in chunker.close():
+            yield chunk
+
+    @staticmethod
+    async def chunk(
+        text: str, config: RunnableConfig | None = None, overhead_tokens: int = 0
+    ) -> List[str]:
+        """Split text into chunks as configured, off the event loop."""
+        configurable = get_configuration(config)
+        encoding = await asyncio.to_thread(get_tokenizer)
+        return await asyncio.to_thread(
+            ChunkingService.split, text, configurable, encoding, overhead_tokens
+        )
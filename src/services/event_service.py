@@ -1,16 +1,56 @@
+import re
 from typing import List
+from langchain_core.runnables import RunnableConfig
+from src.services.chunking_service import ChunkingService
 from src.state import CategoriesWithEvents
+from src.url_crawler.utils import get_configuration, get_tokenizer
+
+# A bullet starts on a line beginning with "-", "*" or "•"; other lines continue it
+BULLET_START = re.compile(r"^\s*[-*\u2022]\s", re.MULTILINE)
 
 
 class EventService:
     @staticmethod
-    def split_events_into_chunks(extracted_events: str, max_len: int = 2000) -> List[str]:
-        """Split events text into chunks of specified length."""
-        return [
-            extracted_events[i : i + max_len]
-            for i in range(0, len(extracted_events), max_len)
-        ]
+    def split_events_into_chunks(
+        extracted_events: str, config: RunnableConfig | None = None
+    ) -> List[str]:
+        """Split events text into chunks as configured (see ChunkingService)."""
+        return ChunkingService.split(extracted_events, get_configuration(config))
     
+    @staticmethod
+    def split_bullets_into_batches(events_text: str, max_tokens: int) -> List[str]:
+        """Split bullet-point events text into batches of at most max_tokens tokens.
+
+        Batches break only between bullets, so a single bullet larger than the
+        budget gets a batch of its own. Blank text yields no batches.
+        """
+        if not events_text.strip():
+            return []
+
+        starts = [match.start() for match in BULLET_START.finditer(events_text)]
+        if not starts or starts[0] != 0:
+            starts.insert(0, 0)
+        bullets = [
+            events_text[start:end].strip()
+            for start, end in zip(starts, starts[1:] + [len(events_text)])
+        ]
+        bullets = [bullet for bullet in bullets if bullet]
+
+        encoding = get_tokenizer()
+        batches: List[str] = []
+        current: List[str] = []
+        current_tokens = 0
+        for bullet in bullets:
+            bullet_tokens = len(encoding.encode(bullet))
+            if current and current_tokens + bullet_tokens > max_tokens:
+                batches.append("\n".join(current))
+                current, current_tokens = [], 0
+            current.append(bullet)
+            current_tokens += bullet_tokens
+        if current:
+            batches.append("\n".join(current))
+        return batches
+
     @staticmethod
     def merge_categorized_events(categorized_results: List[CategoriesWithEvents]) -> CategoriesWithEvents:
         """Merge multiple categorized event results into one."""
@@ -22,9 +62,14 @@ class EventService:
         )
         
         for result in categorized_results:
-            merged.early += result.early
-            merged.personal += result.personal
-            merged.career += result.career
-            merged.legacy += result.legacy
+            for category in CategoriesWithEvents.model_fields:
+                events = getattr(result, category)
+                if not events:
+                    continue
+                text = getattr(merged, category)
+                # Keep the bullets of different results on separate lines
+                if not text.endswith("\n"):
+                    text += "\n"
+                setattr(merged, category, text + events)
             
         return merged
\ No newline at end of file
@@ -0,0 +1,167 @@
+"""Async web search with a persistent result cache and pluggable backends.
+
+Results are cached on disk (in a `PageCache` of their own) keyed by the
+normalized query, topic, max_results and excluded domains, so repeated runs
+reuse earlier searches until the TTL expires. The backend is picked by
+`Configuration.search_backend`:
+
+- "tavily": the Tavily search API (default)
+- "stub": POST the query to `search_stub_url`, e.g. a local stub server
+  standing in for Tavily in tests and benchmarks
+"""
+
+import asyncio
+import json
+from typing import Any, Dict, Iterable, List
+from urllib.parse import urlencode
+
+from langchain_core.runnables import RunnableConfig
+from src.configuration import Configuration
+from src.url_crawler.http_session import get_http_session
+from src.url_crawler.page_cache import get_page_cache
+from src.url_crawler.scrapers import client_timeout
+from src.url_crawler.utils import get_configuration
+
+SearchResult = Dict[str, Any]  # {"url": ..., "title": ..., "content": ...}
+
+
+class SearchBackend:
+    """A search backend: returns result dicts with at least a "url" key."""
+
+    name = ""
+
+    async def search(
+        self,
+        query: str,
+        configurable: Configuration,
+        max_results: int,
+        topic: str,
+        exclude_domains: List[str],
+    ) -> List[SearchResult]:
+        """Search for query."""
+        raise NotImplementedError
+
+
+class TavilySearchBackend(SearchBackend):
+    """Searches through the Tavily API."""
+
+    name = "tavily"
+
+    async def search(self, query, configurable, max_results, topic, exclude_domains):
+        """Run the Tavily search tool asynchronously."""
+        from langchain_tavily import TavilySearch
+
+        tool = TavilySearch(
+            max_results=max_results,
+            topic=topic,
+            include_raw_content=False,
+            include_answer=False,
+            exclude_domains=exclude_domains,
+        )
+        result = await tool.ainvoke({"query": query})
+        return result.get("results", [])
+
+
+class StubSearchBackend(SearchBackend):
+    """Posts the search to a local server speaking a minimal Tavily-like protocol."""
+
+    name = "stub"
+
+    async def search(self, query, configurable, max_results, topic, exclude_domains):
+        """POST the query to search_stub_url and return its "results"."""
+        session = get_http_session(
+            limit=configurable.http_pool_limit,
+            limit_per_host=configurable.http_pool_limit_per_host,
+            keepalive_seconds=configurable.http_keepalive_seconds,
+        )
+        async with session.post(
+            configurable.search_stub_url,
+            json={
+                "query": query,
+                "max_results": max_results,
+                "topic": topic,
+                "exclude_domains": exclude_domains,
+            },
+            timeout=client_timeout(30),
+        ) as response:
+            response.raise_for_status()
+            data = await response.json()
+            return data.get("results", [])
+
+
+SEARCH_BACKENDS: Dict[str, SearchBackend] = {
+    backend.name: backend for backend in (TavilySearchBackend(), StubSearchBackend())
+}
+
+
+def get_search_backend(name: str) -> SearchBackend:
+    """Return the search backend registered under name."""
+    try:
+        return SEARCH_BACKENDS[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown search backend {name!r}; expected one of {sorted(SEARCH_BACKENDS)}"
+        ) from None
+
+
+class SearchService:
+    """Web search through the configured backend and the search result cache."""
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        """Lowercase the query and collapse its whitespace."""
+        return " ".join(query.lower().split())
+
+    @staticmethod
+    def cache_key(
+        backend: str,
+        query: str,
+        max_results: int,
+        topic: str,
+        exclude_domains: Iterable[str],
+    ) -> str:
+        """Build the cache key; the excluded domains are order-insensitive."""
+        excluded = sorted({domain.lower() for domain in exclude_domains})
+        params = urlencode(
+            {
+                "q": SearchService.normalize_query(query),
+                "max_results": max_results,
+                "exclude": ",".join(excluded),
+            }
+        )
+        return f"search://{backend}/{topic}?{params}"
+
+    @staticmethod
+    async def search(
+        query: str,
+        config: RunnableConfig | None = None,
+        max_results: int = 6,
+        topic: str = "general",
+        exclude_domains: Iterable[str] = (),
+    ) -> List[SearchResult]:
+        """Search the web without blocking the event loop, using the cache."""
+        configurable = get_configuration(config)
+        exclude_domains = list(exclude_domains)
+        backend = get_search_backend(configurable.search_backend)
+
+        cache = None
+        if configurable.search_cache_enabled:
+            cache = get_page_cache(
+                configurable.search_cache_dir,
+                ttl_seconds=configurable.search_cache_ttl_seconds,
+            )
+            key = SearchService.cache_key(
+                backend.name, query, max_results, topic, exclude_domains
+            )
+            cached = await asyncio.to_thread(cache.get, key)
+            if cached is not None:
+                return json.loads(cached[0])
+
+        results = await backend.search(
+            query, configurable, max_results, topic, exclude_domains
+        )
+
+        # Empty result lists are not cached; they are usually transient
+        if cache is not None and results:
+            await asyncio.to_thread(cache.set, key, json.dumps(results))
+        return results
@@ -1,5 +1,64 @@
-from urllib.parse import urlparse
-from typing import List
+import json
+from functools import lru_cache
+from typing import Any, Dict, List
+from urllib.parse import unquote, urlparse
+
+from src.research_events.biographic_scorer import extract_subject_terms, score_chunks
+
+# Prior belief in a domain as a source of biographical events, from -1 to 1.
+# A key matches the domain itself and all of its subdomains.
+DEFAULT_DOMAIN_PRIORS: Dict[str, float] = {
+    "wikipedia.org": 1.0,
+    "britannica.com": 0.9,
+    "biography.com": 0.8,
+    "nobelprize.org": 0.7,
+    "poetryfoundation.org": 0.6,
+    "loc.gov": 0.6,
+    "archives.gov": 0.6,
+    "nytimes.com": 0.5,
+    "theguardian.com": 0.5,
+    "bbc.co.uk": 0.5,
+    "bbc.com": 0.5,
+    "history.com": 0.5,
+    "imdb.com": 0.2,
+    "youtube.com": -0.8,
+    "facebook.com": -1.0,
+    "instagram.com": -1.0,
+    "tiktok.com": -1.0,
+    "twitter.com": -1.0,
+    "x.com": -1.0,
+    "pinterest.com": -1.0,
+    "amazon.com": -1.0,
+    "ebay.com": -1.0,
+    "reddit.com": -0.5,
+    "quora.com": -0.5,
+}
+
+# Weight of each ranking signal; every signal is scaled to at most 1
+URL_SCORE_WEIGHTS: Dict[str, float] = {
+    "domain": 1.0,
+    "snippet": 1.0,
+    "title": 1.0,
+    "engine": 0.5,
+}
+
+# Biographical signal score (see score_chunks) at which a snippet counts as fully
+# relevant: about one dated life event with the subject's name
+SNIPPET_SATURATION = 6.0
+
+
+@lru_cache(maxsize=8)
+def load_domain_priors(path: str | None) -> Dict[str, float]:
+    """Return the default domain priors, overridden by a JSON file if one is given.
+
+    The file maps domains to a prior between -1 and 1.
+    """
+    priors = dict(DEFAULT_DOMAIN_PRIORS)
+    if path:
+        with open(path) as f:
+            for domain, prior in json.load(f).items():
+                priors[domain.lower()] = float(prior)
+    return priors
 
 
 class URLService:
@@ -25,4 +84,101 @@ class URLService:
         # Remove first URL
         remaining_urls = urls[1:]
         
-        return remaining_urls, updated_used_domains
\ No newline at end of file
+        return remaining_urls, updated_used_domains
+
+    @staticmethod
+    def select_unused_urls(urls: List[str], used_domains: List[str]) -> tuple[List[str], List[str]]:
+        """Keep the first URL of every domain not used yet and track those domains.
+
+        Matches processing the list one URL at a time with update_url_list:
+        a later URL whose domain was already crawled is skipped.
+        """
+        selected = []
+        updated_used_domains = used_domains.copy()
+        for url in urls:
+            domain = URLService.extract_domain(url)
+            if domain in updated_used_domains:
+                continue
+            updated_used_domains.append(domain)
+            selected.append(url)
+
+        return selected, updated_used_domains
+
+    @staticmethod
+    def domain_prior(url: str, priors: Dict[str, float]) -> float:
+        """Return the prior of the most specific matching domain, 0 if unknown."""
+        host = URLService.extract_domain(url).lower().split(":")[0]
+        labels = host.split(".")
+        for i in range(len(labels) - 1):
+            prior = priors.get(".".join(labels[i:]))
+            if prior is not None:
+                return prior
+        return 0.0
+
+    @staticmethod
+    def rank_urls(
+        results: List[Dict[str, Any]],
+        research_question: str,
+        priors: Dict[str, float] = DEFAULT_DOMAIN_PRIORS,
+    ) -> List[tuple[str, float]]:
+        """Score search results locally, best first.
+
+        Combines the domain prior, the biographical density of the snippet,
+        how much of the subject's name appears in the title or URL, and the
+        search engine's own relevance score. Ties keep the engine's order.
+        """
+        subject_terms = extract_subject_terms(research_question)
+        snippets = [result.get("content") or "" for result in results]
+        densities = score_chunks(snippets, subject_terms) if results else []
+
+        scored = []
+        for result, density in zip(results, densities):
+            url = result["url"]
+            label = f"{result.get('title') or ''} {unquote(url)}".lower()
+            title_match = (
+                sum(term.lower() in label for term in subject_terms)
+                / len(subject_terms)
+                if subject_terms
+                else 0.0
+            )
+            signals = {
+                "domain": URLService.domain_prior(url, priors),
+                "snippet": min(density / SNIPPET_SATURATION, 1.0),
+                "title": title_match,
+                "engine": min(max(float(result.get("score") or 0.0), 0.0), 1.0),
+            }
+            score = sum(
+                URL_SCORE_WEIGHTS[name] * value for name, value in signals.items()
+            )
+            scored.append((url, score))
+
+        return sorted(scored, key=lambda item: -item[1])
+
+    @staticmethod
+    def best_per_domain(ranked: List[tuple[str, float]]) -> List[tuple[str, float]]:
+        """Keep only the best ranked URL of each domain, in ranking order."""
+        best, domains = [], set()
+        for url, score in ranked:
+            domain = URLService.extract_domain(url)
+            if domain not in domains:
+                domains.add(domain)
+                best.append((url, score))
+        return best
+
+    @staticmethod
+    def top_ranked_urls(ranked: List[tuple[str, float]], count: int) -> List[str]:
+        """Take the best ranked URL of each domain until count URLs are chosen."""
+        return [url for url, _ in URLService.best_per_domain(ranked)[:count]]
+
+    @staticmethod
+    def is_ranking_confident(
+        ranked: List[tuple[str, float]], count: int, margin: float
+    ) -> bool:
+        """Whether the count-th selectable URL beats the next one by at least margin.
+
+        Same-domain duplicates are left out first, as top_ranked_urls does.
+        """
+        candidates = URLService.best_per_domain(ranked)
+        if len(candidates) <= count:
+            return True
+        return candidates[count - 1][1] - candidates[count][1] >= margin
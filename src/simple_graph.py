@@ -1,18 +1,22 @@
 import asyncio
+from functools import lru_cache
 import json  # <--- 新增：為了格式化輸出 JSON
 from typing import TypedDict, List, Annotated
 import operator
+import uuid
 
-from langchain_tavily import TavilySearch
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.runnables import RunnableConfig
 from langgraph.graph import StateGraph, START, END
 
 # Import existing modules to ensure compatibility
 from src.state import Chronology, ChronologyEvent
-from src.url_crawler.utils import scrape_page_content
+from src.services.search_service import SearchService
+from src.url_crawler.scheduler import crawl_run
+from src.url_crawler.utils import cached_scrape_page_content
+from src.core.usage_tracking import summarize_current_run
 from src.llm_service import create_llm_structured_model
-from src.utils import get_langfuse_handler
+from src.utils import get_graph_callbacks, lazy_graph_attributes
 
 # --- 1. State Definition ---
 class SimpleState(TypedDict):
@@ -23,12 +27,13 @@ class SimpleState(TypedDict):
     urls: List[str]
     raw_content: str
     structured_events: List[ChronologyEvent]
+    usage_summary: dict | None
 
 # --- 2. Node Logic ---
 
-def simple_search_node(state: SimpleState):
+async def simple_search_node(state: SimpleState, config: RunnableConfig):
     """
-    Step 1: Search using Tavily, limiting to top 2 results for speed.
+    Step 1: Search (Tavily by default, cached), limiting to top 2 results for speed.
     """
     person = state["person_to_research"]
     print(f"\n🚀 [Simple Mode] Starting search: {person}")
@@ -37,28 +42,29 @@ def simple_search_node(state: SimpleState):
     query = f"{person} biography timeline life events"
     
     # max_results=2 to save time and tokens
-    tool = TavilySearch(max_results=2)
-    results = tool.invoke({"query": query})
+    results = await SearchService.search(query, config, max_results=2)
     
     # Extract URLs
-    urls = [r["url"] for r in results["results"]]
+    urls = [r["url"] for r in results]
     print(f"🔍 Found {len(urls)} URLs: {urls}")
     
     return {"urls": urls}
 
 
-async def simple_scrape_node(state: SimpleState):
+async def simple_scrape_node(state: SimpleState, config: RunnableConfig):
     """
     Step 2: Scrape all URLs in parallel and merge into one large text block.
     """
     urls = state.get("urls", [])
     print(f"🕷️ [Simple Mode] Starting scrape for {len(urls)} pages...")
+    # Queue this run's crawl requests separately from other runs
+    crawl_run.set(uuid.uuid4().hex)
     
     # Define an internal function to handle single URL errors safely
     async def safe_scrape(url):
         try:
             print(f"   Scraping: {url} ...")
-            content = await scrape_page_content(url)
+            content = await cached_scrape_page_content(url, config)
             if content:
                 # Add source markers for LLM context
                 return f"=== Source: {url} ===\n{content}\n"
@@ -134,7 +140,10 @@ async def simple_extract_node(state: SimpleState, config: RunnableConfig):
         print("="*40 + "\n")
 
         # ↓ 正確：回傳轉換好的 Dict (JSON)
-        return {"structured_events": serializable_events}
+        return {
+            "structured_events": serializable_events,
+            "usage_summary": summarize_current_run(config),
+        }
         
     except Exception as e:
         print(f"❌ LLM Extraction failed: {e}")
@@ -156,5 +165,11 @@ workflow.add_edge("search", "scrape")
 workflow.add_edge("scrape", "extract")
 workflow.add_edge("extract", END)
 
-# Compile Graph
-simple_graph = workflow.compile().with_config({"callbacks": [get_langfuse_handler()]})
\ No newline at end of file
+# Compile Graph (on first access)
+@lru_cache(maxsize=1)
+def get_simple_graph():
+    """Compile the lite graph on first use."""
+    return workflow.compile().with_config({"callbacks": get_graph_callbacks()})
+
+
+__getattr__ = lazy_graph_attributes(__name__, simple_graph=get_simple_graph)
\ No newline at end of file
@@ -137,3 +137,6 @@ class SupervisorState(SupervisorStateInput):
     conversation_history: Annotated[list[MessageLikeRepresentation], override_reducer]
     iteration_count: int = 0
     structured_events: list[ChronologyEvent] | None
+    usage_summary: dict | None  # tokens, latency and cost of the run per node/model
+    research_run_id: str  # scopes per-run caches such as the chunk dedup index
+    resumed_from_events: bool  # started from earlier runs' events (cross-run dedup)
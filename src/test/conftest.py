@@ -0,0 +1,23 @@
+"""Shared fixtures for the unit tests."""
+
+import pytest
+
+
+class WhitespaceEncoding:
+    """Offline stand-in for the tiktoken encoding: one token per word."""
+
+    def encode(self, text):
+        """Split text on whitespace."""
+        return text.split()
+
+    encode_ordinary = encode
+
+    def decode(self, tokens):
+        """Join words back with spaces."""
+        return " ".join(tokens)
+
+
+@pytest.fixture
+def whitespace_encoding() -> WhitespaceEncoding:
+    """Provide a tokenizer that needs no tiktoken vocabulary download."""
+    return WhitespaceEncoding()
@@ -0,0 +1,86 @@
+"""Tests for the rule-based biographical-density scorer."""
+
+from src.research_events.biographic_scorer import (
+    classify_chunks_by_rules,
+    extract_subject_terms,
+    score_chunks,
+)
+
+BIOGRAPHY = (
+    "Henry Miller was born on December 26, 1891, in Yorkville, Manhattan. "
+    "In 1917 Miller married Beatrice Sylvas Wickens, and their daughter was born "
+    "in 1919. He moved to Paris in 1930 and published Tropic of Cancer in 1934. "
+    "Miller died on June 7, 1980, in Pacific Palisades."
+)
+BACKGROUND = (
+    "The novel explores themes of alienation and sexuality through a loose, "
+    "digressive style that many readers find either liberating or tiresome. "
+    "Critics continue to debate the merits of this approach to narrative."
+)
+
+
+def test_extract_subject_terms_skips_question_words():
+    """Only the capitalised words that look like a name are kept."""
+    assert extract_subject_terms("Research the early life of Henry Miller") == [
+        "Henry",
+        "Miller",
+    ]
+
+
+def test_biography_scores_higher_than_background():
+    """Dense life events outscore general commentary."""
+    bio_score, background_score = score_chunks([BIOGRAPHY, BACKGROUND], ["Miller"])
+
+    assert bio_score > background_score
+    assert background_score == 0
+
+
+def test_matches_are_attributed_to_the_right_chunk():
+    """Scoring chunks together gives the same result as scoring them alone."""
+    together = score_chunks([BACKGROUND, BIOGRAPHY], ["Miller"])
+
+    assert together == [
+        score_chunks([BACKGROUND], ["Miller"])[0],
+        score_chunks([BIOGRAPHY], ["Miller"])[0],
+    ]
+
+
+def test_classify_chunks_by_rules_leaves_the_middle_to_the_llm():
+    """Clear cases are decided locally, the rest are marked ambiguous."""
+    sparse = "He later moved away. " + BACKGROUND * 3
+
+    decisions = classify_chunks_by_rules(
+        [BIOGRAPHY, BACKGROUND, sparse],
+        "Research the life of Henry Miller",
+        accept_score=6.0,
+        reject_score=0.5,
+    )
+
+    assert decisions == ["relevant", "irrelevant", "ambiguous"]
+
+
+def test_long_chunk_with_one_event_is_not_rejected():
+    """Padding around a dated event does not dilute it into a rejection."""
+    long_chunk = (
+        BACKGROUND * 20
+        + " In 1905 he became professor of theoretical physics at the university. "
+        + BACKGROUND * 20
+    )
+
+    assert classify_chunks_by_rules(
+        [long_chunk], "Research Albert Einstein", accept_score=6.0, reject_score=0.5
+    ) == ["ambiguous"]
+
+
+def test_scores_are_capped_counts():
+    """A short mention is not inflated and repeated signals stop adding up."""
+    assert score_chunks(["He was born there."], []) == [1.5]
+    assert score_chunks(["Born. " * 10], []) == score_chunks(["Born. " * 3], [])
+
+
+def test_weekday_abbreviation_is_not_a_wedding():
+    """'Wed' is a weekday, 'wed' a life event."""
+    assert score_chunks(["Updated Wed by the editors.", "They wed there."], []) == [
+        0,
+        1.5,
+    ]
@@ -0,0 +1,100 @@
+"""Tests for the biographic event chunk classifier."""
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from src.research_events.chunk_graph import (
+    BiographicEventBatchCheck,
+    BiographicEventCheck,
+    ChunkVerdict,
+    check_chunk_for_events,
+    pack_chunks_by_token_budget,
+)
+
+
+@pytest.fixture(autouse=True)
+def whitespace_tokenizer(whitespace_encoding):
+    """Avoid downloading the tiktoken vocabulary in unit tests."""
+    with patch(
+        "src.research_events.chunk_graph.get_tokenizer",
+        return_value=whitespace_encoding,
+    ):
+        yield
+
+
+def test_pack_chunks_respects_token_budget():
+    """Chunks are grouped in order without exceeding the budget."""
+    chunks = ["word " * 100] * 5
+
+    batches = pack_chunks_by_token_budget(chunks, token_budget=230)
+
+    assert batches == [[0, 1], [2, 3], [4]]
+
+
+def test_pack_chunks_keeps_oversized_chunk_alone():
+    """A chunk larger than the budget still gets its own batch."""
+    batches = pack_chunks_by_token_budget(["word " * 500, "short"], token_budget=50)
+
+    assert batches == [[0], [1]]
+
+
+@pytest.mark.asyncio
+async def test_batched_mode_returns_per_chunk_results():
+    """Batched verdicts map back to the chunk_<i> result contract."""
+    chunks = ["He was born in 1891.", "The weather was nice.", "He died in 1980."]
+    mock_model = AsyncMock()
+    # The model forgets chunk 2; it must be kept rather than dropped
+    mock_model.ainvoke.return_value = BiographicEventBatchCheck(
+        verdicts=[
+            ChunkVerdict(chunk_index=0, contains_biographic_event=True),
+            ChunkVerdict(chunk_index=1, contains_biographic_event=False),
+        ]
+    )
+
+    with patch(
+        "src.research_events.chunk_graph.create_llm_chunk_model",
+        return_value=mock_model,
+    ):
+        result = await check_chunk_for_events(
+            {"text": "", "chunks": chunks},
+            {"configurable": {"chunk_check_mode": "batched"}},
+        )
+
+    results = result["results"]
+    assert mock_model.ainvoke.call_count == 1
+    assert list(results) == ["chunk_0", "chunk_1", "chunk_2"]
+    assert results["chunk_0"].contains_biographic_event is True
+    assert results["chunk_1"].contains_biographic_event is False
+    assert results["chunk_2"].contains_biographic_event is True
+    assert results["chunk_1"].content == "The weather was nice."
+
+
+@pytest.mark.asyncio
+async def test_single_mode_classifies_chunks_concurrently():
+    """Latency is bounded by the slowest chunk, not the sum of all chunks."""
+    in_flight = 0
+    peak = 0
+
+    async def slow_check(prompt):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.05)
+        in_flight -= 1
+        return BiographicEventCheck(contains_biographic_event=True)
+
+    mock_model = AsyncMock()
+    mock_model.ainvoke.side_effect = slow_check
+
+    with patch(
+        "src.research_events.chunk_graph.create_llm_chunk_model",
+        return_value=mock_model,
+    ):
+        result = await check_chunk_for_events(
+            {"text": "", "chunks": [f"chunk {i}" for i in range(6)]},
+            {"configurable": {"max_concurrent_chunk_checks": 3}},
+        )
+
+    assert peak == 3
+    assert len(result["results"]) == 6
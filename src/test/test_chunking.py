@@ -0,0 +1,200 @@
+"""Tests for the offset-based token chunker and the markdown chunker."""
+
+import math
+import re
+from unittest.mock import patch
+
+import pytest
+import tiktoken
+from src.configuration import Configuration
+from src.core.chunking import (
+    auto_chunk_size,
+    chunk_by_tokens,
+    chunk_many_by_tokens,
+    chunk_markdown,
+)
+from src.services.chunking_service import ChunkingService
+from src.url_crawler.utils import chunk_text_by_tokens
+
+PATTERN = (
+    r"""'s|'t|'re|'ve|'m|'ll|'d| ?\p{L}+| ?\p{N}+| ?[^\s\p{L}\p{N}]+|\s+(?!\S)|\s+"""
+)
+
+
+def offline_encoding() -> tiktoken.Encoding:
+    """Build a small byte-level BPE, so tests need no vocabulary download.
+
+    Non-ASCII characters stay split into one token per byte, which is what
+    exercises window edges inside multi-byte characters.
+    """
+    ranks = {bytes([i]): i for i in range(256)}
+    for word in (" Miller", " Henry", " was", " born", " in", " the", " Paris"):
+        for end in range(2, len(word) + 1):
+            ranks.setdefault(word[:end].encode(), len(ranks))
+    return tiktoken.Encoding(
+        "offline-bytes", pat_str=PATTERN, mergeable_ranks=ranks, special_tokens={}
+    )
+
+
+ENCODING = offline_encoding()
+ASCII_TEXT = "Henry Miller was born in 1891 and moved to Paris in 1930. " * 40
+UNICODE_TEXT = "Миллер родился в Нью-Йорке. 米勒生于纽约。Café déjà vu 🙂🎉. " * 30
+
+
+def test_ascii_chunks_match_decoded_windows():
+    """Slices are exactly what decoding each token window used to give."""
+    tokens = ENCODING.encode_ordinary(ASCII_TEXT)
+    chunks = chunk_by_tokens(ASCII_TEXT, ENCODING, chunk_size=50, overlap_size=5)
+
+    assert [chunk.text for chunk in chunks] == [
+        ENCODING.decode(tokens[chunk.token_start : chunk.token_end]) for chunk in chunks
+    ]
+    assert all(chunk.source is ASCII_TEXT for chunk in chunks)
+
+
+def test_multibyte_characters_are_never_split():
+    """Windows without overlap tile the text exactly, character for character."""
+    chunks = chunk_by_tokens(UNICODE_TEXT, ENCODING, chunk_size=37, overlap_size=0)
+
+    assert "".join(chunk.text for chunk in chunks) == UNICODE_TEXT
+    assert all("�" not in chunk.text for chunk in chunks)
+    # Byte-level tokens: some window edges fall inside a character
+    tokens = ENCODING.encode_ordinary(UNICODE_TEXT)
+    assert any(
+        "�" in ENCODING.decode(tokens[chunk.token_start : chunk.token_end])
+        for chunk in chunks
+    )
+
+
+def test_overlap_and_no_overlap_only_tail():
+    """Windows overlap by overlap_size tokens; no tail of pure overlap is emitted."""
+    tokens = ENCODING.encode_ordinary(ASCII_TEXT)
+    chunks = chunk_by_tokens(ASCII_TEXT, ENCODING, chunk_size=100, overlap_size=10)
+
+    assert [c.token_start for c in chunks] == list(range(0, len(tokens) - 10, 90))
+    assert chunks[-1].token_end == len(tokens)
+    assert all(a.token_end - b.token_start == 10 for a, b in zip(chunks, chunks[1:]))
+
+
+def test_batch_api_matches_single_documents():
+    """Batch encoding gives the same chunks as chunking one document at a time."""
+    texts = [ASCII_TEXT, "", UNICODE_TEXT]
+
+    batched = chunk_many_by_tokens(texts, ENCODING, chunk_size=40, overlap_size=4)
+
+    assert batched == [
+        chunk_by_tokens(text, ENCODING, chunk_size=40, overlap_size=4) for text in texts
+    ]
+
+
+@pytest.mark.asyncio
+async def test_chunk_text_by_tokens_is_quiet(capsys):
+    """The graph-facing helper returns plain strings and prints nothing."""
+    with patch("src.url_crawler.utils.get_tokenizer", return_value=ENCODING):
+        chunks = await chunk_text_by_tokens(UNICODE_TEXT, chunk_size=64)
+
+    assert chunks and all(isinstance(chunk, str) for chunk in chunks)
+    assert capsys.readouterr().out == ""
+
+
+MARKDOWN_PAGE = (
+    """Henry Miller was an American novelist.
+
+# Henry Miller
+
+## Early life
+
+He was born in 1891 in Manhattan. His parents were Lutheran. He grew up in Brooklyn.
+
+He attended City College for one semester.
+
+## Career
+
+"""
+    + "\n\n".join(
+        f"In {year} he wrote and published work number {year - 1920}. Critics noticed it in {year + 1}."
+        for year in range(1920, 1960)
+    )
+    + """
+
+## Legacy
+
+He is remembered for Tropic of Cancer.
+"""
+)
+
+
+def test_markdown_chunks_keep_sentences_whole_and_within_budget():
+    """Every sentence of the page lands intact in exactly one chunk."""
+    chunks = chunk_markdown(MARKDOWN_PAGE, ENCODING, chunk_size=200)
+
+    assert len(chunks) > 1
+    assert all(len(ENCODING.encode_ordinary(c)) <= 200 for c in chunks)
+    page_sentences = {
+        sentence.strip()
+        for paragraph in MARKDOWN_PAGE.split("\n\n")
+        if not paragraph.startswith("#")
+        for sentence in re.split(r"(?<=[.!?])\s+", paragraph)
+        if sentence.strip()
+    }
+    for sentence in page_sentences:
+        assert sum(sentence in chunk for chunk in chunks) == 1, sentence
+
+
+def test_markdown_chunks_carry_section_headings():
+    """A chunk that starts mid-section begins with the headings it sits under."""
+    chunks = chunk_markdown(MARKDOWN_PAGE, ENCODING, chunk_size=200)
+
+    continued = [c for c in chunks[1:] if "Critics noticed" in c.split("\n\n")[1]]
+    assert continued
+    assert all(c.startswith("# Henry Miller\n## Career\n\n") for c in continued)
+    # Small sections are packed together instead of one chunk each
+    assert "## Early life" in chunks[0] and "# Henry Miller" in chunks[0]
+
+
+def test_markdown_splits_a_sentence_only_when_it_alone_exceeds_the_budget():
+    """An oversized sentence is cut by tokens without losing any text."""
+    long_sentence = "word " * 300 + "end."
+    chunks = chunk_markdown(long_sentence, ENCODING, chunk_size=100)
+
+    assert len(chunks) > 1
+    assert "".join("".join(chunks).split()) == "".join(long_sentence.split())
+    assert chunk_markdown("Short page.", ENCODING) == ["Short page."]
+    assert chunk_markdown("", ENCODING) == []
+
+
+def test_auto_chunk_size_spreads_the_document_over_the_fewest_calls():
+    """A 2.5-window document takes 3 calls of even size, not 2 full and a stub."""
+    assert auto_chunk_size(500, max_chunk_size=1000) == 1000
+    size = auto_chunk_size(2500, max_chunk_size=1000)
+    assert math.ceil(2500 / size) == 3
+    assert 2500 / 3 < size <= 1000
+
+
+def test_chunking_service_follows_configuration():
+    """Strategy, fixed size and auto mode all come from Configuration."""
+    page = MARKDOWN_PAGE * 4
+    page_tokens = len(ENCODING.encode_ordinary(page))
+
+    fixed = Configuration(chunking_strategy="tokens", default_chunk_size=300)
+    windows = ChunkingService.split(page, fixed, ENCODING)
+    assert windows == [c.text for c in chunk_by_tokens(page, ENCODING, 300, 20)]
+
+    limit = 2000 - 100 - 500
+    auto_windows = Configuration(
+        chunking_strategy="tokens",
+        chunk_size_mode="auto",
+        chunk_context_window=2000,
+        tools_llm_max_tokens=500,
+    )
+    windows = ChunkingService.split(page, auto_windows, ENCODING, overhead_tokens=100)
+    assert len(windows) == math.ceil((page_tokens - 20) / (limit - 20))
+
+    auto = auto_windows.model_copy(update={"chunking_strategy": "markdown"})
+    chunks = ChunkingService.split(page, auto, ENCODING, overhead_tokens=100)
+    # Packing whole paragraphs may cost one more chunk than the ideal
+    assert len(chunks) <= math.ceil(page_tokens / limit) + 1
+    assert all(len(ENCODING.encode_ordinary(c)) <= limit for c in chunks)
+
+    assert ChunkingService.split("Short page.", auto, ENCODING) == ["Short page."]
+    assert ChunkingService.split("  ", auto, ENCODING) == []
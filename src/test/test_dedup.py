@@ -0,0 +1,110 @@
+"""Tests for the cross-source near-duplicate chunk index."""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from src.research_events.dedup import (
+    NearDuplicateIndex,
+    dedup_scope,
+    get_dedup_index,
+    minhash,
+    similarity,
+)
+
+WIKIPEDIA = (
+    "Henry Valentine Miller was an American novelist, short story writer and "
+    "essayist. He was born on December 26, 1891, at the family home in "
+    "Yorkville, Manhattan, to Lutheran German parents. He moved to Paris in "
+    "1930, where he wrote Tropic of Cancer, published in 1934 by Obelisk Press."
+)
+# A mirror with a slightly different lead and punctuation
+MIRROR = (
+    "Biography: Henry Valentine Miller was an American novelist, short story "
+    "writer and essayist. He was born on December 26, 1891, at the family home "
+    "in Yorkville, Manhattan, to Lutheran German parents! He moved to Paris in "
+    "1930, where he wrote Tropic of Cancer, published in 1934 by Obelisk Press."
+)
+UNRELATED = (
+    "Miller married Beatrice Sylvas Wickens in 1917; their daughter Barbara was "
+    "born in 1919. He later lived in Big Sur, California, and died in Pacific "
+    "Palisades on June 7, 1980, at the age of 88."
+)
+
+
+def test_signatures_estimate_similarity():
+    """Mirrors score close to 1, unrelated text close to 0."""
+    assert similarity(minhash(WIKIPEDIA), minhash(WIKIPEDIA)) == 1.0
+    assert similarity(minhash(WIKIPEDIA), minhash(MIRROR)) > 0.7
+    assert similarity(minhash(WIKIPEDIA), minhash(UNRELATED)) < 0.2
+
+
+def test_index_skips_near_duplicates_and_counts_savings():
+    """Only the first copy of a paragraph is kept, once it has been indexed."""
+    index = NearDuplicateIndex(threshold=0.7)
+
+    kept = index.filter([WIKIPEDIA, MIRROR, UNRELATED], count_tokens=lambda c: 100)
+    index.add_all(kept)
+    kept_later = index.filter([MIRROR, UNRELATED], count_tokens=lambda c: 100)
+
+    assert kept == [WIKIPEDIA, UNRELATED]
+    assert kept_later == []
+    assert index.stats() == {
+        "indexed_chunks": 2,
+        "chunks_seen": 5,
+        "chunks_skipped": 3,
+        "tokens_saved": 300,
+    }
+
+
+def test_filter_does_not_index():
+    """Chunks are only skipped after add_all, e.g. once their events merged."""
+    index = NearDuplicateIndex(threshold=0.7)
+
+    assert index.filter([WIKIPEDIA], count_tokens=len) == [WIKIPEDIA]
+    # Extraction failed: nothing was added, so the page is processed again
+    assert index.filter([MIRROR], count_tokens=len) == [MIRROR]
+    assert len(index) == 0
+
+
+def test_reserved_chunks_skip_mirrors_of_concurrent_pages():
+    """Pages checked together dedup each other before anything is indexed."""
+    index = NearDuplicateIndex(threshold=0.7)
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        kept = list(
+            pool.map(
+                lambda page: index.filter([page], count_tokens=len, reserve=True),
+                [WIKIPEDIA, MIRROR],
+            )
+        )
+
+    assert sorted(map(len, kept)) == [0, 1]
+    assert len(index) == 0
+    # Merging indexes the kept chunk and ends its reservation
+    index.add_all([chunk for page in kept for chunk in page])
+    assert index.filter([MIRROR], count_tokens=len) == []
+    assert index._reserved == {}
+
+
+def test_released_reservations_are_processed_again():
+    """Chunks of pages that failed before the merge are not skipped later."""
+    index = NearDuplicateIndex(threshold=0.7)
+
+    assert index.filter([WIKIPEDIA], count_tokens=len, reserve=True) == [WIKIPEDIA]
+    assert index.filter([MIRROR], count_tokens=len) == []
+    index.release_all()
+
+    assert index.filter([MIRROR], count_tokens=len) == [MIRROR]
+
+
+def test_persistent_index_is_reloaded(tmp_path):
+    """With a directory the index of a person survives into later runs."""
+    scope = dedup_scope("Henry  Miller", "run-1", persistent=True)
+    assert scope == dedup_scope("henry miller", "run-2", persistent=True)
+    assert scope != dedup_scope("Henry Miller", "run-1", persistent=False)
+
+    index = get_dedup_index(scope, directory=str(tmp_path))
+    index.add_all(index.filter([WIKIPEDIA], count_tokens=len))
+
+    reloaded = NearDuplicateIndex(path=index.path)
+    assert len(reloaded) == 1
+    assert not reloaded.add(MIRROR)
@@ -102,4 +102,259 @@ async def test_enhanced_merge_events_with_empty_content():
     assert existing_events.early == "Born in 1920."
     assert existing_events.personal == "Married in 1945."
     assert existing_events.career == "Published in 1950."
-    assert existing_events.legacy == "Won prize in 1980."
\ No newline at end of file
+    assert existing_events.legacy == "Won prize in 1980."
+
+
+@pytest.mark.asyncio
+async def test_filter_chunks_forwards_only_relevant_chunks(whitespace_encoding):
+    """Irrelevant chunks are pruned before extraction and reported in the stats."""
+    from src.research_events.chunk_graph import ChunkResult
+    from src.research_events.merge_events.merge_events_graph import filter_chunks
+
+    chunks = ["Born in 1920.", "Nice weather.", "Won a prize in 1985."]
+    calls = []
+
+    async def classify(state, config):
+        calls.append(state["chunks"])
+        return {
+            "results": {
+                f"chunk_{i}": ChunkResult(
+                    content=text, contains_biographic_event="weather" not in text
+                )
+                for i, text in enumerate(state["chunks"])
+            }
+        }
+
+    with (
+        patch(
+            "src.research_events.merge_events.merge_events_graph.chunk_graph"
+        ) as mock_chunk_graph,
+        patch(
+            "src.services.chunking_service.get_tokenizer",
+            return_value=whitespace_encoding,
+        ),
+    ):
+        mock_chunk_graph.ainvoke = classify
+        command = await filter_chunks(
+            {"text_chunks": chunks},
+            {"configurable": {"enable_rule_prefilter": False}},
+        )
+
+    # One graph call checks every sub-chunk under a single concurrency bound
+    assert calls == [chunks]
+    assert command.goto == "extract_and_categorize_chunks"
+    assert command.update["text_chunks"] == ["Born in 1920.", "Won a prize in 1985."]
+    assert command.update["chunk_filter_stats"]["dropped_chunks"] == 1
+    assert command.update["chunk_filter_stats"]["extraction_calls_saved"] == 1
+
+
+@pytest.mark.asyncio
+async def test_extract_and_categorize_chunks_keeps_input_order():
+    """Chunks are extracted concurrently but collected in input order."""
+    import asyncio
+
+    from src.research_events.merge_events.merge_events_graph import (
+        extract_and_categorize_chunks,
+    )
+
+    chunks = ["first chunk", "second chunk", "third chunk"]
+    delays = {"first chunk": 0.06, "second chunk": 0.03, "third chunk": 0.0}
+
+    async def categorize(prompt):
+        chunk = next(c for c in chunks if c in prompt)
+        await asyncio.sleep(delays[chunk])
+        return MockToolResponse(
+            [
+                MockToolCall(
+                    "RelevantEventsCategorized",
+                    {"early": f"- {chunk}", "personal": "", "career": "", "legacy": ""},
+                )
+            ]
+        )
+
+    mock_model = AsyncMock()
+    mock_model.ainvoke.side_effect = categorize
+
+    with patch(
+        "src.research_events.merge_events.merge_events_graph.create_llm_with_tools",
+        return_value=mock_model,
+    ):
+        command = await extract_and_categorize_chunks(
+            {"text_chunks": chunks},
+            {"configurable": {"extraction_input_token_budget": 0}},
+        )
+
+    assert command.goto == "merge_categorizations"
+    assert [c.early for c in command.update["categorized_chunks"]] == [
+        "- first chunk",
+        "- second chunk",
+        "- third chunk",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_extraction_packs_chunks_and_attributes_events(whitespace_encoding):
+    """Chunks share calls up to the token budget; tagged bullets map back per chunk."""
+    import re
+
+    from src.research_events.merge_events.merge_events_graph import (
+        extract_and_categorize_chunks,
+    )
+
+    chunks = [f"Chunk {i} says he moved in {1900 + i}." for i in range(5)]
+    prompts = []
+
+    async def categorize(prompt):
+        prompts.append(prompt)
+        indices = re.findall(r'<chunk index="(\d+)">', prompt)
+        bullets = "\n".join(f"- [{i}] Event of call chunk {i}" for i in indices)
+        return MockToolResponse(
+            [
+                MockToolCall(
+                    "RelevantEventsCategorized",
+                    {"early": "", "personal": bullets, "career": "", "legacy": ""},
+                )
+            ]
+        )
+
+    mock_model = AsyncMock()
+    mock_model.ainvoke.side_effect = categorize
+
+    with (
+        patch(
+            "src.research_events.merge_events.merge_events_graph.create_llm_with_tools",
+            return_value=mock_model,
+        ),
+        patch(
+            "src.research_events.chunk_graph.get_tokenizer",
+            return_value=whitespace_encoding,
+        ),
+    ):
+        # 8 words + 12 wrapper tokens per chunk: two chunks fit in 45 tokens
+        command = await extract_and_categorize_chunks(
+            {"text_chunks": chunks},
+            {"configurable": {"extraction_input_token_budget": 45}},
+        )
+
+    assert len(prompts) == 3
+    assert all('<chunk index="1">' in p for p in prompts[:2])
+    assert chunks[4] in prompts[2] and "<chunk" not in prompts[2]
+    results = command.update["categorized_chunks"]
+    assert [r.personal for r in results] == [
+        "- Event of call chunk 0\n",
+        "- Event of call chunk 1\n",
+        "- Event of call chunk 0\n",
+        "- Event of call chunk 1\n",
+        "",
+    ]
+
+
+def test_attribute_packed_events_follows_tags():
+    """Untagged continuation lines stay with the bullet before them."""
+    from src.research_events.merge_events.merge_events_graph import (
+        attribute_packed_events,
+    )
+
+    result = CategoriesWithEvents(
+        early="- [1] Born in 1891.\n  In Manhattan.\n- [0] Grew up in Brooklyn.",
+        personal="- Untagged bullet.",
+        career="- [7] Tag out of range.",
+        legacy="",
+    )
+
+    first, second = attribute_packed_events(result, 2)
+
+    assert first.early == "- Grew up in Brooklyn.\n"
+    assert second.early == "- Born in 1891.\n  In Manhattan.\n"
+    assert first.personal == "- Untagged bullet.\n"
+    assert first.career == "- [7] Tag out of range.\n"
+    assert second.legacy == ""
+
+
+@pytest.mark.asyncio
+async def test_packed_chunks_merge_one_bullet_per_line(whitespace_encoding):
+    """Bullets of packed chunks stay on their own lines once merged."""
+    from src.research_events.merge_events.merge_events_graph import (
+        extract_and_categorize_chunks,
+        merge_categorizations,
+    )
+    from src.services.event_service import BULLET_START
+
+    chunks = ["He was born in 1891 in NYC.", "He moved to Paris in 1930."]
+    bullets = "- [0] Born 1891 in NYC.\n- [1] Moved to Paris 1930."
+    mock_model = AsyncMock()
+    mock_model.ainvoke.return_value = MockToolResponse(
+        [
+            MockToolCall(
+                "RelevantEventsCategorized",
+                {"early": bullets, "personal": "", "career": "", "legacy": ""},
+            )
+        ]
+    )
+
+    with (
+        patch(
+            "src.research_events.merge_events.merge_events_graph.create_llm_with_tools",
+            return_value=mock_model,
+        ),
+        patch(
+            "src.research_events.chunk_graph.get_tokenizer",
+            return_value=whitespace_encoding,
+        ),
+    ):
+        command = await extract_and_categorize_chunks({"text_chunks": chunks}, {})
+        merged = await merge_categorizations(
+            {"categorized_chunks": command.update["categorized_chunks"]}
+        )
+
+    assert mock_model.ainvoke.await_count == 1
+    early = merged.update["extracted_events_categorized"].early
+    assert early.splitlines() == [
+        "[]",
+        "- Born 1891 in NYC.",
+        "- Moved to Paris 1930.",
+    ]
+    assert len(BULLET_START.findall(early)) == 2
+
+
+@pytest.mark.asyncio
+async def test_dedup_indexes_chunks_only_once_merged(whitespace_encoding):
+    """A page is skipped as a duplicate only after its events were merged."""
+    from src.research_events.merge_events.merge_events_graph import (
+        combine_new_and_original_events,
+        split_events,
+    )
+
+    state = {
+        "extracted_events": "Henry Miller was born in 1891 in Yorkville, Manhattan.",
+        "research_question": "",
+        "dedup_key": "test-dedup-after-merge",
+    }
+    config = {"configurable": {"enable_chunk_filter": False}}
+
+    with (
+        patch(
+            "src.services.chunking_service.get_tokenizer",
+            return_value=whitespace_encoding,
+        ),
+        patch(
+            "src.research_events.merge_events.merge_events_graph.get_tokenizer",
+            return_value=whitespace_encoding,
+        ),
+        patch(
+            "src.research_events.merge_events.merge_events_graph.extraction_overhead_tokens",
+            return_value=0,
+        ),
+    ):
+        first = await split_events(state, config)
+        # The first attempt never merged (e.g. extraction failed): not skipped
+        retry = await split_events(state, config)
+        await combine_new_and_original_events(
+            {**state, "new_chunks": retry.update["new_chunks"]}, config
+        )
+        after_merge = await split_events(state, config)
+
+    assert first.update["text_chunks"] == [state["extracted_events"]]
+    assert retry.update["text_chunks"] == [state["extracted_events"]]
+    assert after_merge.goto == "__end__"
+    assert after_merge.update["chunk_dedup_stats"]["skipped_chunks"] == 1
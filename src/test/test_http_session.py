@@ -0,0 +1,67 @@
+"""Tests for the pooled scraping session."""
+
+import asyncio
+import logging
+
+import pytest
+from src.url_crawler.http_session import (
+    _close_without_loop,
+    close_http_session,
+    get_http_session,
+)
+
+
+@pytest.mark.asyncio
+async def test_session_is_reused_until_closed():
+    """One pooled session per loop, recreated after close_http_session."""
+    session = get_http_session(limit=5, limit_per_host=2)
+
+    assert get_http_session() is session
+    assert session.connector.limit == 5
+    assert session.connector.limit_per_host == 2
+
+    await close_http_session()
+    assert session.closed
+
+    replacement = get_http_session()
+    assert replacement is not session
+    await close_http_session()
+
+
+def test_session_is_closed_when_its_loop_shuts_down():
+    """asyncio.run closes the pooled session on exit."""
+
+    async def use_session():
+        return get_http_session()
+
+    session = asyncio.run(use_session())
+
+    assert session.closed
+
+
+def test_session_of_a_closed_loop_is_closed_when_dropped():
+    """A loop closed without shutting down leaves a session that is closed later."""
+
+    async def use_session():
+        return get_http_session()
+
+    loop = asyncio.new_event_loop()
+    stale = loop.run_until_complete(use_session())
+    loop.close()
+
+    asyncio.run(use_session())
+
+    assert stale.closed
+
+
+def test_close_failures_are_logged(caplog):
+    """A session that fails to close is reported instead of silently dropped."""
+
+    class BrokenSession:
+        async def close(self):
+            raise RuntimeError("connector broke")
+
+    with caplog.at_level(logging.WARNING, logger="src.url_crawler.http_session"):
+        _close_without_loop(BrokenSession())
+
+    assert "connector broke" in caplog.text
@@ -0,0 +1,40 @@
+"""Tests for lazy imports and on-demand graph compilation."""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+
+PROBE = """
+import json, sys
+import src.graph
+heavy = ["langfuse", "aiohttp", "tiktoken", "langchain_tavily", "langchain.chat_models"]
+loaded = [name for name in heavy if name in sys.modules]
+compiled = src.graph.get_graph.cache_info().currsize
+graph = src.graph.graph
+print(json.dumps({
+    "loaded": loaded,
+    "compiled_on_import": compiled,
+    "same_graph": graph is src.graph.graph,
+    "type": type(graph).__name__,
+}))
+"""
+
+
+def test_importing_the_supervisor_graph_is_lazy():
+    """Import loads no provider, tracing or HTTP packages and compiles nothing."""
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    probe = json.loads(result.stdout.strip().splitlines()[-1])
+
+    assert probe["loaded"] == []
+    assert probe["compiled_on_import"] == 0
+    assert probe["same_graph"] is True
+    assert probe["type"] == "CompiledStateGraph"
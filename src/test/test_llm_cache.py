@@ -0,0 +1,119 @@
+"""Tests for the persistent LLM response cache."""
+
+import time
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.runnables import RunnableLambda
+from src.core.llm_cache import (
+    CachedRunnable,
+    LLMCache,
+    build_cache_key,
+    get_llm_cache,
+    render_prompt,
+)
+from src.state import CategoriesWithEvents
+
+
+@pytest.fixture
+def cache(tmp_path) -> LLMCache:
+    """Provide an empty cache backed by a temporary SQLite file."""
+    return LLMCache(str(tmp_path / "llm_cache.sqlite"))
+
+
+def counting_model(output):
+    """Return a runnable that records how many times it was invoked."""
+    calls = []
+
+    def _invoke(prompt):
+        calls.append(prompt)
+        return output
+
+    return RunnableLambda(_invoke), calls
+
+
+def test_cache_key_depends_on_every_component():
+    """Changing any key component produces a different key."""
+    base = build_cache_key("openai:gpt-4o", 1024, {"schema": None}, "prompt")
+    assert base == build_cache_key("openai:gpt-4o", 1024, {"schema": None}, "prompt")
+    assert base != build_cache_key("openai:gpt-4o-mini", 1024, {"schema": None}, "prompt")
+    assert base != build_cache_key("openai:gpt-4o", 2048, {"schema": None}, "prompt")
+    assert base != build_cache_key("openai:gpt-4o", 1024, {"schema": "X"}, "prompt")
+    assert base != build_cache_key("openai:gpt-4o", 1024, {"schema": None}, "other")
+
+
+def test_render_prompt_is_stable_for_messages():
+    """Equivalent message lists render to the same string."""
+    assert render_prompt([HumanMessage(content="hi")]) == render_prompt(
+        [("human", "hi")]
+    )
+
+
+def test_invoke_serves_repeated_prompt_from_cache(cache: LLMCache):
+    """The second identical call is a hit and does not reach the model."""
+    model, calls = counting_model(AIMessage(content="Born in 1891."))
+    cached = CachedRunnable(model, cache, model_name="m", max_tokens=10)
+
+    first = cached.invoke("When was he born?")
+    second = cached.invoke("When was he born?")
+
+    assert len(calls) == 1
+    assert isinstance(second, AIMessage)
+    assert second.content == first.content
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_ainvoke_restores_structured_output(cache: LLMCache):
+    """Structured outputs are rebuilt as the original Pydantic model."""
+    events = CategoriesWithEvents(early="- Born in 1891")
+    model, calls = counting_model(events)
+    cached = CachedRunnable(
+        model,
+        cache,
+        model_name="m",
+        max_tokens=10,
+        response_schema=CategoriesWithEvents,
+    )
+
+    await cached.ainvoke("categorize")
+    result = await cached.ainvoke("categorize")
+
+    assert len(calls) == 1
+    assert isinstance(result, CategoriesWithEvents)
+    assert result.early == "- Born in 1891"
+
+
+def test_expired_entries_are_misses(tmp_path):
+    """Entries older than the TTL are evicted on read."""
+    cache = LLMCache(str(tmp_path / "ttl.sqlite"), ttl_seconds=1)
+    cache.set("key", "value")
+    cache._conn.execute("UPDATE entries SET created_at = ?", (time.time() - 10,))
+
+    assert cache.get("key") is None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_shared_cache_follows_the_configured_limits(tmp_path):
+    """A later configuration with other limits does not reuse the first cache."""
+    path = str(tmp_path / "shared.sqlite")
+    first = get_llm_cache(path, ttl_seconds=60)
+
+    assert get_llm_cache(path, ttl_seconds=60) is first
+    assert get_llm_cache(path, ttl_seconds=1).ttl_seconds == 1
+    assert get_llm_cache(path, ttl_seconds=60, max_bytes=100).max_bytes == 100
+
+
+def test_size_cap_evicts_least_recently_used(tmp_path):
+    """Once over the cap, the least recently read entry goes first."""
+    cache = LLMCache(str(tmp_path / "lru.sqlite"), max_bytes=20)
+    cache.set("a", "x" * 10)
+    cache.set("b", "y" * 10)
+    cache._conn.execute("UPDATE entries SET accessed_at = 0 WHERE key = 'b'")
+    cache.get("a")
+    cache.set("c", "z" * 10)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "x" * 10
+    assert cache.get("c") == "z" * 10
@@ -0,0 +1,78 @@
+"""Tests for the memoized model factory in llm_service."""
+
+import pytest
+from src.configuration import Configuration
+from src.llm_service import (
+    clear_model_cache,
+    create_llm_chunk_model,
+    create_llm_structured_model,
+    create_llm_with_tools,
+)
+from src.research_events.chunk_graph import BiographicEventCheck
+from src.research_events.merge_events.merge_events_graph import EXTRACTION_TOOLS
+from src.state import Chronology
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    """Start every test without memoized models."""
+    clear_model_cache()
+    yield
+    clear_model_cache()
+
+
+def test_configuration_resolution_is_cached():
+    """Equal configurable values resolve to the same Configuration instance."""
+    config = {"configurable": {"max_chunks": 5, "thread_id": "a"}}
+    other_thread = {"configurable": {"max_chunks": 5, "thread_id": "b"}}
+
+    first = Configuration.from_runnable_config(config)
+
+    assert first is Configuration.from_runnable_config(other_thread)
+    assert first.max_chunks == 5
+    assert first is not Configuration.from_runnable_config(None)
+
+
+def test_factories_return_the_same_runnable_for_the_same_configuration():
+    """Hot loops reuse the already-built runnable."""
+    config = {"configurable": {}}
+
+    assert create_llm_with_tools(EXTRACTION_TOOLS, config) is create_llm_with_tools(
+        EXTRACTION_TOOLS, config
+    )
+    assert create_llm_structured_model(
+        config, Chronology
+    ) is create_llm_structured_model(config, Chronology)
+    assert create_llm_chunk_model(
+        config, BiographicEventCheck
+    ) is create_llm_chunk_model(config, BiographicEventCheck)
+
+
+def test_factories_rebuild_when_configuration_or_schema_changes():
+    """A different model, limit or schema gets its own runnable."""
+    base = create_llm_structured_model({}, Chronology)
+
+    assert base is not create_llm_structured_model({}, None)
+    assert base is not create_llm_structured_model(
+        {"configurable": {"structured_llm_max_tokens": 128}}, Chronology
+    )
+    assert base is not create_llm_chunk_model({}, Chronology)
+
+
+def test_model_cache_keeps_only_the_most_recently_used_runnables(monkeypatch):
+    """Per-request configurations evict the least recently used runnable."""
+    import src.llm_service as llm_service
+
+    monkeypatch.setattr(llm_service, "_MAX_CACHED_MODELS", 2)
+    first = create_llm_structured_model({}, Chronology)
+    create_llm_structured_model(
+        {"configurable": {"structured_llm_max_tokens": 128}}, Chronology
+    )
+    assert create_llm_structured_model({}, Chronology) is first
+
+    create_llm_structured_model(
+        {"configurable": {"structured_llm_max_tokens": 256}}, Chronology
+    )
+
+    assert len(llm_service._model_cache) == 2
+    assert create_llm_structured_model({}, Chronology) is first
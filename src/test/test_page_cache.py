@@ -0,0 +1,142 @@
+"""Tests for the on-disk scraped page cache."""
+
+import asyncio
+import os
+import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from src.url_crawler.page_cache import PageCache, canonicalize_url, get_page_cache
+from src.url_crawler.utils import cached_scrape_page_content
+
+
+def test_canonical_url_ignores_case_fragments_and_tracking():
+    """Trivially different spellings of a URL share one key."""
+    assert canonicalize_url(
+        "HTTPS://En.Wikipedia.org:443/wiki/Henry_Miller/?utm_source=x&b=2&a=1#Life"
+    ) == canonicalize_url("https://en.wikipedia.org/wiki/Henry_Miller?a=1&b=2")
+
+
+def test_round_trip_is_compressed_and_counted(tmp_path):
+    """Pages are stored compressed and lookups update the counters."""
+    cache = PageCache(str(tmp_path))
+    content = "Henry Miller was born in 1891. " * 200
+
+    assert cache.get("https://example.com/a") is None
+    cache.set("https://example.com/a", content)
+
+    assert cache.get("https://example.com/a#top") == (content, False)
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1
+    assert stats["entries"] == 1
+    assert stats["bytes"] < len(content) / 10
+
+
+def test_expired_pages_are_dropped(tmp_path):
+    """Pages past TTL and the stale window are misses."""
+    cache = PageCache(str(tmp_path), ttl_seconds=1)
+    cache.set("https://example.com/a", "old")
+
+    with patch("src.url_crawler.page_cache.time.time", return_value=time.time() + 5):
+        assert cache.get("https://example.com/a") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_shared_cache_follows_the_configured_limits(tmp_path):
+    """A later configuration with other limits does not reuse the first cache."""
+    first = get_page_cache(str(tmp_path), ttl_seconds=60)
+
+    assert get_page_cache(str(tmp_path), ttl_seconds=60) is first
+    assert get_page_cache(str(tmp_path), ttl_seconds=1).ttl_seconds == 1
+    assert get_page_cache(str(tmp_path), max_bytes=100).max_bytes == 100
+    assert get_page_cache(str(tmp_path), stale_seconds=30).stale_seconds == 30
+
+
+def test_least_recently_read_pages_are_evicted(tmp_path):
+    """The size cap evicts the page that was read least recently."""
+    cache = PageCache(str(tmp_path))
+    for name in ("a", "b", "c"):
+        cache.set(f"https://example.com/{name}", os.urandom(300).hex())
+    page_size = cache.stats()["bytes"] // 3
+
+    # Make "a" the oldest file on disk, then read it so "b" becomes the LRU page
+    for offset, name in ((-30, "a"), (-20, "b"), (-10, "c")):
+        path = cache._path(f"https://example.com/{name}")
+        os.utime(path, (time.time() + offset, time.time() + offset))
+    cache.get("https://example.com/a")
+
+    cache.max_bytes = page_size * 3 + page_size // 2
+    cache.set("https://example.com/d", os.urandom(300).hex())
+
+    assert cache.get("https://example.com/b") is None
+    assert cache.get("https://example.com/a") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_eviction_does_not_list_the_directory_again(tmp_path):
+    """Only the first use lists the directory; writes then evict from the index."""
+    cache = PageCache(str(tmp_path))
+    cache.set("https://example.com/a", os.urandom(300).hex())
+    page_size = cache.stats()["bytes"]
+    cache.max_bytes = page_size * 2 + page_size // 2
+
+    with patch.object(PageCache, "_files", side_effect=AssertionError("listed")):
+        for name in ("b", "c", "d"):
+            cache.set(f"https://example.com/{name}", os.urandom(300).hex())
+        stats = cache.stats()
+
+    assert stats["entries"] == 2 and stats["evictions"] == 2
+    assert cache.get("https://example.com/a") is None
+    assert cache.get("https://example.com/d") is not None
+
+
+@pytest.mark.asyncio
+async def test_pages_are_cached_per_scraper_backend(tmp_path):
+    """A page scraped by one backend is not served to another."""
+    config = {
+        "configurable": {
+            "page_cache_enabled": True,
+            "page_cache_dir": str(tmp_path),
+            "scraper_backend": "local",
+        }
+    }
+    scrape = AsyncMock(side_effect=["local markdown", "firecrawl markdown"])
+    url = "https://example.com/p"
+
+    with patch("src.url_crawler.utils.scrape_page_content", scrape):
+        assert await cached_scrape_page_content(url, config) == "local markdown"
+        assert await cached_scrape_page_content(url, config) == "local markdown"
+        config["configurable"]["scraper_backend"] = "firecrawl"
+        assert await cached_scrape_page_content(url, config) == "firecrawl markdown"
+
+    assert scrape.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_stale_page_is_served_while_revalidating(tmp_path):
+    """A stale hit returns the old page at once and refreshes it in the background."""
+    config = {
+        "configurable": {
+            "page_cache_enabled": True,
+            "page_cache_dir": str(tmp_path),
+            "page_cache_ttl_seconds": 1,
+            "page_cache_stale_seconds": 3600,
+        }
+    }
+    scrape = AsyncMock(side_effect=["first version", "second version"])
+
+    url = "https://example.com/p"
+
+    with patch("src.url_crawler.utils.scrape_page_content", scrape):
+        assert await cached_scrape_page_content(url, config) == "first version"
+
+        later = time.time() + 5
+        with patch("src.url_crawler.page_cache.time.time", return_value=later):
+            assert await cached_scrape_page_content(url, config) == "first version"
+            # Let the background refresh finish
+            for _ in range(20):
+                await asyncio.sleep(0.01)
+
+        assert await cached_scrape_page_content(url, config) == "second version"
+
+    assert scrape.await_count == 2
@@ -0,0 +1,137 @@
+"""Tests for the shared provider rate limiter."""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+from langchain_core.runnables import RunnableLambda
+from src.core.rate_limiter import (
+    GovernedRunnable,
+    ProviderGovernor,
+    TokenBucket,
+    get_governor,
+    get_provider,
+)
+
+
+class FakeRateLimitError(Exception):
+    """Mimics a provider SDK 429 error carrying a Retry-After header."""
+
+    status_code = 429
+
+    def __init__(self, retry_after: str = "0.2"):
+        """Carry retry_after in the response headers."""
+        super().__init__("rate limited")
+        self.response = SimpleNamespace(headers={"retry-after": retry_after})
+
+
+def test_token_bucket_reports_wait_once_drained():
+    """A drained bucket asks the caller to wait for the refill."""
+    bucket = TokenBucket(per_minute=60)
+
+    assert bucket.try_acquire(60) == 0.0
+    assert bucket.try_acquire(1) == pytest.approx(1.0, abs=0.05)
+    # Unlimited buckets never wait
+    assert TokenBucket(per_minute=0).try_acquire(10_000) == 0.0
+
+
+def test_governors_are_shared_per_provider():
+    """Models of the same provider share one governor."""
+    assert get_provider("openai:gpt-4o-mini") == "openai"
+    assert get_provider("gpt-4o") == "default"
+    governor = get_governor("test-provider")
+    assert get_governor("test-provider", requests_per_minute=100) is governor
+    assert governor.requests.per_minute == 100
+
+
+@pytest.mark.asyncio
+async def test_in_flight_calls_are_capped_per_model():
+    """No more than max_in_flight_per_model calls run at once."""
+    governor = ProviderGovernor("test", max_in_flight_per_model=2)
+    running = 0
+    peak = 0
+
+    async def call():
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return "ok"
+
+    results = await asyncio.gather(*[governor.run("model", 1, call) for _ in range(6)])
+
+    assert results == ["ok"] * 6
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_error_applies_shared_cooldown_before_retry():
+    """A 429 delays the retry by the advertised Retry-After for every caller."""
+    governor = ProviderGovernor("test")
+    attempts = []
+
+    async def flaky(model_input):
+        attempts.append(time.monotonic())
+        if len(attempts) == 1:
+            raise FakeRateLimitError(retry_after="0.2")
+        return model_input
+
+    model = GovernedRunnable(RunnableLambda(flaky), governor, "test:model").with_retry(
+        stop_after_attempt=2, wait_exponential_jitter=False
+    )
+
+    assert await model.ainvoke("hello") == "hello"
+    assert len(attempts) == 2
+    assert attempts[1] - attempts[0] >= 0.2
+    assert governor.stats["throttled"] == 1
+
+
+def test_changing_a_limit_keeps_the_units_already_taken():
+    """Reconfiguring a bucket does not refill it mid-run."""
+    bucket = TokenBucket(per_minute=100)
+    assert bucket.try_acquire(90) == 0.0
+
+    bucket.set_rate(200)
+
+    # 90 of the new 200 are still taken
+    assert bucket.try_acquire(110) == 0.0
+    assert bucket.try_acquire(10) > 0
+
+
+@pytest.mark.asyncio
+async def test_new_in_flight_limit_applies_once_idle():
+    """Calls in flight keep their semaphore; the new limit applies afterwards."""
+    governor = ProviderGovernor("test", max_in_flight_per_model=1)
+    started = asyncio.Event()
+    release = asyncio.Event()
+
+    async def slow():
+        started.set()
+        await release.wait()
+        return "ok"
+
+    task = asyncio.create_task(governor.run("model", 1, slow))
+    await started.wait()
+    governor.configure(0, 0, max_in_flight_per_model=3, max_backoff_seconds=60)
+    slot = governor._async_slot("model")
+    assert slot.locked()  # still the semaphore the running call holds
+
+    release.set()
+    assert await task == "ok"
+    assert governor._async_slot("model")._value == 3
+
+
+def test_slots_of_closed_loops_are_pruned():
+    """Semaphores are dropped with the event loop they were bound to."""
+    governor = ProviderGovernor("test", max_in_flight_per_model=2)
+
+    async def call():
+        return "ok"
+
+    for _ in range(3):
+        assert asyncio.run(governor.run("model", 1, call)) == "ok"
+
+    # Only the last loop's entry is left, until the next call prunes it too
+    assert len(governor._async_slots) == 1
@@ -2,6 +2,7 @@
 
 """Tests for the research_events_graph."""
 
+import asyncio
 from unittest.mock import AsyncMock, patch
 
 import pytest
@@ -103,19 +104,20 @@ async def test_research_events_with_mocked_llm(
         patch(
             "research_events.research_events_graph.merge_events_app"
         ) as mock_merger_patch,
-        patch("research_events.research_events_graph.TavilySearch") as mock_tavily,
+        patch(
+            "research_events.research_events_graph.SearchService.search",
+            new_callable=AsyncMock,
+        ) as mock_search,
         patch("research_events.research_events_graph.create_structured_model") as mock_llm,
     ):
         # Configure the mocks
         mock_crawler_patch.ainvoke = mock_url_crawler(mock_extracted_events).ainvoke
         mock_merger_patch.ainvoke = mock_merge_events(mock_existing_events).ainvoke
 
-        # Mock TavilySearch to return empty results (no URLs found)
+        # Mock the search to return empty results (no URLs found)
         from unittest.mock import Mock
 
-        mock_tavily_instance = Mock()
-        mock_tavily_instance.invoke.return_value = {"results": []}
-        mock_tavily.return_value = mock_tavily_instance
+        mock_search.return_value = []
 
         # Mock the structured LLM to return a test URL
         mock_llm_instance = Mock()
@@ -145,6 +147,62 @@ async def test_research_events_with_mocked_llm(
     assert isinstance(used_domains, list)
 
 
+@pytest.mark.asyncio
+async def test_pipelined_crawl_extracts_concurrently_and_merges_once():
+    """Pages are scraped/extracted in parallel; one ordered merge updates existing_events."""
+    from research_events.research_events_graph import crawl_urls_pipelined
+
+    in_flight = 0
+    peak = 0
+
+    async def fake_crawl(state, config=None):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return {"extracted_events": f"text of {state['url']}"}
+
+    merge_inputs = []
+
+    async def fake_merge(state, config=None):
+        merge_inputs.append(state)
+        if state.get("extract_only"):
+            # Finish the pages out of order to check the merge order
+            await asyncio.sleep(0.02 if "a.com" in state["extracted_events"] else 0)
+            page = state["extracted_events"].removeprefix("text of ")
+            return {"categorized_chunks": [CategoriesWithEvents(early=f"- {page}\n")]}
+        return {"existing_events": state["extracted_events_categorized"]}
+
+    state = {
+        "research_question": "Research the life of Henry Miller",
+        "existing_events": CategoriesWithEvents(),
+        "used_domains": ["used.com"],
+        "urls": [
+            "https://a.com/1",
+            "https://used.com/2",
+            "https://b.com/3",
+            "https://a.com/4",
+        ],
+    }
+
+    with (
+        patch("research_events.research_events_graph.url_crawler_app") as crawler,
+        patch("research_events.research_events_graph.merge_events_app") as merger,
+    ):
+        crawler.ainvoke = AsyncMock(side_effect=fake_crawl)
+        merger.ainvoke = AsyncMock(side_effect=fake_merge)
+        command = await crawl_urls_pipelined(state, {"configurable": {}})
+
+    assert peak == 2
+    assert command.update["used_domains"] == ["used.com", "a.com", "b.com"]
+    # Two extraction passes and a single combine step
+    assert len(merge_inputs) == 3
+    assert command.update["existing_events"].early == (
+        "[]\n- https://a.com/1\n- https://b.com/3\n"
+    )
+
+
 # @pytest.mark.skip(reason="Skip real LLM test for now")
 @pytest.mark.llm
 @pytest.mark.asyncio
@@ -0,0 +1,124 @@
+"""Tests for the per-host politeness scheduler."""
+
+import asyncio
+
+import pytest
+from aiohttp import web
+from src.url_crawler.http_session import close_http_session
+from src.url_crawler.scheduler import (
+    CrawlScheduler,
+    get_crawl_scheduler,
+    retry_after_seconds,
+)
+from src.url_crawler.utils import scrape_page_content
+
+
+async def crawl(scheduler, host, run=None, log=None, seconds=0.01):
+    """Hold a slot for a moment, recording peak concurrency per host."""
+    async with scheduler.slot(host, run):
+        if log is not None:
+            log.append((run, host, asyncio.get_running_loop().time()))
+        await asyncio.sleep(seconds)
+
+
+@pytest.mark.asyncio
+async def test_enforces_per_host_and_global_limits():
+    """No host exceeds its limit and the total never exceeds the global one."""
+    scheduler = CrawlScheduler(
+        max_concurrency=3, max_per_host=2, min_interval_seconds=0
+    )
+    peak = {"total": 0, "a.org": 0}
+
+    async def tracked(host):
+        async with scheduler.slot(host):
+            peak["total"] = max(peak["total"], scheduler.in_flight)
+            peak["a.org"] = max(peak["a.org"], scheduler._hosts["a.org"].in_flight)
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(*(tracked(host) for host in ["a.org"] * 6 + ["b.org"] * 4))
+
+    assert peak == {"total": 3, "a.org": 2}
+    stats = scheduler.stats()
+    assert stats["in_flight"] == 0 and stats["queued"] == 0
+    assert stats["hosts"]["a.org"]["requests"] == 6
+    assert stats["hosts"]["a.org"]["max_wait"] > 0
+
+
+@pytest.mark.asyncio
+async def test_spaces_requests_to_the_same_host():
+    """Request starts to one host are at least min_interval_seconds apart."""
+    scheduler = CrawlScheduler(max_per_host=5, min_interval_seconds=0.05)
+    log = []
+
+    await asyncio.gather(*(crawl(scheduler, "a.org", log=log) for _ in range(3)))
+
+    starts = [started for _, _, started in log]
+    assert all(b - a >= 0.045 for a, b in zip(starts, starts[1:]))
+
+
+@pytest.mark.asyncio
+async def test_runs_are_served_round_robin():
+    """A run queueing many pages does not starve a run that queues later."""
+    scheduler = CrawlScheduler(
+        max_concurrency=1, max_per_host=1, min_interval_seconds=0
+    )
+    log = []
+
+    busy = [crawl(scheduler, f"site{i}.org", "busy", log) for i in range(4)]
+    late = [crawl(scheduler, f"other{i}.org", "late", log) for i in range(2)]
+    await asyncio.gather(*busy, *late)
+
+    assert [run for run, _, _ in log] == [
+        "busy",
+        "late",
+        "busy",
+        "late",
+        "busy",
+        "busy",
+    ]
+
+
+def test_parses_retry_after_headers():
+    """Retry-After is read as seconds or as an HTTP date."""
+    assert retry_after_seconds({"Retry-After": "7"}) == 7.0
+    assert retry_after_seconds({"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"}) == 0.0
+    assert retry_after_seconds({}) is None
+
+
+@pytest.mark.asyncio
+async def test_honours_retry_after_and_retries(unused_tcp_port):
+    """A 429 cools the host down for Retry-After, then the page is fetched."""
+    calls = []
+
+    async def handle(request):
+        calls.append(asyncio.get_running_loop().time())
+        if len(calls) == 1:
+            return web.Response(status=429, headers={"Retry-After": "0.2"})
+        return web.Response(
+            text="<html><body><h1>Henry Miller</h1><p>Born in 1891.</p></body></html>",
+            content_type="text/html",
+        )
+
+    app = web.Application()
+    app.router.add_get("/miller", handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", unused_tcp_port).start()
+    try:
+        content = await scrape_page_content(
+            f"http://127.0.0.1:{unused_tcp_port}/miller",
+            {
+                "configurable": {
+                    "scraper_backend": "local",
+                    "crawl_min_interval_seconds": 0,
+                }
+            },
+        )
+        host_stats = get_crawl_scheduler(min_interval_seconds=0).stats()["hosts"]
+    finally:
+        await close_http_session()
+        await runner.cleanup()
+
+    assert "Born in 1891." in content
+    assert len(calls) == 2 and calls[1] - calls[0] >= 0.19
+    assert host_stats[f"127.0.0.1:{unused_tcp_port}"]["deferrals"] == 1
@@ -0,0 +1,78 @@
+"""Tests for the pluggable scrapers and the local HTML extractor."""
+
+import pytest
+from aiohttp import web
+from src.url_crawler.html_extractor import extract_main_content
+from src.url_crawler.http_session import close_http_session
+from src.url_crawler.scrapers import get_scraper
+from src.url_crawler.utils import remove_markdown_links, scrape_page_content
+
+PAGE = """<html><head><title>Henry Miller</title>
+<script>var tracking = "Do not index";</script></head>
+<body>
+<nav><ul><li><a href="/">Home</a></li><li><a href="/about">About us</a></li></ul></nav>
+<div class="sidebar"><a href="/a">Popular</a> <a href="/b">Trending now</a></div>
+<div id="content" class="article-body">
+  <h1>Henry Miller</h1>
+  <p>Henry Miller was born on December 26, 1891, in Yorkville, Manhattan, to
+  Lutheran German parents.<sup class="reference">[1]</sup></p>
+  <h2>Paris years<span class="mw-editsection">[edit]</span></h2>
+  <p>In 1930 Miller moved to <a href="/wiki/Paris">Paris</a>, where he lived
+  until the outbreak of World War II, writing steadily.</p>
+  <ul><li>Tropic of Cancer (1934)</li><li>Tropic of Capricorn (1939)</li></ul>
+</div>
+<footer><p>Copyright 2024. All rights reserved, subscribe today.</p></footer>
+</body></html>"""
+
+
+def test_extracts_main_content_as_markdown():
+    """Article text, headings, lists and links survive; page chrome does not."""
+    markdown = extract_main_content(PAGE, base_url="https://example.org/wiki/Miller")
+
+    assert "# Henry Miller" in markdown
+    assert "## Paris years" in markdown
+    assert "born on December 26, 1891, in Yorkville" in markdown
+    assert "[Paris](https://example.org/wiki/Paris)" in markdown
+    assert "- Tropic of Cancer (1934)" in markdown
+    for chrome in (
+        "About us",
+        "Trending now",
+        "Copyright",
+        "Do not index",
+        "[1]",
+        "[edit]",
+    ):
+        assert chrome not in markdown
+    assert "moved to Paris, where" in remove_markdown_links(markdown)
+
+
+def test_unknown_backend_is_rejected():
+    """A misconfigured backend name fails loudly."""
+    assert get_scraper("local").name == "local"
+    with pytest.raises(ValueError, match="Unknown scraper backend"):
+        get_scraper("selenium")
+
+
+@pytest.mark.asyncio
+async def test_local_backend_fetches_and_extracts(unused_tcp_port):
+    """scrape_page_content uses the configured local backend end to end."""
+
+    async def handle(request):
+        return web.Response(text=PAGE, content_type="text/html")
+
+    app = web.Application()
+    app.router.add_get("/miller", handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", unused_tcp_port).start()
+    try:
+        markdown = await scrape_page_content(
+            f"http://127.0.0.1:{unused_tcp_port}/miller",
+            {"configurable": {"scraper_backend": "local"}},
+        )
+    finally:
+        await close_http_session()
+        await runner.cleanup()
+
+    assert markdown.startswith("# Henry Miller")
+    assert "Tropic of Capricorn (1939)" in markdown
@@ -0,0 +1,83 @@
+"""Tests for the cached async search service."""
+
+import pytest
+from aiohttp import web
+from src.services.search_service import SearchService, get_search_backend
+from src.url_crawler.http_session import close_http_session
+
+
+def test_cache_key_normalizes_query_and_domains():
+    """Case, whitespace and domain order do not split the cache."""
+    key = SearchService.cache_key(
+        "tavily", "Henry  Miller life", 6, "general", ["b.org", "A.com"]
+    )
+
+    assert key == SearchService.cache_key(
+        "tavily", " henry miller LIFE ", 6, "general", ["a.com", "b.org"]
+    )
+    assert key != SearchService.cache_key(
+        "tavily", "henry miller life", 6, "general", ["a.com"]
+    )
+    assert key != SearchService.cache_key(
+        "tavily", "henry miller life", 2, "general", ["a.com", "b.org"]
+    )
+
+
+def test_unknown_backend_is_rejected():
+    """A misconfigured backend name fails loudly."""
+    with pytest.raises(ValueError, match="Unknown search backend"):
+        get_search_backend("bing")
+
+
+@pytest.mark.asyncio
+async def test_stub_backend_results_are_cached(tmp_path, unused_tcp_port):
+    """The second identical search is served from disk, not the backend."""
+    requests = []
+
+    async def handle(request):
+        body = await request.json()
+        requests.append(body)
+        results = [
+            {"url": f"https://site{i}.org/miller", "title": "Miller", "content": ""}
+            for i in range(body["max_results"])
+        ]
+        return web.json_response({"results": results})
+
+    app = web.Application()
+    app.router.add_post("/search", handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", unused_tcp_port).start()
+
+    config = {
+        "configurable": {
+            "search_backend": "stub",
+            "search_stub_url": f"http://127.0.0.1:{unused_tcp_port}/search",
+            "search_cache_enabled": True,
+            "search_cache_dir": str(tmp_path),
+        }
+    }
+    try:
+        first = await SearchService.search(
+            "Henry Miller", config, max_results=3, exclude_domains=["x.com"]
+        )
+        second = await SearchService.search(
+            "henry miller", config, max_results=3, exclude_domains=["x.com"]
+        )
+        other = await SearchService.search("Henry Miller", config, max_results=2)
+    finally:
+        await close_http_session()
+        await runner.cleanup()
+
+    assert [r["url"] for r in first] == [
+        f"https://site{i}.org/miller" for i in range(3)
+    ]
+    assert second == first
+    assert len(other) == 2
+    assert len(requests) == 2
+    assert requests[0] == {
+        "query": "Henry Miller",
+        "max_results": 3,
+        "topic": "general",
+        "exclude_domains": ["x.com"],
+    }
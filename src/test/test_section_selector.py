@@ -0,0 +1,95 @@
+"""Tests for the relevance-ranked section selector."""
+
+from unittest.mock import patch
+
+import pytest
+import tiktoken
+from src.url_crawler.section_selector import (
+    query_weights,
+    select_relevant_sections,
+    split_sections,
+)
+
+
+@pytest.fixture(autouse=True)
+def whitespace_tokenizer(whitespace_encoding):
+    """Avoid downloading the tiktoken vocabulary in unit tests."""
+    with patch(
+        "src.url_crawler.section_selector.get_tokenizer",
+        return_value=whitespace_encoding,
+    ):
+        yield
+
+
+FILLER = "The museum shop sells posters, mugs and postcards of the collection. " * 8
+
+PAGE = f"""# Henry Miller
+
+Henry Miller was an American writer.
+
+## Visiting the museum
+
+{FILLER}
+
+## Early life
+
+Miller was born in Yorkville in 1891 and grew up in Brooklyn.
+
+## Opening hours
+
+{FILLER}
+
+## Paris
+
+In 1930 Miller moved to Paris, where he wrote Tropic of Cancer.
+"""
+
+
+def test_split_sections_at_headings():
+    """Each heading starts a section; text before the first heading is kept."""
+    sections = split_sections("intro\n# One\nfirst\n## Two\nsecond")
+
+    assert sections == [("", "intro"), ("# One", "first"), ("## Two", "second")]
+
+
+def test_name_terms_outweigh_other_terms():
+    """Capitalized question words are boosted and stopwords are dropped."""
+    weights = query_weights("Research the life of Henry Miller")
+
+    assert weights == {"henry": 2.0, "miller": 2.0}
+
+
+def test_keeps_relevant_sections_in_document_order():
+    """Within the budget, sections about the person beat page filler."""
+    selected = select_relevant_sections(PAGE, "Henry Miller biography", 60)
+
+    assert "## Early life" in selected
+    assert "## Paris" in selected
+    assert "museum shop" not in selected
+    assert selected.index("Early life") < selected.index("Paris")
+    assert len(selected.split()) <= 60
+
+
+def test_selection_is_deterministic_and_skips_short_pages():
+    """The same input always gives the same output; short pages pass through."""
+    first = select_relevant_sections(PAGE, "Henry Miller", 60)
+
+    assert first == select_relevant_sections(PAGE, "Henry Miller", 60)
+    assert select_relevant_sections(PAGE, "Henry Miller", 10_000) == PAGE
+
+
+def test_special_token_text_is_tokenized_as_plain_text():
+    """Scraped text naming a special token neither raises nor is special."""
+    encoding = tiktoken.Encoding(
+        "offline-bytes",
+        pat_str=r"\S+|\s+",
+        mergeable_ranks={bytes([i]): i for i in range(256)},
+        special_tokens={"<|endoftext|>": 256},
+    )
+    page = f"# Henry Miller\n\nA page about <|endoftext|> tokens.\n\n{PAGE}"
+
+    with patch("src.url_crawler.section_selector.get_tokenizer", return_value=encoding):
+        selected = select_relevant_sections(page, "Henry Miller", 400)
+
+    assert "<|endoftext|>" in selected
+    assert len(encoding.encode_ordinary(selected)) <= 400
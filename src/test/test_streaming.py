@@ -0,0 +1,197 @@
+"""Tests for the streaming scrape-to-chunk pipeline."""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from aiohttp import web
+from src.configuration import Configuration
+from src.services.chunking_service import (
+    STREAM_MAX_CHUNKS,
+    ChunkingService,
+    StreamChunker,
+)
+from src.test.test_chunking import ENCODING, UNICODE_TEXT
+from src.url_crawler.http_session import close_http_session
+from src.url_crawler.streaming import (
+    MarkdownLinkStripper,
+    stream_page_chunks,
+    stream_page_text,
+)
+from src.url_crawler.utils import remove_markdown_links
+
+
+class CharEncoding:
+    """Offline stand-in for the tiktoken encoding: one token per character."""
+
+    def encode_ordinary(self, text):
+        """Map each character to its code point."""
+        return [ord(char) for char in text]
+
+    encode = encode_ordinary
+
+    def decode_bytes(self, tokens):
+        """Encode the characters of the tokens as UTF-8."""
+        return "".join(map(chr, tokens)).encode()
+
+
+def stream_chunks(text, piece_chars, **overrides):
+    """Feed text to a StreamChunker in pieces and collect every chunk."""
+    configurable = Configuration(**overrides)
+    chunker = StreamChunker(configurable, ENCODING, configurable.default_chunk_size)
+    chunks = []
+    for start in range(0, len(text), piece_chars):
+        chunks.extend(chunker.feed(text[start : start + piece_chars]))
+    return chunks + chunker.close()
+
+
+def test_link_stripper_handles_links_split_across_pieces():
+    """Feeding pieces gives the same text as stripping the whole document."""
+    text = "See [Paris](https://example.org/Paris) and\n[Rome](/wiki/Rome) too.\n" * 5
+    stripper = MarkdownLinkStripper()
+
+    streamed = "".join(stripper.feed(text[i : i + 7]) for i in range(0, len(text), 7))
+    streamed += stripper.close()
+
+    assert streamed == remove_markdown_links(text)
+
+
+def test_streamed_token_windows_overlap_and_keep_characters_whole():
+    """Token windows of a stream overlap and never split a multi-byte character."""
+    chunks = stream_chunks(
+        UNICODE_TEXT * 3,
+        101,
+        chunking_strategy="tokens",
+        default_chunk_size=40,
+        default_overlap_size=5,
+    )
+
+    assert len(chunks) > STREAM_MAX_CHUNKS
+    assert all("\ufffd" not in chunk for chunk in chunks)
+    # Consecutive windows share their edge, also across flushes of the stream
+    assert all(b[:1] in a[-5:] for a, b in zip(chunks, chunks[1:]))
+    assert chunks[0] == UNICODE_TEXT[: len(chunks[0])]
+    assert (UNICODE_TEXT * 3).endswith(chunks[-1])
+
+
+def test_streamed_markdown_keeps_paragraphs_and_headings():
+    """A page streamed in small pieces is chunked along its markdown structure."""
+    sections = [
+        f"## Section {i}\n\n"
+        + "\n\n".join(
+            f"Paragraph {i}.{j} says Henry Miller was born in Paris." for j in range(4)
+        )
+        for i in range(12)
+    ]
+    page = "# Henry Miller\n\n" + "\n\n".join(sections)
+
+    chunks = stream_chunks(page, 50, default_chunk_size=60)
+
+    assert len(chunks) > 1
+    assert all(len(ENCODING.encode_ordinary(chunk)) <= 60 for chunk in chunks)
+    text = "\n\n".join(chunks)
+    for i in range(12):
+        for j in range(4):
+            # Every paragraph arrives whole, exactly once
+            assert text.count(f"Paragraph {i}.{j} says") == 1
+            assert f"Paragraph {i}.{j} says Henry Miller was born in Paris." in text
+    # A chunk starting inside a section repeats its headings
+    assert all(chunk.startswith("#") for chunk in chunks)
+
+
+def test_small_streams_chunk_like_whole_pages():
+    """Below the flush size, streaming gives exactly ChunkingService.split."""
+    page = "# Henry Miller\n\n" + "Henry Miller was born in Paris. " * 30
+    configurable = Configuration(default_chunk_size=100)
+
+    assert stream_chunks(page, 17, default_chunk_size=100) == ChunkingService.split(
+        page, configurable, ENCODING
+    )
+
+
+@pytest.mark.asyncio
+async def test_chunks_are_emitted_before_the_page_finishes(unused_tcp_port):
+    """The first chunk arrives while the server is still sending the page."""
+    release = None
+
+    async def handle(request):
+        response = web.StreamResponse(headers={"Content-Type": "text/html"})
+        await response.prepare(request)
+        await response.write(
+            b"<html><body><h1>Henry Miller</h1><p>"
+            + b"Miller wrote in [Paris](/wiki/Paris) for years. " * 200
+            + b"</p>"
+        )
+        await release.wait()
+        await response.write(b"<p>Last paragraph.</p></body></html>")
+        await response.write_eof()
+        return response
+
+    app = web.Application()
+    app.router.add_get("/miller", handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", unused_tcp_port).start()
+
+    release = asyncio.Event()
+    config = {"configurable": {"scraper_backend": "local", "page_cache_enabled": False}}
+    try:
+        with patch(
+            "src.services.chunking_service.get_tokenizer", return_value=CharEncoding()
+        ):
+            chunks = stream_page_chunks(
+                f"http://127.0.0.1:{unused_tcp_port}/miller", config, chunk_size=500
+            )
+            first = await chunks.__anext__()
+            assert not release.is_set()
+            release.set()
+            rest = [chunk async for chunk in chunks]
+    finally:
+        await close_http_session()
+        await runner.cleanup()
+
+    assert first.startswith("# Henry Miller")
+    assert "](" not in first
+    assert "Last paragraph." in rest[-1]
+
+
+@pytest.mark.asyncio
+async def test_streamed_page_is_retried_after_429(unused_tcp_port):
+    """A 429 before the first piece cools the host down and retries the page."""
+    requests = []
+
+    async def handle(request):
+        requests.append(request.path)
+        if len(requests) == 1:
+            return web.Response(status=429, headers={"Retry-After": "0"})
+        return web.Response(
+            text="<html><body><p>Henry Miller was born in 1891.</p></body></html>",
+            content_type="text/html",
+        )
+
+    app = web.Application()
+    app.router.add_get("/miller", handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", unused_tcp_port).start()
+
+    config = {
+        "configurable": {
+            "scraper_backend": "local",
+            "page_cache_enabled": False,
+            "crawl_min_interval_seconds": 0,
+        }
+    }
+    try:
+        pieces = [
+            piece
+            async for piece in stream_page_text(
+                f"http://127.0.0.1:{unused_tcp_port}/miller", config
+            )
+        ]
+    finally:
+        await close_http_session()
+        await runner.cleanup()
+
+    assert len(requests) == 2
+    assert "born in 1891" in "".join(pieces)
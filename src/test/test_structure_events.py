@@ -0,0 +1,96 @@
+"""Tests for the final structuring step of the supervisor graph."""
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from src.graph import structure_events
+from src.services.event_service import EventService
+from src.state import (
+    CategoriesWithEvents,
+    Chronology,
+    ChronologyDate,
+    ChronologyEvent,
+)
+
+
+@pytest.fixture(autouse=True)
+def whitespace_tokenizer(whitespace_encoding):
+    """Avoid downloading the tiktoken vocabulary in unit tests."""
+    with patch(
+        "src.services.event_service.get_tokenizer",
+        return_value=whitespace_encoding,
+    ):
+        yield
+
+
+def test_split_bullets_breaks_only_between_bullets():
+    """Batches respect the budget and never cut a bullet in half."""
+    text = "- one two three\n  continued here\n- four five\n- six seven eight nine"
+
+    batches = EventService.split_bullets_into_batches(text, max_tokens=7)
+
+    assert batches == [
+        "- one two three\n  continued here",
+        "- four five",
+        "- six seven eight nine",
+    ]
+    assert EventService.split_bullets_into_batches("  \n", max_tokens=8) == []
+
+
+@pytest.mark.asyncio
+async def test_structure_events_runs_batches_concurrently_in_order():
+    """All categories and sub-batches are in flight together; output keeps their order."""
+    in_flight = 0
+    peak = 0
+
+    async def structure(prompt):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        names = [
+            line[2:].split()[0]
+            for line in prompt.splitlines()
+            if line.startswith("- ")
+        ]
+        return Chronology(
+            events=[
+                ChronologyEvent(
+                    id=name,
+                    name=name,
+                    description=name,
+                    date=ChronologyDate(year=None),
+                )
+                for name in names
+            ]
+        )
+
+    mock_model = AsyncMock()
+    mock_model.ainvoke.side_effect = structure
+    state = {
+        "existing_events": CategoriesWithEvents(
+            early="- born_1900 a b c\n- school_1910 a b c",
+            career="- first_job a b c",
+            personal="",
+            legacy="- award a b c",
+        )
+    }
+
+    with patch(
+        "src.graph.create_llm_structured_model", return_value=mock_model
+    ), patch("src.graph.summarize_current_run", return_value=None):
+        result = await structure_events(
+            state, {"configurable": {"structure_events_token_budget": 6}}
+        )
+
+    # The early category is split in two; the empty personal category is skipped
+    assert mock_model.ainvoke.await_count == 4
+    assert peak == 4
+    assert [event.id for event in result["structured_events"]] == [
+        "born_1900",
+        "school_1910",
+        "first_job",
+        "award",
+    ]
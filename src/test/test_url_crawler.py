@@ -10,6 +10,16 @@ import pytest
 from url_crawler.url_krawler_graph import url_crawler_app
 
 
+@pytest.fixture(autouse=True)
+def whitespace_tokenizer(whitespace_encoding):
+    """Avoid downloading the tiktoken vocabulary in unit tests."""
+    with patch(
+        "src.url_crawler.section_selector.get_tokenizer",
+        return_value=whitespace_encoding,
+    ):
+        yield
+
+
 @pytest.fixture
 def sample_input_state() -> dict:
     """Provide a sample input state for the url_crawler_app graph."""
@@ -138,4 +148,21 @@ async def test_url_crawler_with_long_content():
     # Content should be truncated to MAX_CONTENT_LENGTH
     returned_content = result["extracted_events"]
     assert len(returned_content) <= len(long_content)
-    assert returned_content == result["raw_scraped_content"]
\ No newline at end of file
+    assert returned_content == result["raw_scraped_content"]
+
+
+@pytest.mark.asyncio
+async def test_url_crawler_caps_characters_before_tokenizing():
+    """Pages are cut to max_content_length characters before section selection."""
+    input_state = {
+        "url": "https://example.com/long",
+        "research_question": "Test question",
+    }
+    config = {"configurable": {"max_content_length": 100}}
+
+    with patch("url_crawler.url_krawler_graph.url_crawl") as mock_crawl:
+        mock_crawl.return_value = "This is a very long content. " * 10000
+
+        result = await url_crawler_app.ainvoke(input_state, config)
+
+    assert result["raw_scraped_content"] == ("This is a very long content. " * 4)[:100]
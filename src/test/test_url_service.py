@@ -0,0 +1,128 @@
+"""Tests for the local URL ranker used by url_finder."""
+
+import json
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from src.research_events.research_events_graph import url_finder
+from src.services.url_service import URLService, load_domain_priors
+
+QUESTION = "Research the life of Henry Miller"
+RESULTS = [
+    {
+        "url": "https://www.pinterest.com/pin/henry-miller-quotes",
+        "title": "Henry Miller quotes",
+        "content": "Save your favourite quotes.",
+        "score": 0.9,
+    },
+    {
+        "url": "https://www.example-blog.net/posts/my-summer",
+        "title": "My summer reading",
+        "content": "I finally read a novel this summer and loved it.",
+        "score": 0.8,
+    },
+    {
+        "url": "https://en.wikipedia.org/wiki/Henry_Miller",
+        "title": "Henry Miller - Wikipedia",
+        "content": "Henry Miller was born on December 26, 1891, in Yorkville. "
+        "He moved to Paris in 1930 and died on June 7, 1980.",
+        "score": 0.6,
+    },
+    {
+        "url": "https://en.wikipedia.org/wiki/Tropic_of_Cancer_(novel)",
+        "title": "Tropic of Cancer (novel)",
+        "content": "Tropic of Cancer is a novel by Henry Miller published in 1934.",
+        "score": 0.5,
+    },
+    {
+        "url": "https://www.britannica.com/biography/Henry-Miller",
+        "title": "Henry Miller | American author | Britannica",
+        "content": "Henry Miller, American writer, born in 1891, married five times.",
+        "score": 0.4,
+    },
+]
+
+
+def test_ranks_biographical_sources_first():
+    """Reputable, on-topic pages beat social media and unrelated blogs."""
+    ranked = URLService.rank_urls(RESULTS, QUESTION)
+    urls = [url for url, _ in ranked]
+
+    assert urls[0] == "https://en.wikipedia.org/wiki/Henry_Miller"
+    assert urls[1] == "https://www.britannica.com/biography/Henry-Miller"
+    assert set(urls[-2:]) == {
+        "https://www.pinterest.com/pin/henry-miller-quotes",
+        "https://www.example-blog.net/posts/my-summer",
+    }
+
+
+def test_top_ranked_urls_are_from_distinct_domains():
+    """A second page of the same site is skipped in favour of another domain."""
+    ranked = URLService.rank_urls(RESULTS, QUESTION)
+
+    assert URLService.top_ranked_urls(ranked, 2) == [
+        "https://en.wikipedia.org/wiki/Henry_Miller",
+        "https://www.britannica.com/biography/Henry-Miller",
+    ]
+
+
+def test_domain_priors_file_overrides_defaults(tmp_path):
+    """Priors from a JSON file replace the built-in value of a domain."""
+    path = tmp_path / "priors.json"
+    path.write_text(json.dumps({"Pinterest.com": 1.0}))
+
+    priors = load_domain_priors(str(path))
+
+    assert URLService.domain_prior("https://www.pinterest.com/x", priors) == 1.0
+    assert URLService.domain_prior("https://de.wikipedia.org/x", priors) == 1.0
+    assert URLService.domain_prior("https://unknown.example/x", priors) == 0.0
+
+
+def test_ranking_confidence_uses_the_margin():
+    """Hybrid mode asks the LLM only when the cut-off is a near tie."""
+    ranked = [
+        ("https://a.org/", 2.0),
+        ("https://b.org/", 1.5),
+        ("https://c.org/", 1.45),
+    ]
+
+    assert not URLService.is_ranking_confident(ranked, 2, margin=0.15)
+    assert URLService.is_ranking_confident(ranked, 1, margin=0.15)
+    assert URLService.is_ranking_confident(ranked[:2], 2, margin=0.15)
+
+
+def test_ranking_confidence_ignores_same_domain_duplicates():
+    """The margin is measured between URLs top_ranked_urls could pick."""
+    ranked = [
+        ("https://en.wikipedia.org/wiki/A", 2.0),
+        ("https://en.wikipedia.org/wiki/B", 1.95),
+        ("https://www.britannica.com/a", 1.5),
+        ("https://www.example.org/a", 1.45),
+    ]
+
+    assert not URLService.is_ranking_confident(ranked, 2, margin=0.15)
+    assert URLService.is_ranking_confident(ranked, 1, margin=0.15)
+
+
+@pytest.mark.asyncio
+async def test_local_mode_skips_the_llm():
+    """url_finder picks URLs without any structured-LLM call in local mode."""
+    with (
+        patch(
+            "src.research_events.research_events_graph.SearchService.search",
+            new=AsyncMock(return_value=RESULTS),
+        ),
+        patch(
+            "src.research_events.research_events_graph.create_llm_structured_model"
+        ) as create_llm,
+    ):
+        command = await url_finder(
+            {"research_question": QUESTION, "used_domains": []},
+            {"configurable": {"url_selection_mode": "local"}},
+        )
+
+    create_llm.assert_not_called()
+    assert command.update["urls"] == [
+        "https://en.wikipedia.org/wiki/Henry_Miller",
+        "https://www.britannica.com/biography/Henry-Miller",
+    ]
@@ -0,0 +1,99 @@
+"""Tests for the callback-based usage accounting."""
+
+import json
+from typing import TypedDict
+
+import pytest
+from langchain_core.language_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from langgraph.graph import END, START, StateGraph
+from src.core.usage_tracking import UsageTracker, summarize_current_run
+
+
+class FakeState(TypedDict):
+    """State of the two-node test graph."""
+
+    answer: str
+    usage: dict
+
+
+def fake_model(count: int) -> GenericFakeChatModel:
+    """Return a chat model that reports 1000 input and 200 output tokens per call."""
+    return GenericFakeChatModel(
+        messages=iter(
+            AIMessage(
+                content="done",
+                usage_metadata={
+                    "input_tokens": 1000,
+                    "output_tokens": 200,
+                    "total_tokens": 1200,
+                },
+                response_metadata={"model_name": "gpt-4o-mini"},
+            )
+            for _ in range(count)
+        )
+    )
+
+
+def build_graph(tracker: UsageTracker):
+    """Two nodes: one makes two LLM calls, the other one call."""
+    model = fake_model(3)
+
+    async def research(state, config):
+        await model.ainvoke("first")
+        await model.ainvoke("second")
+        return {"answer": "researched"}
+
+    async def summarize(state, config):
+        await model.ainvoke("third")
+        return {"answer": "summarized", "usage": summarize_current_run(config, tracker)}
+
+    builder = StateGraph(FakeState)
+    builder.add_node("research", research)
+    builder.add_node("summarize", summarize)
+    builder.add_edge(START, "research")
+    builder.add_edge("research", "summarize")
+    builder.add_edge("summarize", END)
+    return builder.compile().with_config({"callbacks": [tracker]})
+
+
+def test_price_lookup_uses_longest_prefix():
+    """Provider prefixes are ignored and the most specific price wins."""
+    tracker = UsageTracker()
+
+    assert tracker.price_for("openai:gpt-4o-mini") == (0.15, 0.60)
+    assert tracker.price_for("openai:gpt-4o") == (2.50, 10.00)
+    assert tracker.price_for("ollama:gemma3:4b") == (0.0, 0.0)
+
+
+@pytest.mark.asyncio
+async def test_usage_is_aggregated_per_node_and_written_to_report(tmp_path):
+    """Tokens and calls are grouped by node and the run report is written on completion."""
+    tracker = UsageTracker(
+        price_table={"gpt-4o-mini": (1.0, 2.0)},
+        report_dir=str(tmp_path),
+    )
+    graph = build_graph(tracker)
+
+    result = await graph.ainvoke({"answer": ""})
+
+    # Read from inside the last node: all three calls have finished by then
+    assert result["usage"]["totals"]["calls"] == 3
+
+    reports = list(tmp_path.glob("usage_*.json"))
+    assert len(reports) == 1
+    summary = json.loads(reports[0].read_text())
+
+    assert summary["totals"]["calls"] == 3
+    assert summary["totals"]["input_tokens"] == 3000
+    assert summary["totals"]["output_tokens"] == 600
+    assert summary["nodes"]["research"]["calls"] == 2
+    assert summary["nodes"]["summarize"]["calls"] == 1
+    assert summary["nodes"]["research"]["wall_seconds"] > 0
+    assert summary["models"]["gpt-4o-mini"]["calls"] == 3
+    assert summary["totals"]["cost_usd"] == pytest.approx(
+        (3000 * 1.0 + 600 * 2.0) / 1e6
+    )
+
+    # Every run of the finished tree dropped its parent link
+    assert tracker._parents == {}
@@ -0,0 +1,472 @@
+"""Readability-style main content extraction and HTML-to-markdown conversion.
+
+Only the standard library is used. The page is parsed into a light tree,
+paragraph-like blocks add their score to their parent and grandparent
+containers, container scores are penalised by link density and by
+navigation-like class names, and the best container (plus similarly scored
+siblings) is rendered as markdown: headings, paragraphs, lists, quotes, code,
+tables and `[text](url)` links.
+"""
+
+import re
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Union
+from urllib.parse import urljoin
+
+VOID_TAGS = {
+    "area",
+    "base",
+    "br",
+    "col",
+    "embed",
+    "hr",
+    "img",
+    "input",
+    "link",
+    "meta",
+    "param",
+    "source",
+    "track",
+    "wbr",
+}
+# Never part of the readable content
+SKIPPED_TAGS = {
+    "script",
+    "style",
+    "noscript",
+    "template",
+    "svg",
+    "canvas",
+    "iframe",
+    "form",
+    "button",
+    "select",
+    "textarea",
+    "nav",
+    "footer",
+    "aside",
+    "head",
+}
+BLOCK_TAGS = {
+    "address",
+    "article",
+    "blockquote",
+    "dd",
+    "div",
+    "dl",
+    "dt",
+    "figcaption",
+    "figure",
+    "h1",
+    "h2",
+    "h3",
+    "h4",
+    "h5",
+    "h6",
+    "header",
+    "li",
+    "main",
+    "ol",
+    "p",
+    "pre",
+    "section",
+    "table",
+    "tbody",
+    "thead",
+    "tr",
+    "ul",
+}
+SCORED_BLOCKS = {"p", "pre", "td", "blockquote"}
+CANDIDATE_BASE_SCORES = {
+    "article": 10,
+    "main": 10,
+    "div": 5,
+    "section": 3,
+    "pre": 3,
+    "td": 3,
+    "blockquote": 3,
+    "form": -3,
+    "ol": -3,
+    "ul": -3,
+    "dl": -3,
+    "li": -3,
+    "h1": -5,
+    "h2": -5,
+    "h3": -5,
+    "h4": -5,
+    "h5": -5,
+    "h6": -5,
+    "th": -5,
+}
+
+POSITIVE_HINTS = re.compile(
+    r"article|body|content|entry|main|page|post|text|blog|story|parser-output",
+    re.IGNORECASE,
+)
+NEGATIVE_HINTS = re.compile(
+    r"comment|meta|footer|footnote|sidebar|navbar|navigation|menu|share|social|"
+    r"related|promo|banner|widget|cookie|subscribe|breadcrumb|masthead|popup|"
+    r"topbar|top-bar|toolbar|login",
+    re.IGNORECASE,
+)
+# Removed inside the chosen content as well (edit links, citation markers, nav boxes)
+REMOVED_HINTS = re.compile(
+    r"editsection|reference|navbox|noprint|mw-jump|share|social|cookie|"
+    r"sidebar|comment|breadcrumb|advert",
+    re.IGNORECASE,
+)
+
+MIN_BLOCK_CHARS = 25
+
+
+class Node:
+    """A parsed element; children are nodes or text strings."""
+
+    __slots__ = ("tag", "attrs", "children", "parent", "text_len", "link_len")
+
+    def __init__(self, tag: str, attrs: Dict[str, str], parent: Optional["Node"]):
+        """Create an empty element under parent."""
+        self.tag = tag
+        self.attrs = attrs
+        self.children: List[Union[Node, str]] = []
+        self.parent = parent
+        self.text_len = 0
+        self.link_len = 0
+
+    @property
+    def hints(self) -> str:
+        """Class and id attributes, searched for content and boilerplate names."""
+        return f"{self.attrs.get('class', '')} {self.attrs.get('id', '')}"
+
+    def text(self) -> str:
+        """Return the text of the element and its descendants."""
+        parts = []
+        for child in self.children:
+            parts.append(child if isinstance(child, str) else child.text())
+        return "".join(parts)
+
+
+class _TreeBuilder(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = Node("document", {}, None)
+        self.stack = [self.root]
+        self.skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if self.skip_depth:
+            if tag in SKIPPED_TAGS:
+                self.skip_depth += 1
+            return
+        if tag in SKIPPED_TAGS and tag not in VOID_TAGS:
+            self.skip_depth = 1
+            return
+        # Implicitly close an open paragraph or list item, as browsers do
+        if tag in BLOCK_TAGS and self.stack[-1].tag == "p":
+            self.stack.pop()
+        if tag == "li" and self.stack[-1].tag == "li":
+            self.stack.pop()
+
+        node = Node(tag, {k: v or "" for k, v in attrs}, self.stack[-1])
+        self.stack[-1].children.append(node)
+        if tag not in VOID_TAGS:
+            self.stack.append(node)
+
+    def handle_startendtag(self, tag, attrs):
+        if not self.skip_depth and tag not in SKIPPED_TAGS:
+            self.stack[-1].children.append(
+                Node(tag, {k: v or "" for k, v in attrs}, self.stack[-1])
+            )
+
+    def handle_endtag(self, tag):
+        if self.skip_depth:
+            if tag in SKIPPED_TAGS:
+                self.skip_depth -= 1
+            return
+        for depth in range(len(self.stack) - 1, 0, -1):
+            if self.stack[depth].tag == tag:
+                del self.stack[depth:]
+                return
+
+    def handle_data(self, data):
+        if not self.skip_depth and data:
+            self.stack[-1].children.append(data)
+
+
+def parse_html(html: str) -> Node:
+    """Parse HTML into a tree of Node objects, dropping non-content elements."""
+    builder = _TreeBuilder()
+    builder.feed(html)
+    builder.close()
+    _measure(builder.root)
+    return builder.root
+
+
+def _measure(node: Node) -> None:
+    """Compute text and link-text lengths bottom-up for every node."""
+    stack = [(node, False)]
+    while stack:
+        current, visited = stack.pop()
+        if not visited:
+            stack.append((current, True))
+            stack.extend((c, False) for c in current.children if isinstance(c, Node))
+            continue
+        text_len = link_len = 0
+        for child in current.children:
+            if isinstance(child, str):
+                text_len += len(child.strip())
+            else:
+                text_len += child.text_len
+                link_len += child.link_len
+        current.text_len = text_len
+        current.link_len = text_len if current.tag == "a" else link_len
+
+
+def _iter_nodes(root: Node):
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        yield node
+        stack.extend(reversed([c for c in node.children if isinstance(c, Node)]))
+
+
+def _class_weight(node: Node) -> int:
+    hints = node.hints
+    weight = 0
+    if POSITIVE_HINTS.search(hints):
+        weight += 25
+    if NEGATIVE_HINTS.search(hints):
+        weight -= 25
+    return weight
+
+
+def _link_density(node: Node) -> float:
+    return node.link_len / node.text_len if node.text_len else 1.0
+
+
+def find_main_content(root: Node) -> List[Node]:
+    """Return the best scoring content container and its qualifying siblings."""
+    scores: Dict[int, float] = {}
+    nodes: Dict[int, Node] = {}
+
+    def add(node: Node | None, amount: float) -> None:
+        if node is None or node.tag == "document":
+            return
+        if id(node) not in scores:
+            scores[id(node)] = CANDIDATE_BASE_SCORES.get(node.tag, 0) + _class_weight(
+                node
+            )
+            nodes[id(node)] = node
+        scores[id(node)] += amount
+
+    for node in _iter_nodes(root):
+        if node.tag not in SCORED_BLOCKS or node.text_len < MIN_BLOCK_CHARS:
+            continue
+        text = node.text()
+        score = 1 + text.count(",") + min(len(text) // 100, 3)
+        add(node.parent, score)
+        if node.parent is not None:
+            add(node.parent.parent, score / 2)
+
+    if not scores:
+        body = next((n for n in _iter_nodes(root) if n.tag == "body"), root)
+        return [body]
+
+    final = {
+        key: score * (1 - _link_density(nodes[key])) for key, score in scores.items()
+    }
+    top_key = max(final, key=final.get)
+    top = nodes[top_key]
+    if top.parent is None:
+        return [top]
+
+    threshold = max(10.0, final[top_key] * 0.2)
+    selected = []
+    for sibling in top.parent.children:
+        if not isinstance(sibling, Node):
+            continue
+        if sibling is top or final.get(id(sibling), float("-inf")) >= threshold:
+            selected.append(sibling)
+        elif (
+            sibling.tag == "p"
+            and sibling.text_len > 80
+            and _link_density(sibling) < 0.25
+        ):
+            selected.append(sibling)
+    return selected
+
+
+class _MarkdownRenderer:
+    def __init__(self, base_url: str):
+        self.base_url = base_url
+
+    def render(self, nodes: List[Node]) -> str:
+        markdown = "".join(self._block(node) for node in nodes)
+        markdown = re.sub(r"[ \t]+\n", "\n", markdown)
+        markdown = re.sub(r"\n{3,}", "\n\n", markdown)
+        return markdown.strip()
+
+    def _inline(self, node: Union[Node, str], preformatted: bool = False) -> str:
+        if isinstance(node, str):
+            return node if preformatted else re.sub(r"\s+", " ", node)
+        if REMOVED_HINTS.search(node.hints):
+            return ""
+        tag = node.tag
+        if tag == "br":
+            return "\n"
+        if tag == "img":
+            return ""
+        inner = "".join(self._inline(c, preformatted) for c in node.children)
+        if tag == "a":
+            text = inner.strip()
+            href = node.attrs.get("href", "")
+            if not text:
+                return ""
+            if not href or href.startswith(("#", "javascript:")):
+                return text
+            return f"[{text}]({urljoin(self.base_url, href)})"
+        if tag in ("strong", "b") and inner.strip():
+            return f"**{inner.strip()}** "
+        if tag in ("em", "i") and inner.strip():
+            return f"*{inner.strip()}* "
+        if tag == "code" and not preformatted and inner.strip():
+            return f"`{inner.strip()}`"
+        if tag in BLOCK_TAGS or tag in ("td", "th"):
+            return self._block(node)
+        return inner
+
+    def _block(self, node: Union[Node, str], list_prefix: str = "") -> str:
+        if isinstance(node, str):
+            return self._inline(node)
+        if REMOVED_HINTS.search(node.hints):
+            return ""
+        tag = node.tag
+
+        if tag in ("h1", "h2", "h3", "h4", "h5", "h6"):
+            text = self._text(node)
+            return f"\n\n{'#' * int(tag[1])} {text}\n\n" if text else ""
+        if tag == "pre":
+            code = "".join(self._inline(c, preformatted=True) for c in node.children)
+            return f"\n\n```\n{code.strip(chr(10))}\n```\n\n"
+        if tag in ("ul", "ol"):
+            items = []
+            for index, child in enumerate(
+                (c for c in node.children if isinstance(c, Node) and c.tag == "li"),
+                start=1,
+            ):
+                marker = f"{index}." if tag == "ol" else "-"
+                text = self._text(child)
+                if text:
+                    items.append(f"{list_prefix}{marker} {text}")
+            return "\n\n" + "\n".join(items) + "\n\n" if items else ""
+        if tag == "blockquote":
+            text = self._text(node)
+            return (
+                "\n\n" + "\n".join(f"> {line}" for line in text.splitlines()) + "\n\n"
+            )
+        if tag == "table":
+            rows = []
+            for row in (n for n in _iter_nodes(node) if n.tag == "tr"):
+                cells = [
+                    self._text(c).replace("\n", " ")
+                    for c in row.children
+                    if isinstance(c, Node) and c.tag in ("td", "th")
+                ]
+                if any(cells):
+                    rows.append("| " + " | ".join(cells) + " |")
+            return "\n\n" + "\n".join(rows) + "\n\n" if rows else ""
+        if tag in BLOCK_TAGS or tag in ("body", "document", "td", "th"):
+            inner = "".join(self._inline(c) for c in node.children)
+            return f"\n\n{inner.strip()}\n\n" if inner.strip() else ""
+        return self._inline(node)
+
+    def _text(self, node: Node) -> str:
+        text = "".join(self._inline(c) for c in node.children)
+        text = re.sub(r"[ \t]+", " ", text)
+        return re.sub(r"\n{2,}", "\n", text).strip()
+
+
+def extract_main_content(html: str, base_url: str = "") -> str:
+    """Return the main content of an HTML page as markdown."""
+    root = parse_html(html)
+    return _MarkdownRenderer(base_url).render(find_main_content(root))
+
+
+class StreamingTextExtractor(HTMLParser):
+    """Incremental HTML-to-markdown conversion for pages read as a stream.
+
+    Readability scoring needs the whole document, so this keeps only the
+    local rules: non-content tags and elements whose class/id looks like
+    navigation, sidebars or boilerplate are skipped; everything else is
+    emitted as markdown text as soon as it is parsed. Memory is bounded by
+    the open element stack, not the page size.
+    """
+
+    def __init__(self):
+        """Start with no open elements and no output."""
+        super().__init__(convert_charrefs=True)
+        self._open: List[tuple] = []  # (tag, skipped) for every open element
+        self._skip_depth = 0
+        self._output: List[str] = []
+        self._started = False
+
+    def feed(self, data: str) -> str:
+        """Parse the next piece of HTML and return the markdown it produced."""
+        super().feed(data)
+        return self._drain()
+
+    def close(self) -> str:
+        """Flush the parser and return the remaining markdown."""
+        super().close()
+        return self._drain()
+
+    def _drain(self) -> str:
+        text = "".join(self._output)
+        self._output.clear()
+        if not self._started:
+            text = text.lstrip()
+            self._started = bool(text)
+        # Collapse the blank lines left by nested or skipped blocks
+        return re.sub(r"\n[ \t|]*(?:\n[ \t|]*)+", "\n\n", text)
+
+    def handle_starttag(self, tag, attrs):
+        """Open an element and emit the markdown that starts it."""
+        if tag in VOID_TAGS:
+            if not self._skip_depth and tag == "br":
+                self._output.append("\n")
+            return
+        hints = " ".join(v or "" for k, v in attrs if k in ("class", "id"))
+        skipped = tag in SKIPPED_TAGS or bool(
+            hints and (NEGATIVE_HINTS.search(hints) or REMOVED_HINTS.search(hints))
+        )
+        self._open.append((tag, skipped))
+        if skipped:
+            self._skip_depth += 1
+        if self._skip_depth:
+            return
+        if tag in ("h1", "h2", "h3", "h4", "h5", "h6"):
+            self._output.append(f"\n\n{'#' * int(tag[1])} ")
+        elif tag == "li":
+            self._output.append("\n- ")
+        elif tag in BLOCK_TAGS or tag in ("td", "th"):
+            self._output.append("\n\n" if tag not in ("td", "th") else " | ")
+
+    def handle_endtag(self, tag):
+        """Close tag and any elements left open inside it."""
+        for depth in range(len(self._open) - 1, -1, -1):
+            if self._open[depth][0] != tag:
+                continue
+            for _, skipped in self._open[depth:]:
+                if skipped:
+                    self._skip_depth -= 1
+            del self._open[depth:]
+            if not self._skip_depth and tag in BLOCK_TAGS:
+                self._output.append("\n\n")
+            return
+
+    def handle_data(self, data):
+        """Emit text outside skipped elements with whitespace collapsed."""
+        if not self._skip_depth:
+            text = re.sub(r"\s+", " ", data)
+            if text.strip() or (self._output and not self._output[-1].endswith(" ")):
+                self._output.append(text)
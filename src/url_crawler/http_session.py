@@ -0,0 +1,121 @@
+"""Shared, lazily created aiohttp session for every scraping entry point.
+
+A session (and its connection pool) is created on first use in each event
+loop and reused for all later requests on that loop, so DNS lookups, TCP and
+TLS handshakes are paid once per host instead of once per URL. The pool caps
+the total number of connections and the number per host.
+
+The session is closed when its loop shuts down (asyncio.run closes the async
+generators of the loop on exit), or earlier by close_http_session.
+"""
+
+import asyncio
+import atexit
+import logging
+import threading
+from typing import TYPE_CHECKING, AsyncIterator, Dict, Tuple
+
+if TYPE_CHECKING:
+    import aiohttp
+
+logger = logging.getLogger(__name__)
+
+_sessions: Dict[
+    int,
+    Tuple[asyncio.AbstractEventLoop, "aiohttp.ClientSession", AsyncIterator[None]],
+] = {}
+_sessions_lock = threading.Lock()
+
+
+async def _close_at_loop_shutdown(
+    session: "aiohttp.ClientSession",
+) -> AsyncIterator[None]:
+    """Stay suspended until the loop shuts down its async generators, then close."""
+    try:
+        yield
+    finally:
+        if not session.closed:
+            await session.close()
+
+
+def _close_without_loop(session: "aiohttp.ClientSession") -> None:
+    """Close the session of a loop that is already closed.
+
+    Its connections died with the loop, so closing the connector only drops
+    them and never suspends: the close coroutine is stepped to its end here.
+    """
+    closing = session.close()
+    try:
+        closing.send(None)
+    except StopIteration:
+        pass
+    except Exception as e:
+        logger.warning("Failed to close HTTP session of a closed loop: %s", e)
+    else:
+        closing.close()
+
+
+def get_http_session(
+    limit: int = 20, limit_per_host: int = 10, keepalive_seconds: float = 30.0
+) -> "aiohttp.ClientSession":
+    """Return the pooled session of the running event loop, creating it on first use.
+
+    The pool limits only apply when the session is created.
+    """
+    import aiohttp
+
+    loop = asyncio.get_running_loop()
+    with _sessions_lock:
+        # Sessions of loops that have since been closed can never be used again
+        for key, (other_loop, session, _) in list(_sessions.items()):
+            if other_loop.is_closed():
+                del _sessions[key]
+                _close_without_loop(session)
+
+        entry = _sessions.get(id(loop))
+        if entry is not None and entry[0] is loop and not entry[1].closed:
+            return entry[1]
+
+        connector = aiohttp.TCPConnector(
+            limit=limit,
+            limit_per_host=limit_per_host,
+            keepalive_timeout=keepalive_seconds,
+            ttl_dns_cache=300,
+        )
+        session = aiohttp.ClientSession(connector=connector)
+        # Run up to its yield, which registers it with the loop's shutdown
+        closer = _close_at_loop_shutdown(session)
+        asyncio.ensure_future(anext(closer))
+        _sessions[id(loop)] = (loop, session, closer)
+        return session
+
+
+async def close_http_session() -> None:
+    """Close the pooled session of the running event loop, if there is one."""
+    loop = asyncio.get_running_loop()
+    with _sessions_lock:
+        entry = _sessions.pop(id(loop), None)
+    if entry is not None:
+        _, session, closer = entry
+        await closer.aclose()
+        if not session.closed:
+            await session.close()
+
+
+def _close_sessions_at_exit() -> None:
+    with _sessions_lock:
+        entries = list(_sessions.values())
+        _sessions.clear()
+    for loop, session, _ in entries:
+        if session.closed or loop.is_running():
+            continue
+        if loop.is_closed():
+            _close_without_loop(session)
+            continue
+        try:
+            loop.run_until_complete(session.close())
+        except Exception as e:
+            logger.warning("Failed to close HTTP session at exit: %s", e)
+
+
+atexit.register(_close_sessions_at_exit)
@@ -0,0 +1,251 @@
+"""Compressed on-disk cache of scraped pages, keyed by canonical URL.
+
+Each page is stored as one zlib-compressed JSON file, sharded into
+sub-directories by the first two characters of the key hash. Entries expire
+after a TTL; within the stale-while-revalidate window an expired page is
+still served while a background task fetches a fresh copy. Once the size cap
+is exceeded the least recently read files are removed first.
+
+Pages are keyed by canonical URL plus a variant (the scraper backend), since
+different scrapers return different markdown for the same page. The directory
+is listed once per process to build an in-memory LRU index of the files and
+their sizes; later reads, writes and evictions only update that index.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query parameters that never change the page content
+TRACKING_PARAMS = {"fbclid", "gclid", "mc_cid", "mc_eid", "ref", "ref_src"}
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def canonicalize_url(url: str) -> str:
+    """Normalize a URL so trivially different spellings share a cache entry."""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower() or "https"
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+
+    path = parts.path or "/"
+    if len(path) > 1:
+        path = path.rstrip("/")
+
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.startswith("utm_") and key not in TRACKING_PARAMS
+    )
+    return urlunsplit((scheme, host, path, urlencode(query), ""))
+
+
+class PageCache:
+    """Sharded directory of compressed pages with TTL, stale window and size cap."""
+
+    def __init__(
+        self,
+        directory: str,
+        ttl_seconds: int = 0,
+        max_bytes: int = 0,
+        stale_seconds: int = 0,
+    ):
+        """Use directory for the pages; 0 disables the TTL and the size cap."""
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.stale_seconds = stale_seconds
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self.revalidations = 0
+        self._lock = threading.Lock()
+        self._total_bytes = 0
+        # File path -> size, least recently read first; built on first use
+        self._index: OrderedDict[str, int] | None = None
+        self._revalidating: Dict[str, asyncio.Task] = {}
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, url: str, variant: str = "") -> str:
+        key = canonicalize_url(url)
+        if variant:
+            key = f"{variant} {key}"
+        key = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, key[:2], f"{key}.zlib")
+
+    def _files(self):
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if name.endswith(".zlib"):
+                    yield os.path.join(root, name)
+
+    def _entries(self) -> OrderedDict[str, int]:
+        """Return the LRU index, listing the directory the first time only."""
+        if self._index is None:
+            files = []
+            for path in self._files():
+                try:
+                    files.append((os.path.getmtime(path), path, os.path.getsize(path)))
+                except OSError:
+                    continue
+            self._index = OrderedDict((path, size) for _, path, size in sorted(files))
+            self._total_bytes = sum(self._index.values())
+        return self._index
+
+    def get(self, url: str, variant: str = "") -> Tuple[str, bool] | None:
+        """Return (content, is_stale) for url, or None on a miss or expired entry."""
+        path = self._path(url, variant)
+        try:
+            with open(path, "rb") as f:
+                entry = json.loads(zlib.decompress(f.read()))
+        except (OSError, zlib.error, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        age = time.time() - entry["fetched_at"]
+        is_stale = bool(self.ttl_seconds) and age > self.ttl_seconds
+        with self._lock:
+            if is_stale and age > self.ttl_seconds + self.stale_seconds:
+                self._remove(path)
+                self.misses += 1
+                return None
+            if is_stale:
+                self.stale_hits += 1
+            else:
+                self.hits += 1
+            entries = self._entries()
+            if path in entries:
+                entries.move_to_end(path)
+        # The modification time persists the LRU order for the next process
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry["content"], is_stale
+
+    def set(self, url: str, content: str, variant: str = "") -> None:
+        """Store content for url and evict pages until the size cap holds."""
+        path = self._path(url, variant)
+        data = zlib.compress(
+            json.dumps(
+                {"url": url, "fetched_at": time.time(), "content": content}
+            ).encode("utf-8")
+        )
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+
+        with self._lock:
+            entries = self._entries()
+            previous = entries.pop(path, 0)
+            os.replace(tmp_path, path)
+            entries[path] = len(data)
+            self._total_bytes += len(data) - previous
+            self.writes += 1
+            if self.max_bytes and self._total_bytes > self.max_bytes:
+                self._evict(keep=path)
+
+    def _remove(self, path: str) -> None:
+        size = self._entries().pop(path, 0)
+        self._total_bytes -= size
+        try:
+            os.remove(path)
+        except OSError:
+            return
+        self.evictions += 1
+
+    def _evict(self, keep: str) -> None:
+        entries = self._entries()
+        for path in list(entries):
+            if self._total_bytes <= self.max_bytes:
+                break
+            if path != keep:
+                self._remove(path)
+
+    def revalidate(
+        self,
+        url: str,
+        fetch: Callable[[str], Awaitable[str | None]],
+        variant: str = "",
+    ) -> None:
+        """Refresh url in the background, at most once at a time per URL."""
+        key = self._path(url, variant)
+        if key in self._revalidating:
+            return
+
+        async def refresh() -> None:
+            try:
+                content = await fetch(url)
+                if content:
+                    await asyncio.to_thread(self.set, url, content, variant)
+            finally:
+                self._revalidating.pop(key, None)
+
+        self.revalidations += 1
+        self._revalidating[key] = asyncio.create_task(refresh())
+
+    def clear(self) -> None:
+        """Remove every page and reset the counters."""
+        with self._lock:
+            for path in list(self._files()):
+                os.remove(path)
+            self._index = OrderedDict()
+            self._total_bytes = 0
+            self.hits = self.stale_hits = self.misses = 0
+            self.writes = self.evictions = self.revalidations = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current on-disk usage."""
+        with self._lock:
+            entries = len(self._entries())
+            total = self._total_bytes
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "revalidations": self.revalidations,
+            "entries": entries,
+            "bytes": total,
+        }
+
+
+_caches: Dict[Tuple[str, int, int, int], PageCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_page_cache(
+    directory: str, ttl_seconds: int = 0, max_bytes: int = 0, stale_seconds: int = 0
+) -> PageCache:
+    """Return the process-wide page cache for directory, creating it on first use.
+
+    Each combination of limits gets its own cache, so a later configuration
+    with another TTL or size cap is not served by an earlier one.
+    """
+    key = (directory, ttl_seconds, max_bytes, stale_seconds)
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = PageCache(
+                directory,
+                ttl_seconds=ttl_seconds,
+                max_bytes=max_bytes,
+                stale_seconds=stale_seconds,
+            )
+            _caches[key] = cache
+        return cache
@@ -0,0 +1,290 @@
+"""Per-host politeness scheduler for every crawl request.
+
+Each request first waits for a slot. A slot is granted when:
+
+- fewer than the global limit of requests are in flight,
+- fewer than the per-host limit are in flight to the target host,
+- the minimum spacing since the previous request to that host has passed,
+- and the host is not cooling down after a 429/503 (Retry-After honoured).
+
+Waiting requests are queued per research run and runs are served round
+robin, so one run crawling many pages cannot starve another. Queue wait
+times are recorded per host for tuning throughput against bans.
+
+One scheduler is kept per event loop, like the pooled HTTP session.
+"""
+
+import asyncio
+import contextvars
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, Deque, Dict, Mapping, Tuple
+
+# Statuses after which a host is cooled down and the request retried
+RETRYABLE_STATUSES = {429, 503}
+
+# Queue wait samples kept for the percentiles in stats()
+WAIT_SAMPLES = 1000
+
+# Runs whose last grant is remembered for round-robin ordering
+MAX_TRACKED_RUNS = 256
+
+# Research run the current task belongs to; requests are queued per run
+crawl_run: contextvars.ContextVar[str] = contextvars.ContextVar(
+    "crawl_run", default="default"
+)
+
+
+def retry_after_seconds(headers: Mapping[str, str] | None) -> float | None:
+    """Parse a Retry-After header given in seconds or as an HTTP date."""
+    value = (headers or {}).get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class HostState:
+    """Limits, timing and wait metrics of one host."""
+
+    limit: int | None = None  # None: the scheduler's max_per_host
+    interval: float | None = None  # None: the scheduler's min_interval_seconds
+    in_flight: int = 0
+    next_start: float = 0.0  # loop time before which no request may start
+    blocked_until: float = 0.0  # end of a Retry-After cooldown
+    requests: int = 0
+    deferrals: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+    waits: Deque[float] = field(default_factory=lambda: deque(maxlen=WAIT_SAMPLES))
+
+    def ready_at(self) -> float:
+        """Return the loop time at which the host may start its next request."""
+        return max(self.next_start, self.blocked_until)
+
+
+@dataclass
+class _Waiter:
+    host: str
+    future: asyncio.Future
+    queued_at: float
+
+
+class CrawlScheduler:
+    """Grants crawl slots under global and per-host limits, fairly across runs."""
+
+    def __init__(
+        self,
+        max_concurrency: int = 16,
+        max_per_host: int = 2,
+        min_interval_seconds: float = 0.5,
+        max_retry_after_seconds: float = 120.0,
+    ):
+        """Set the global limit and the defaults applied to every host."""
+        self.max_concurrency = max_concurrency
+        self.max_per_host = max_per_host
+        self.min_interval_seconds = min_interval_seconds
+        self.max_retry_after_seconds = max_retry_after_seconds
+        self.in_flight = 0
+        self._hosts: Dict[str, HostState] = {}
+        # Waiting requests per run, and when each run was last granted a slot
+        self._queues: Dict[str, Deque[_Waiter]] = {}
+        self._last_served: Dict[str, int] = {}
+        self._grants = 0
+        self._timer: asyncio.TimerHandle | None = None
+        self._timer_at = 0.0
+
+    def _host(self, host: str, limit: int | None, interval: float | None) -> HostState:
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = HostState()
+        if limit is not None:
+            state.limit = limit
+        if interval is not None:
+            state.interval = interval
+        return state
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        host: str,
+        run: str | None = None,
+        limit: int | None = None,
+        interval: float | None = None,
+    ) -> AsyncIterator[None]:
+        """Wait for a slot to send one request to host.
+
+        limit and interval override the per-host concurrency and spacing for
+        this host (e.g. for a scraping API rather than a website).
+        """
+        self._host(host, limit, interval)
+        run = run or crawl_run.get()
+        loop = asyncio.get_running_loop()
+        waiter = _Waiter(host, loop.create_future(), loop.time())
+        self._queues.setdefault(run, deque()).append(waiter)
+        self._dispatch()
+        try:
+            await waiter.future
+        except BaseException:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Granted just as we were cancelled: give the slot back
+                self._release(host)
+            else:
+                self._discard(run, waiter)
+            raise
+        try:
+            yield
+        finally:
+            self._release(host)
+
+    def defer(self, host: str, seconds: float) -> None:
+        """Hold back every request to host for seconds (capped), e.g. after a 429."""
+        state = self._host(host, None, None)
+        loop = asyncio.get_running_loop()
+        delay = min(max(seconds, 0.0), self.max_retry_after_seconds)
+        state.blocked_until = max(state.blocked_until, loop.time() + delay)
+        state.deferrals += 1
+
+    def _discard(self, run: str, waiter: _Waiter) -> None:
+        queue = self._queues.get(run)
+        if queue is None:
+            return
+        try:
+            queue.remove(waiter)
+        except ValueError:
+            pass
+        if not queue:
+            del self._queues[run]
+
+    def _release(self, host: str) -> None:
+        self._hosts[host].in_flight -= 1
+        self.in_flight -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Grant as many waiting requests as the limits allow, round robin by run."""
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        retry_at = None
+        granted = True
+        while granted and self.in_flight < self.max_concurrency:
+            granted = False
+            # The run served least recently goes first
+            for run in sorted(self._queues, key=lambda r: self._last_served.get(r, -1)):
+                queue = self._queues[run]
+                for waiter in queue:
+                    state = self._hosts[waiter.host]
+                    limit = self.max_per_host if state.limit is None else state.limit
+                    if state.in_flight >= limit:
+                        continue  # retried when a request to the host finishes
+                    if state.ready_at() > now:
+                        ready_at = state.ready_at()
+                        retry_at = (
+                            ready_at if retry_at is None else min(retry_at, ready_at)
+                        )
+                        continue
+                    self._grant(waiter, state, now)
+                    self._grants += 1
+                    self._last_served[run] = self._grants
+                    queue.remove(waiter)
+                    if not queue:
+                        del self._queues[run]
+                    granted = True
+                    break
+                if granted:
+                    break
+
+        if len(self._last_served) > MAX_TRACKED_RUNS:
+            # Forget runs with nothing queued; they restart at the front
+            for run in list(self._last_served):
+                if run not in self._queues:
+                    del self._last_served[run]
+
+        if self._queues and retry_at is not None:
+            self._schedule(loop, retry_at)
+
+    def _grant(self, waiter: _Waiter, state: HostState, now: float) -> None:
+        state.in_flight += 1
+        self.in_flight += 1
+        interval = (
+            self.min_interval_seconds if state.interval is None else state.interval
+        )
+        state.next_start = now + interval
+        wait = now - waiter.queued_at
+        state.requests += 1
+        state.total_wait += wait
+        state.max_wait = max(state.max_wait, wait)
+        state.waits.append(wait)
+        waiter.future.set_result(None)
+
+    def _schedule(self, loop: asyncio.AbstractEventLoop, when: float) -> None:
+        if self._timer is not None and not self._timer.cancelled():
+            if self._timer_at <= when and self._timer_at > loop.time():
+                return
+            self._timer.cancel()
+        self._timer_at = when
+        self._timer = loop.call_at(when, self._dispatch)
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue wait metrics per host (seconds) and current load."""
+        hosts = {}
+        for host, state in self._hosts.items():
+            waits = sorted(state.waits)
+            hosts[host] = {
+                "requests": state.requests,
+                "deferrals": state.deferrals,
+                "in_flight": state.in_flight,
+                "mean_wait": state.total_wait / state.requests
+                if state.requests
+                else 0.0,
+                "p95_wait": waits[int(0.95 * (len(waits) - 1))] if waits else 0.0,
+                "max_wait": state.max_wait,
+            }
+        return {
+            "in_flight": self.in_flight,
+            "queued": sum(len(queue) for queue in self._queues.values()),
+            "hosts": hosts,
+        }
+
+
+_schedulers: Dict[int, Tuple[asyncio.AbstractEventLoop, CrawlScheduler]] = {}
+_schedulers_lock = threading.Lock()
+
+
+def get_crawl_scheduler(
+    max_concurrency: int = 16,
+    max_per_host: int = 2,
+    min_interval_seconds: float = 0.5,
+    max_retry_after_seconds: float = 120.0,
+) -> CrawlScheduler:
+    """Return the scheduler of the running event loop, creating it on first use.
+
+    The limits passed in are applied to it on every call.
+    """
+    loop = asyncio.get_running_loop()
+    with _schedulers_lock:
+        for key, (other_loop, _) in list(_schedulers.items()):
+            if other_loop.is_closed():
+                del _schedulers[key]
+
+        entry = _schedulers.get(id(loop))
+        if entry is None or entry[0] is not loop:
+            entry = _schedulers[id(loop)] = (loop, CrawlScheduler())
+        scheduler = entry[1]
+
+    scheduler.max_concurrency = max_concurrency
+    scheduler.max_per_host = max_per_host
+    scheduler.min_interval_seconds = min_interval_seconds
+    scheduler.max_retry_after_seconds = max_retry_after_seconds
+    return scheduler
@@ -0,0 +1,171 @@
+"""Pluggable page scrapers behind `scrape_page_content`.
+
+Every backend turns a URL into markdown of the page's main content, in the
+shape `remove_markdown_links` expects. The backend is picked by
+`Configuration.scraper_backend`:
+
+- "firecrawl": the Firecrawl `/v0/scrape` API (default)
+- "local": fetch the HTML directly and extract the main content locally
+"""
+
+import asyncio
+import codecs
+import os
+from typing import TYPE_CHECKING, AsyncIterator, Dict
+from urllib.parse import urlsplit
+
+from src.url_crawler.html_extractor import (
+    StreamingTextExtractor,
+    extract_main_content,
+)
+
+FIRECRAWL_API_URL = (
+    f"{os.getenv('FIRECRAWL_BASE_URL', 'https://api.firecrawl.dev')}/v0/scrape"
+)
+
+# Characters handed downstream per streamed piece
+STREAM_PIECE_CHARS = 16 * 1024
+
+LOCAL_SCRAPER_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (compatible; EventDeepResearch/0.1)",
+    "Accept": "text/html,application/xhtml+xml;q=0.9,*/*;q=0.5",
+}
+
+if TYPE_CHECKING:
+    import aiohttp
+
+
+def client_timeout(seconds: float) -> "aiohttp.ClientTimeout":
+    """Build a total request timeout; aiohttp is imported on the first request."""
+    import aiohttp
+
+    return aiohttp.ClientTimeout(total=seconds)
+
+
+class Scraper:
+    """A scraping backend: returns the page's main content as markdown, or None."""
+
+    name = ""
+    # Whether requests go to a scraping API rather than to the page's own host
+    is_api = False
+    # Whether stream() yields the page while it downloads
+    streams = False
+
+    def request_host(self, url: str) -> str:
+        """Host that scraping url actually sends requests to."""
+        return urlsplit(url).netloc.lower()
+
+    async def scrape(self, url: str, session: "aiohttp.ClientSession") -> str | None:
+        """Scrape url using the shared HTTP session."""
+        raise NotImplementedError
+
+    def stream(self, url: str, session: "aiohttp.ClientSession") -> AsyncIterator[str]:
+        """Yield the page's markdown in pieces while it downloads.
+
+        Only backends with streams set implement it; use scrape otherwise.
+        """
+        raise NotImplementedError(f"The {self.name} scraper cannot stream pages")
+
+
+class FirecrawlScraper(Scraper):
+    """Scrapes through the Firecrawl API."""
+
+    name = "firecrawl"
+    is_api = True
+
+    def request_host(self, url: str) -> str:
+        """Every page is fetched through the Firecrawl API host."""
+        return urlsplit(FIRECRAWL_API_URL).netloc.lower()
+
+    async def scrape(self, url: str, session: "aiohttp.ClientSession") -> str | None:
+        """Post url to Firecrawl and return the markdown it extracted."""
+        headers = {"Content-Type": "application/json"}
+
+        # Add API key if available
+        api_key = os.getenv("FIRECRAWL_API_KEY")
+        if api_key:
+            headers["Authorization"] = f"Bearer {api_key}"
+
+        async with session.post(
+            FIRECRAWL_API_URL,
+            json={
+                "url": url,
+                "pageOptions": {"onlyMainContent": True},
+                "formats": ["markdown"],
+            },
+            headers=headers,
+            timeout=client_timeout(30),
+        ) as response:
+            response.raise_for_status()
+            data = await response.json()
+            return data.get("data", {}).get("markdown")
+
+
+class LocalHtmlScraper(Scraper):
+    """Fetches the HTML directly and extracts the main content in-process."""
+
+    name = "local"
+    streams = True
+
+    async def scrape(self, url: str, session: "aiohttp.ClientSession") -> str | None:
+        """Download url and convert its main content to markdown."""
+        async with session.get(
+            url,
+            headers=LOCAL_SCRAPER_HEADERS,
+            timeout=client_timeout(15),
+        ) as response:
+            response.raise_for_status()
+            if "html" not in response.headers.get("Content-Type", "text/html"):
+                return None
+            html = await response.text(errors="replace")
+            final_url = str(response.url)
+
+        # Parsing is CPU bound; keep the event loop free for concurrent crawls
+        return await asyncio.to_thread(extract_main_content, html, final_url) or None
+
+    async def stream(
+        self, url: str, session: "aiohttp.ClientSession"
+    ) -> AsyncIterator[str]:
+        """Yield markdown while the HTML is still downloading.
+
+        Uses the incremental extractor, so only local rules (skipped tags and
+        boilerplate class names) apply instead of whole-page scoring.
+        """
+        async with session.get(
+            url,
+            headers=LOCAL_SCRAPER_HEADERS,
+            timeout=client_timeout(15),
+        ) as response:
+            response.raise_for_status()
+            if "html" not in response.headers.get("Content-Type", "text/html"):
+                return
+            try:
+                decoder_class = codecs.getincrementaldecoder(
+                    response.charset or "utf-8"
+                )
+            except LookupError:
+                decoder_class = codecs.getincrementaldecoder("utf-8")
+            decoder = decoder_class(errors="replace")
+            parser = StreamingTextExtractor()
+            async for data in response.content.iter_chunked(STREAM_PIECE_CHARS):
+                text = parser.feed(decoder.decode(data))
+                if text:
+                    yield text
+            text = parser.feed(decoder.decode(b"", final=True)) + parser.close()
+            if text:
+                yield text
+
+
+SCRAPERS: Dict[str, Scraper] = {
+    scraper.name: scraper for scraper in (FirecrawlScraper(), LocalHtmlScraper())
+}
+
+
+def get_scraper(name: str) -> Scraper:
+    """Return the scraping backend registered under name."""
+    try:
+        return SCRAPERS[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown scraper backend {name!r}; expected one of {sorted(SCRAPERS)}"
+        ) from None
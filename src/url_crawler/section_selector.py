@@ -0,0 +1,175 @@
+"""Relevance-ranked selection of page sections under a token budget.
+
+Pages longer than the budget are split into heading-delimited sections
+(oversized sections are split further on paragraph and sentence boundaries),
+every section is scored with BM25 against the research question, and the
+best sections are kept, in document order, until the budget is spent. The
+result is deterministic, so the same page always yields the same input.
+"""
+
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import List
+
+from src.core.chunking import PARAGRAPH_BREAK, markdown_sections, split_to_budget
+from src.url_crawler.utils import get_tokenizer
+
+WORD = re.compile(r"\w+")
+
+# Sections are split into pieces no larger than this, so one long section
+# cannot crowd out everything else
+MAX_SECTION_TOKENS = 512
+
+# BM25 parameters
+K1 = 1.5
+B = 0.75
+
+# Capitalized words in the question (the person's name) count this much more
+NAME_WEIGHT = 2.0
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has he her his in is it its of on or "
+    "she that the their they this to was were what when where which who with "
+    "about research life biography find information".split()
+)
+
+
+@dataclass
+class Section:
+    """A piece of the page: its text, its heading and where it came from."""
+
+    heading: str
+    text: str
+    group: int  # index of the heading-delimited section it belongs to
+    position: int
+    tokens: int
+    score: float = 0.0
+
+
+def query_weights(query: str) -> dict[str, float]:
+    """Weight the query terms, boosting capitalized (name) terms."""
+    weights: dict[str, float] = {}
+    for word in WORD.findall(query):
+        term = word.lower()
+        if term in STOPWORDS:
+            continue
+        weight = NAME_WEIGHT if word[0].isupper() else 1.0
+        weights[term] = max(weights.get(term, 0.0), weight)
+    return weights
+
+
+def split_sections(markdown: str) -> List[tuple[str, str]]:
+    """Split markdown into (heading, body) pairs at heading lines."""
+    return [(heading, body) for _, heading, body in markdown_sections(markdown)]
+
+
+def _split_oversized(text: str, encoding) -> List[str]:
+    """Group paragraphs (or sentences of long paragraphs) into small pieces."""
+    units: List[str] = []
+    for paragraph in PARAGRAPH_BREAK.split(text):
+        paragraph = paragraph.strip()
+        if paragraph:
+            units.extend(split_to_budget(paragraph, encoding, MAX_SECTION_TOKENS))
+
+    pieces: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+    for unit in units:
+        unit_tokens = len(encoding.encode_ordinary(unit))
+        if current and current_tokens + unit_tokens > MAX_SECTION_TOKENS:
+            pieces.append("\n\n".join(current))
+            current, current_tokens = [], 0
+        current.append(unit)
+        current_tokens += unit_tokens
+    if current:
+        pieces.append("\n\n".join(current))
+    return pieces
+
+
+def build_sections(markdown: str, encoding) -> List[Section]:
+    """Split markdown into scoreable sections of at most MAX_SECTION_TOKENS."""
+    sections: List[Section] = []
+    for group, (heading, body) in enumerate(split_sections(markdown)):
+        heading_tokens = len(encoding.encode_ordinary(heading)) if heading else 0
+        body_tokens = len(encoding.encode_ordinary(body))
+        pieces = (
+            [body]
+            if heading_tokens + body_tokens <= MAX_SECTION_TOKENS
+            else _split_oversized(body, encoding)
+        )
+        for piece in pieces or [""]:
+            tokens = heading_tokens + len(encoding.encode_ordinary(piece))
+            sections.append(Section(heading, piece, group, len(sections), tokens))
+    return sections
+
+
+def score_sections(sections: List[Section], query: str) -> None:
+    """Set each section's BM25 score against the weighted query terms."""
+    weights = query_weights(query)
+    if not sections or not weights:
+        return
+
+    term_counts = [
+        Counter(WORD.findall(f"{s.heading}\n{s.text}".lower())) for s in sections
+    ]
+    lengths = [sum(counts.values()) for counts in term_counts]
+    average_length = sum(lengths) / len(lengths) or 1.0
+    document_frequency = Counter(
+        term for counts in term_counts for term in weights if term in counts
+    )
+
+    for section, counts, length in zip(sections, term_counts, lengths):
+        score = 0.0
+        for term, weight in weights.items():
+            frequency = counts.get(term, 0)
+            if not frequency:
+                continue
+            df = document_frequency[term]
+            idf = math.log(1 + (len(sections) - df + 0.5) / (df + 0.5))
+            norm = K1 * (1 - B + B * length / average_length)
+            score += weight * idf * frequency * (K1 + 1) / (frequency + norm)
+        section.score = score
+
+
+def render_sections(sections: List[Section]) -> str:
+    """Join sections in document order, writing each heading once."""
+    parts = []
+    previous_group = None
+    for section in sorted(sections, key=lambda s: s.position):
+        if section.heading and section.group != previous_group:
+            parts.append(section.heading)
+        if section.text:
+            parts.append(section.text)
+        previous_group = section.group
+    return "\n\n".join(parts)
+
+
+def select_relevant_sections(markdown: str, query: str, max_tokens: int) -> str:
+    """Keep the sections most relevant to query that fit in max_tokens tokens.
+
+    Content that already fits is returned unchanged. Otherwise sections are
+    taken best score first (earlier sections win ties) and rendered back in
+    document order.
+    """
+    encoding = get_tokenizer()
+    if (
+        len(markdown) <= max_tokens
+        or len(encoding.encode_ordinary(markdown)) <= max_tokens
+    ):
+        return markdown
+
+    sections = build_sections(markdown, encoding)
+    score_sections(sections, query)
+
+    selected: List[Section] = []
+    remaining = max_tokens
+    for section in sorted(sections, key=lambda s: (-s.score, s.position)):
+        if section.tokens <= remaining:
+            selected.append(section)
+            remaining -= section.tokens
+    if not selected:
+        # Nothing fits (a single huge sentence): fall back to a hard cut
+        return encoding.decode(encoding.encode_ordinary(markdown)[:max_tokens])
+    return render_sections(selected)
@@ -0,0 +1,168 @@
+"""Streaming scrape-to-chunk pipeline with bounded memory.
+
+Pieces of page text flow from the scraper through an incremental markdown
+link stripper into `ChunkingService.stream`, which yields chunks (with the
+configured chunking strategy) as soon as they are complete, so chunk
+classification can start while the page is still downloading. At most
+`max_content_length` characters of a page are consumed; apart from that the
+pipeline only holds the current piece, one unfinished line and a few chunks
+worth of text.
+
+Only backends that can stream (the local scraper) read the page
+incrementally; others (Firecrawl) fetch the whole page first, which is then
+chunked the same way.
+"""
+
+import asyncio
+import logging
+import re
+from contextlib import aclosing
+from typing import AsyncIterator
+
+from langchain_core.runnables import RunnableConfig
+from src.services.chunking_service import ChunkingService
+from src.url_crawler.http_session import get_http_session
+from src.url_crawler.page_cache import get_page_cache
+from src.url_crawler.scrapers import STREAM_PIECE_CHARS, get_scraper
+from src.url_crawler.utils import (
+    cached_scrape_page_content,
+    crawl_slot,
+    defer_for_retry,
+    get_configuration,
+)
+
+logger = logging.getLogger(__name__)
+
+# Same pattern as remove_markdown_links; "." never crosses a newline, so a
+# line can be rewritten as soon as it is complete
+LINK_PATTERN = re.compile(r"\[(.*?)\]\(.*?\)")
+
+# Longest unfinished line (or whitespace-free run) held back between pieces
+MAX_PENDING_CHARS = 4096
+
+
+class MarkdownLinkStripper:
+    """Incremental remove_markdown_links: rewrites complete lines, holds back the rest."""
+
+    def __init__(self):
+        """Start with nothing held back."""
+        self._pending = ""
+
+    def feed(self, text: str) -> str:
+        """Add text and return the link-free text that is safe to emit."""
+        buffer = self._pending + text
+        cut = buffer.rfind("\n") + 1
+        if not cut and len(buffer) > MAX_PENDING_CHARS:
+            # A very long line: emit up to the last possible link start
+            bracket = buffer.rfind("[")
+            cut = bracket if bracket > 0 else len(buffer)
+        self._pending = buffer[cut:]
+        return LINK_PATTERN.sub(r"\1", buffer[:cut])
+
+    def close(self) -> str:
+        """Return whatever is still held back."""
+        text, self._pending = self._pending, ""
+        return LINK_PATTERN.sub(r"\1", text)
+
+
+async def slices(content: str) -> AsyncIterator[str]:
+    """Yield content in pieces of STREAM_PIECE_CHARS characters."""
+    for start in range(0, len(content), STREAM_PIECE_CHARS):
+        yield content[start : start + STREAM_PIECE_CHARS]
+
+
+async def stream_page_text(
+    url: str, config: RunnableConfig | None = None
+) -> AsyncIterator[str]:
+    """Yield up to max_content_length characters of the page's markdown.
+
+    Pages already in the page cache are replayed from it; streamed pages are
+    not written back, since only a window of them is read. A backend that
+    cannot stream scrapes the page whole (through the page cache). A 429/503
+    before the first piece cools the host down and retries, as for a whole
+    page; once pieces have been yielded the page cannot be restarted.
+    """
+    configurable = get_configuration(config)
+    window = configurable.max_content_length
+    scraper = get_scraper(configurable.scraper_backend)
+
+    if not scraper.streams:
+        content = await cached_scrape_page_content(url, config)
+        async for piece in slices((content or "")[:window]):
+            yield piece
+        return
+
+    if configurable.page_cache_enabled:
+        cache = get_page_cache(
+            configurable.page_cache_dir,
+            ttl_seconds=configurable.page_cache_ttl_seconds,
+            max_bytes=configurable.page_cache_max_bytes,
+            stale_seconds=configurable.page_cache_stale_seconds,
+        )
+        cached = await asyncio.to_thread(cache.get, url, configurable.scraper_backend)
+        if cached is not None:
+            async for piece in slices(cached[0][:window]):
+                yield piece
+            return
+
+    session = get_http_session(
+        limit=configurable.http_pool_limit,
+        limit_per_host=configurable.http_pool_limit_per_host,
+        keepalive_seconds=configurable.http_keepalive_seconds,
+    )
+    consumed = 0
+    try:
+        for attempt in range(configurable.crawl_max_retries + 1):
+            try:
+                async with crawl_slot(scraper, url, configurable):
+                    async with aclosing(scraper.stream(url, session)) as pieces:
+                        async for piece in pieces:
+                            piece = piece[: window - consumed]
+                            consumed += len(piece)
+                            yield piece
+                            if consumed >= window:
+                                # Stop reading; closing the stream releases the connection
+                                break
+                return
+            except Exception as e:
+                if consumed or not defer_for_retry(
+                    e, attempt, scraper, url, configurable
+                ):
+                    raise
+    except Exception as e:
+        logger.warning("Error streaming page content: %s", e)
+
+
+async def stream_page_chunks(
+    url: str,
+    config: RunnableConfig | None = None,
+    chunk_size: int | None = None,
+    overlap_size: int | None = None,
+    overhead_tokens: int = 0,
+) -> AsyncIterator[str]:
+    """Yield link-free chunks of a page while it is being scraped.
+
+    Chunks follow the configured strategy and sizes (see ChunkingService);
+    chunk_size and overlap_size override them.
+    """
+    configurable = get_configuration(config)
+    overrides = {}
+    if chunk_size is not None:
+        overrides.update(chunk_size_mode="fixed", default_chunk_size=chunk_size)
+    if overlap_size is not None:
+        overrides["default_overlap_size"] = overlap_size
+    if overrides:
+        configurable = configurable.model_copy(update=overrides)
+    stripper = MarkdownLinkStripper()
+
+    async def link_free_pieces() -> AsyncIterator[str]:
+        async with aclosing(stream_page_text(url, config)) as pieces:
+            async for piece in pieces:
+                yield stripper.feed(piece)
+        yield stripper.close()
+
+    async with aclosing(
+        ChunkingService.stream(link_free_pieces(), configurable, overhead_tokens)
+    ) as chunks:
+        async for chunk in chunks:
+            yield chunk
@@ -1,14 +1,14 @@
-import random
+import asyncio
+from functools import lru_cache
 from typing import Literal, TypedDict
 
+from langchain_core.runnables import RunnableConfig
 from langgraph.graph import END, START, StateGraph
-from langgraph.graph.state import Command
+from langgraph.graph.state import Command, CompiledStateGraph
 from src.configuration import Configuration
+from src.url_crawler.section_selector import select_relevant_sections
 from src.url_crawler.utils import url_crawl
-from src.utils import get_langfuse_handler
-
-config = Configuration()
-MAX_CONTENT_LENGTH = config.max_content_length
+from src.utils import get_graph_callbacks, lazy_graph_attributes
 
 
 class InputUrlCrawlerState(TypedDict):
@@ -25,16 +25,25 @@ class OutputUrlCrawlerState(UrlCrawlerState):
     raw_scraped_content: str
 
 
-async def scrape_content(state: UrlCrawlerState) -> Command[Literal["__end__"]]:
-    """Scrapes URL content and returns it without any processing."""
+async def scrape_content(
+    state: UrlCrawlerState, config: RunnableConfig
+) -> Command[Literal["__end__"]]:
+    """Scrapes URL content, keeping the sections most relevant to the question."""
     url = state.get("url", "")
+    configurable = Configuration.from_runnable_config(config)
 
     content = await url_crawl(url)
 
-    if len(content) > MAX_CONTENT_LENGTH:
-        # At random start to get diverse content
-        start_index = random.randint(0, len(content) - MAX_CONTENT_LENGTH)
-        content = content[start_index : start_index + MAX_CONTENT_LENGTH]
+    # Bound the text handed to the tokenizer; huge pages are cut first
+    content = content[: configurable.max_content_length]
+
+    # Pages over the token budget keep their best-matching sections
+    content = await asyncio.to_thread(
+        select_relevant_sections,
+        content,
+        state.get("research_question", ""),
+        configurable.max_content_tokens,
+    )
 
     return Command(
         goto=END,
@@ -56,4 +65,10 @@ builder.add_node("scrape_content", scrape_content)
 builder.add_edge(START, "scrape_content")
 
 
-url_crawler_app = builder.compile().with_config({"callbacks": [get_langfuse_handler()]})
+@lru_cache(maxsize=1)
+def get_url_crawler_app() -> CompiledStateGraph:
+    """Compile the URL crawler graph on first use."""
+    return builder.compile().with_config({"callbacks": get_graph_callbacks()})
+
+
+__getattr__ = lazy_graph_attributes(__name__, url_crawler_app=get_url_crawler_app)
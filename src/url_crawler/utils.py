@@ -1,52 +1,145 @@
 import asyncio
-import os
 import re
 from typing import List
 
-import aiohttp
-import tiktoken
-
-FIRECRAWL_API_URL = (
-    f"{os.getenv('FIRECRAWL_BASE_URL', 'https://api.firecrawl.dev')}/v0/scrape"
+from langchain_core.runnables import RunnableConfig
+from langgraph.config import get_config
+from src.configuration import Configuration
+from src.core.chunking import chunk_by_tokens
+from src.url_crawler.http_session import get_http_session
+from src.url_crawler.page_cache import get_page_cache
+from src.url_crawler.scheduler import (
+    RETRYABLE_STATUSES,
+    CrawlScheduler,
+    get_crawl_scheduler,
+    retry_after_seconds,
 )
+from src.url_crawler.scrapers import Scraper, get_scraper
+
+
+def get_configuration(config: RunnableConfig | None) -> Configuration:
+    """Resolve the configuration, defaulting to the config of the running graph."""
+    if config is None:
+        try:
+            config = get_config()
+        except RuntimeError:
+            pass
+    return Configuration.from_runnable_config(config)
 
 
-async def url_crawl(url: str) -> str:
+async def url_crawl(url: str, config: RunnableConfig | None = None) -> str:
     """Crawls a URL and returns its content. For this example, returns dummy text."""
     # print(f"--- FAKE CRAWLING: {url} ---")
     # if "wikipedia" in url:
     #     return "Henry Miller was an American novelist, short story writer and essayist. He was born in Yorkville, NYC on December 26, 1891. He moved to Paris in 1930. He wrote tropic of cancer, part of his series of novels about his life."
 
-    content = await scrape_page_content(url)
+    content = await cached_scrape_page_content(url, config)
     if content is None:
         return ""
     return remove_markdown_links(content)
 
 
-async def scrape_page_content(url):
-    """Scrapes URL using Firecrawl API and returns Markdown content."""
+async def cached_scrape_page_content(
+    url: str, config: RunnableConfig | None = None
+) -> str | None:
+    """Scrapes URL through the on-disk page cache, if enabled.
+
+    Without an explicit config, the config of the running graph (if any) is used.
+    """
+    configurable = get_configuration(config)
+    if not configurable.page_cache_enabled:
+        return await scrape_page_content(url, config)
+
+    cache = get_page_cache(
+        configurable.page_cache_dir,
+        ttl_seconds=configurable.page_cache_ttl_seconds,
+        max_bytes=configurable.page_cache_max_bytes,
+        stale_seconds=configurable.page_cache_stale_seconds,
+    )
+    # Scrapers extract different markdown from the same page
+    backend = configurable.scraper_backend
+    cached = await asyncio.to_thread(cache.get, url, backend)
+    if cached is not None:
+        content, is_stale = cached
+        if is_stale:
+            cache.revalidate(url, lambda u: scrape_page_content(u, config), backend)
+        return content
+
+    content = await scrape_page_content(url, config)
+    # Failed scrapes are not cached so the next run tries again
+    if content:
+        await asyncio.to_thread(cache.set, url, content, backend)
+    return content
+
+
+def get_configured_crawl_scheduler(configurable: Configuration) -> CrawlScheduler:
+    """Return the running loop's crawl scheduler with the configured limits."""
+    return get_crawl_scheduler(
+        max_concurrency=configurable.crawl_max_concurrency,
+        max_per_host=configurable.crawl_max_per_host,
+        min_interval_seconds=configurable.crawl_min_interval_seconds,
+        max_retry_after_seconds=configurable.crawl_max_retry_after_seconds,
+    )
+
+
+def crawl_slot(scraper: Scraper, url: str, configurable: Configuration):
+    """Wait for the politeness scheduler to allow one request for url."""
+    scheduler = get_configured_crawl_scheduler(configurable)
+    if scraper.is_api:
+        # A scraping API is not a website to be polite to, only to stay under
+        return scheduler.slot(
+            scraper.request_host(url),
+            limit=configurable.crawl_api_max_concurrency,
+            interval=0.0,
+        )
+    return scheduler.slot(scraper.request_host(url))
+
+
+def defer_for_retry(
+    error: Exception,
+    attempt: int,
+    scraper: Scraper,
+    url: str,
+    configurable: Configuration,
+) -> bool:
+    """Cool the host down after a 429/503 and return whether to try url again."""
+    import aiohttp
+
+    if (
+        not isinstance(error, aiohttp.ClientResponseError)
+        or error.status not in RETRYABLE_STATUSES
+        or attempt >= configurable.crawl_max_retries
+    ):
+        return False
+    delay = retry_after_seconds(error.headers)
+    get_configured_crawl_scheduler(configurable).defer(
+        scraper.request_host(url),
+        delay if delay is not None else 2.0**attempt,
+    )
+    return True
+
+
+async def scrape_page_content(url, config: RunnableConfig | None = None):
+    """Scrapes URL with the configured backend and returns Markdown content.
+
+    Requests go through the per-host politeness scheduler; after a 429/503
+    the host is cooled down (honouring Retry-After) and the page retried.
+    """
     try:
-        headers = {"Content-Type": "application/json"}
-
-        # Add API key if available
-        api_key = os.getenv("FIRECRAWL_API_KEY")
-        if api_key:
-            headers["Authorization"] = f"Bearer {api_key}"
-
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                FIRECRAWL_API_URL,
-                json={
-                    "url": url,
-                    "pageOptions": {"onlyMainContent": True},
-                    "formats": ["markdown"],
-                },
-                headers=headers,
-                timeout=aiohttp.ClientTimeout(total=30),
-            ) as response:
-                response.raise_for_status()
-                data = await response.json()
-                return data.get("data", {}).get("markdown")
+        configurable = get_configuration(config)
+        session = get_http_session(
+            limit=configurable.http_pool_limit,
+            limit_per_host=configurable.http_pool_limit_per_host,
+            keepalive_seconds=configurable.http_keepalive_seconds,
+        )
+        scraper = get_scraper(configurable.scraper_backend)
+        for attempt in range(configurable.crawl_max_retries + 1):
+            try:
+                async with crawl_slot(scraper, url, configurable):
+                    return await scraper.scrape(url, session)
+            except Exception as e:
+                if not defer_for_retry(e, attempt, scraper, url, configurable):
+                    raise
     except Exception as e:
         print(f"Error scraping page content: {e}")
         return None
@@ -65,6 +158,8 @@ def get_tokenizer():
     """Get the tiktoken tokenizer, loading it lazily."""
     global _tokenizer
     if _tokenizer is None:
+        import tiktoken
+
         _tokenizer = tiktoken.get_encoding("cl100k_base")
     return _tokenizer
 
@@ -72,32 +167,20 @@ def get_tokenizer():
 async def chunk_text_by_tokens(
     text: str, chunk_size: int = 1000, overlap_size: int = 20
 ) -> List[str]:
-    """Splits text into token-based, overlapping chunks."""
+    """Split text into token-based, overlapping chunks.
+
+    Chunks are slices of text at token boundaries (see core.chunking), so
+    multi-byte characters are never split at window edges.
+    """
     if not text:
         return []
 
     # Load tokenizer in a thread to avoid blocking
     encoding = await asyncio.to_thread(get_tokenizer)
-    tokens = encoding.encode(text)
-    print("--- TOKENS ---")
-    print(len(tokens))
-    print("--- TOKENS ---")
-    chunks = []
-    start_index = 0
-    while start_index < len(tokens):
-        end_index = start_index + chunk_size
-        chunk_tokens = tokens[start_index:end_index]
-        chunks.append(encoding.decode(chunk_tokens))
-        start_index += chunk_size - overlap_size
-
-    print(f"""<delete>
-    CHUNKED TEXT ---
-    Chunks:{len(chunks)}
-    Tokens: {len(tokens)}
-    Text: {len(text)}
-    ---
-    """)
-    return chunks
+    chunks = await asyncio.to_thread(
+        chunk_by_tokens, text, encoding, chunk_size, overlap_size
+    )
+    return [chunk.text for chunk in chunks]
 
 
 async def count_tokens(messages: List[str]) -> int:
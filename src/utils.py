@@ -1,4 +1,7 @@
+import asyncio
 import os
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Iterable, List
 
 from langchain_core.messages import (
     AIMessage,
@@ -43,7 +46,6 @@ def get_api_key_for_model(model_name: str, config: RunnableConfig):
     elif model_name.startswith("anthropic:"):
         return os.getenv("ANTHROPIC_API_KEY")
     elif model_name.startswith("google"):
-        print("GOOGLE_API_KEY", os.getenv("GOOGLE_API_KEY"))
         return os.getenv("GOOGLE_API_KEY")
     elif model_name.startswith("ollama:"):
         # Ollama doesn't need API key
@@ -83,10 +85,70 @@ def get_buffer_string_with_tools(messages: list[BaseMessage]) -> str:
     return "\n".join(lines)
 
 
+async def gather_with_concurrency(
+    limit: int, coroutines: Iterable[Awaitable[Any]]
+) -> List[Any]:
+    """Await coroutines concurrently, at most `limit` at a time, preserving order."""
+    semaphore = asyncio.Semaphore(max(1, limit))
+
+    async def run(coroutine: Awaitable[Any]) -> Any:
+        async with semaphore:
+            return await coroutine
+
+    return await asyncio.gather(*(run(c) for c in coroutines))
+
+
+class LazyGraph:
+    """Stands in for a compiled graph that is only compiled on first use.
+
+    Attribute access (ainvoke, astream, ...) is forwarded to the graph that
+    compile_graph returns, so a module can hold another module's graph
+    without compiling it, and its providers, at import time.
+    """
+
+    def __init__(self, compile_graph: Callable[[], Any]):
+        """Defer compile_graph until an attribute is first used."""
+        self._compile_graph = compile_graph
+
+    def __getattr__(self, name: str) -> Any:
+        """Forward the attribute lookup to the compiled graph."""
+        return getattr(self._compile_graph(), name)
+
+
+def lazy_graph_attributes(
+    module: str, **compilers: Callable[[], Any]
+) -> Callable[[str], Any]:
+    """Build a module __getattr__ that compiles each named graph on first access.
+
+    langgraph.json entry points and `from module import graph` both resolve
+    through it, so importing a module no longer compiles its graph.
+    """
+
+    def __getattr__(name: str) -> Any:
+        if name in compilers:
+            return compilers[name]()
+        raise AttributeError(f"module {module!r} has no attribute {name!r}")
+
+    return __getattr__
+
+
+@lru_cache(maxsize=1)
 def get_langfuse_handler():
+    """Return the Langfuse callback handler shared by every graph, if installed."""
     try:
         from langfuse.langchain import CallbackHandler
 
         return CallbackHandler()
     except ImportError:
         return None
+
+
+def get_graph_callbacks() -> list:
+    """Callbacks attached to every compiled graph: Langfuse (if installed) and usage tracking."""
+    from src.configuration import Configuration
+    from src.core.usage_tracking import get_usage_tracker
+
+    callbacks = [get_langfuse_handler()]
+    if Configuration.from_runnable_config(None).usage_tracking_enabled:
+        callbacks.append(get_usage_tracker())
+    return [callback for callback in callbacks if callback is not None]